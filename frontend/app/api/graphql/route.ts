@@ -9,6 +9,8 @@ export async function POST(req: NextRequest) {
   if (contentType) headers.set('content-type', contentType)
   const auth = req.headers.get('authorization')
   if (auth) headers.set('authorization', auth)
+  const accept = req.headers.get('accept')
+  if (accept) headers.set('accept', accept)
 
   try {
     const upstream = await fetch(target, {
@@ -17,10 +19,14 @@ export async function POST(req: NextRequest) {
       body,
       cache: 'no-store',
     })
-    const payload = await upstream.text()
     const responseHeaders = new Headers()
     const upstreamContentType = upstream.headers.get('content-type')
     if (upstreamContentType) responseHeaders.set('content-type', upstreamContentType)
+    // @defer/@stream responses are multipart/mixed: pass the body through as it arrives
+    if (upstreamContentType?.startsWith('multipart/mixed') && upstream.body) {
+      return new Response(upstream.body, { status: upstream.status, headers: responseHeaders })
+    }
+    const payload = await upstream.text()
     return new Response(payload, { status: upstream.status, headers: responseHeaders })
   } catch (err: any) {
     const message = err instanceof Error ? err.message : 'Upstream request failed'
@@ -4,7 +4,7 @@ import { FormEvent, useCallback, useEffect, useMemo, useState } from 'react';
 import Link from 'next/link';
 import { usePathname, useRouter, useSearchParams } from 'next/navigation';
 
-import { gqlRequest } from '@/lib/graphql';
+import { gqlIncremental } from '@/lib/graphql';
 import { computeDeficitTotals, computeDebtTotals } from '@/lib/fiscal';
 
 const scenarioCompareQuery = `
@@ -52,10 +52,13 @@ const scenarioCompareQuery = `
         macro { deltaGDP deltaEmployment deltaDeficit }
         resolution { overallPct byMass { massId targetDeltaEur specifiedDeltaEur } }
       }
-      waterfall
-      ribbons
-      pieceLabels
-      massLabels
+      # Headline numbers render first; the piece/mass breakdown follows
+      ... @defer(label: "breakdown") {
+        waterfall
+        ribbons
+        pieceLabels
+        massLabels
+      }
     }
   }
 `;
@@ -130,69 +133,71 @@ export default function ComparePageClient() {
     setLoading(true);
     setError(null);
     try {
-      const data = await gqlRequest(scenarioCompareQuery, { a: aId, b: bId } as Record<string, any>);
-      const raw = data.scenarioCompare;
-      if (!raw?.a) {
-        throw new Error('Données de comparaison : scénario A manquant');
-      }
-      const waterfall: WaterfallEntry[] = Array.isArray(raw.waterfall)
-        ? raw.waterfall.map((item: any) => ({
-            massId: String(item.massId ?? ''),
-            deltaEur: Number(item.deltaEur ?? 0),
-          }))
-        : [];
-      const ribbons: RibbonEntry[] = Array.isArray(raw.ribbons)
-        ? raw.ribbons.map((item: any) => ({
-            pieceId: String(item.pieceId ?? ''),
-            massId: String(item.massId ?? ''),
-            amountEur: Number(item.amountEur ?? 0),
-          }))
-        : [];
-      const massLabels: Record<string, string> = raw.massLabels ?? {};
-      const pieceLabels: Record<string, string> = raw.pieceLabels ?? {};
-      const ensureScenario = (sc: any): RunScenario => ({
-        id: String(sc.id ?? ''),
-        scenarioId: String(sc.scenarioId ?? ''),
-        accounting: {
-          deficitPath: (sc.accounting?.deficitPath ?? []).map((v: number) => Number(v)),
-          debtPath: (sc.accounting?.debtPath ?? []).map((v: number) => Number(v)),
-          commitmentsPath: sc.accounting?.commitmentsPath?.map((v: number) => Number(v)),
-          deficitDeltaPath: sc.accounting?.deficitDeltaPath?.map((v: number) => Number(v)),
-          debtDeltaPath: sc.accounting?.debtDeltaPath?.map((v: number) => Number(v)),
-          baselineDeficitPath: sc.accounting?.baselineDeficitPath?.map((v: number) => Number(v)),
-          baselineDebtPath: sc.accounting?.baselineDebtPath?.map((v: number) => Number(v)),
-        },
-        compliance: {
-          eu3pct: sc.compliance?.eu3pct ?? [],
-          eu60pct: sc.compliance?.eu60pct ?? [],
-          netExpenditure: sc.compliance?.netExpenditure ?? [],
-          localBalance: sc.compliance?.localBalance ?? [],
-        },
-        macro: {
-          deltaGDP: (sc.macro?.deltaGDP ?? []).map((v: number) => Number(v)),
-          deltaEmployment: (sc.macro?.deltaEmployment ?? []).map((v: number) => Number(v)),
-          deltaDeficit: (sc.macro?.deltaDeficit ?? []).map((v: number) => Number(v)),
-        },
-        resolution: {
-          overallPct: Number(sc.resolution?.overallPct ?? 0),
-          byMass: (sc.resolution?.byMass ?? []).map((entry: any) => ({
-            massId: String(entry.massId ?? ''),
-            targetDeltaEur: Number(entry.targetDeltaEur ?? 0),
-            specifiedDeltaEur: Number(entry.specifiedDeltaEur ?? 0),
-          })),
-        },
-      });
-
-      const scenarioA = ensureScenario(raw.a);
-      const scenarioB = ensureScenario(raw.b ?? raw.a);
-
-      setPayload({
-        a: scenarioA,
-        b: scenarioB,
-        waterfall,
-        ribbons,
-        massLabels,
-        pieceLabels,
+      await gqlIncremental(scenarioCompareQuery, { a: aId, b: bId } as Record<string, any>, (data) => {
+        const raw = data.scenarioCompare;
+        if (!raw?.a) {
+          throw new Error('Données de comparaison : scénario A manquant');
+        }
+        const waterfall: WaterfallEntry[] = Array.isArray(raw.waterfall)
+          ? raw.waterfall.map((item: any) => ({
+              massId: String(item.massId ?? ''),
+              deltaEur: Number(item.deltaEur ?? 0),
+            }))
+          : [];
+        const ribbons: RibbonEntry[] = Array.isArray(raw.ribbons)
+          ? raw.ribbons.map((item: any) => ({
+              pieceId: String(item.pieceId ?? ''),
+              massId: String(item.massId ?? ''),
+              amountEur: Number(item.amountEur ?? 0),
+            }))
+          : [];
+        const massLabels: Record<string, string> = raw.massLabels ?? {};
+        const pieceLabels: Record<string, string> = raw.pieceLabels ?? {};
+        const ensureScenario = (sc: any): RunScenario => ({
+          id: String(sc.id ?? ''),
+          scenarioId: String(sc.scenarioId ?? ''),
+          accounting: {
+            deficitPath: (sc.accounting?.deficitPath ?? []).map((v: number) => Number(v)),
+            debtPath: (sc.accounting?.debtPath ?? []).map((v: number) => Number(v)),
+            commitmentsPath: sc.accounting?.commitmentsPath?.map((v: number) => Number(v)),
+            deficitDeltaPath: sc.accounting?.deficitDeltaPath?.map((v: number) => Number(v)),
+            debtDeltaPath: sc.accounting?.debtDeltaPath?.map((v: number) => Number(v)),
+            baselineDeficitPath: sc.accounting?.baselineDeficitPath?.map((v: number) => Number(v)),
+            baselineDebtPath: sc.accounting?.baselineDebtPath?.map((v: number) => Number(v)),
+          },
+          compliance: {
+            eu3pct: sc.compliance?.eu3pct ?? [],
+            eu60pct: sc.compliance?.eu60pct ?? [],
+            netExpenditure: sc.compliance?.netExpenditure ?? [],
+            localBalance: sc.compliance?.localBalance ?? [],
+          },
+          macro: {
+            deltaGDP: (sc.macro?.deltaGDP ?? []).map((v: number) => Number(v)),
+            deltaEmployment: (sc.macro?.deltaEmployment ?? []).map((v: number) => Number(v)),
+            deltaDeficit: (sc.macro?.deltaDeficit ?? []).map((v: number) => Number(v)),
+          },
+          resolution: {
+            overallPct: Number(sc.resolution?.overallPct ?? 0),
+            byMass: (sc.resolution?.byMass ?? []).map((entry: any) => ({
+              massId: String(entry.massId ?? ''),
+              targetDeltaEur: Number(entry.targetDeltaEur ?? 0),
+              specifiedDeltaEur: Number(entry.specifiedDeltaEur ?? 0),
+            })),
+          },
+        });
+
+        const scenarioA = ensureScenario(raw.a);
+        const scenarioB = ensureScenario(raw.b ?? raw.a);
+
+        setPayload({
+          a: scenarioA,
+          b: scenarioB,
+          waterfall,
+          ribbons,
+          massLabels,
+          pieceLabels,
+        });
+        setLoading(false);
       });
     } catch (err: any) {
       setError(err.message ?? 'Échec du chargement de la comparaison');
@@ -2,14 +2,137 @@
 // The /api/graphql route forwards requests at runtime to GRAPHQL_URL.
 export const GRAPHQL_URL = '/api/graphql'
 
-export async function gqlRequest(query: string, variables?: Record<string, any>): Promise<any> {
-  const res = await fetch(GRAPHQL_URL, {
+// Automatic persisted queries: send the sha256 of the document first and only
+// resend the full text when the API answers PersistedQueryNotFound.
+const queryHashes = new Map<string, string>()
+
+async function sha256Hex(text: string): Promise<string | null> {
+  const subtle = (globalThis as any).crypto?.subtle
+  if (!subtle) return null
+  const digest = await subtle.digest('SHA-256', new TextEncoder().encode(text))
+  return Array.from(new Uint8Array(digest))
+    .map((b) => b.toString(16).padStart(2, '0'))
+    .join('')
+}
+
+async function postGraphql(body: Record<string, any>): Promise<Response> {
+  return fetch(GRAPHQL_URL, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ query, variables })
+    body: JSON.stringify(body)
   })
+}
+
+function isPersistedQueryNotFound(js: any): boolean {
+  return Array.isArray(js?.errors) && js.errors.some((e: any) => e?.extensions?.code === 'PERSISTED_QUERY_NOT_FOUND')
+}
+
+export async function gqlRequest(query: string, variables?: Record<string, any>): Promise<any> {
+  let hash = queryHashes.get(query) ?? null
+  if (!hash) {
+    try {
+      hash = await sha256Hex(query)
+    } catch {
+      hash = null
+    }
+    if (hash) queryHashes.set(query, hash)
+  }
+  let res: Response | null = null
+  let js: any = null
+  if (hash) {
+    const extensions = { persistedQuery: { version: 1, sha256Hash: hash } }
+    res = await postGraphql({ variables, extensions })
+    // 400 means the API has persisted queries disabled; fall through to a full request
+    js = res.ok ? await res.json() : null
+    if (!res.ok || isPersistedQueryNotFound(js)) {
+      res = await postGraphql({ query, variables, extensions })
+      js = null
+    }
+  } else {
+    res = await postGraphql({ query, variables })
+  }
   if (!res.ok) throw new Error(`HTTP ${res.status}`)
-  const js = await res.json()
+  if (js === null) js = await res.json()
   if (js.errors) throw new Error(js.errors.map((e: any) => e.message).join('; '))
   return js.data
 }
+
+// Incremental delivery (@defer/@stream): the API answers multipart/mixed, one JSON
+// payload per part. onData receives the merged result after every part.
+function mergeAt(target: any, path: (string | number)[], data: any): void {
+  let node = target
+  for (const key of path) {
+    if (node[key] === undefined || node[key] === null) node[key] = {}
+    node = node[key]
+  }
+  Object.assign(node, data)
+}
+
+function applyIncremental(result: any, payload: any, pending: Map<string, (string | number)[]>): void {
+  for (const p of payload.pending ?? []) pending.set(String(p.id), p.path ?? [])
+  for (const inc of payload.incremental ?? []) {
+    const path = inc.path ?? pending.get(String(inc.id)) ?? []
+    if (inc.items) {
+      let list = result.data
+      for (const key of path) list = list?.[key]
+      if (Array.isArray(list)) list.push(...inc.items)
+    } else if (inc.data) {
+      mergeAt(result.data, [...path, ...(inc.subPath ?? [])], inc.data)
+    }
+    if (inc.errors) result.errors = [...(result.errors ?? []), ...inc.errors]
+  }
+}
+
+export async function gqlIncremental(
+  query: string,
+  variables: Record<string, any> | undefined,
+  onData: (data: any, hasNext: boolean) => void
+): Promise<void> {
+  const res = await fetch(GRAPHQL_URL, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'multipart/mixed; deferSpec=20220824, application/json'
+    },
+    body: JSON.stringify({ query, variables })
+  })
+  if (!res.ok) throw new Error(`HTTP ${res.status}`)
+  const contentType = res.headers.get('content-type') ?? ''
+  if (!contentType.startsWith('multipart/mixed') || !res.body) {
+    const js = await res.json()
+    if (js.errors) throw new Error(js.errors.map((e: any) => e.message).join('; '))
+    onData(js.data, false)
+    return
+  }
+  const boundary = /boundary="?([^";]+)"?/.exec(contentType)?.[1] ?? '-'
+  const delimiter = `\r\n--${boundary}`
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  const result: any = { data: null }
+  const pending = new Map<string, (string | number)[]>()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (value) buffer += decoder.decode(value, { stream: true })
+    let idx = buffer.indexOf(delimiter)
+    while (idx >= 0) {
+      const part = buffer.slice(0, idx)
+      buffer = buffer.slice(idx + delimiter.length)
+      const bodyStart = part.indexOf('\r\n\r\n')
+      if (bodyStart >= 0) {
+        const payload = JSON.parse(part.slice(bodyStart + 4))
+        if (result.data === null) {
+          result.data = payload.data ?? {}
+          if (payload.errors) result.errors = payload.errors
+          for (const p of payload.pending ?? []) pending.set(String(p.id), p.path ?? [])
+        } else {
+          applyIncremental(result, payload, pending)
+        }
+        if (result.errors?.length) throw new Error(result.errors.map((e: any) => e.message).join('; '))
+        onData(result.data, Boolean(payload.hasNext))
+      }
+      idx = buffer.indexOf(delimiter)
+    }
+    if (done) break
+  }
+}
@@ -0,0 +1,226 @@
+"""Per-instance admission control for the scenario-engine resolvers.
+
+``runScenario`` and ``specifyMass`` (class ``scenario``) and ``scenarioCompare``
+(class ``compare``, at least two engine runs) are CPU-bound. Each class gets a
+concurrency limit sized from the CPU pool and a bounded FIFO wait queue:
+
+- a request that finds the queue full is rejected at once (HTTP 429);
+- a queued request still waiting after the queue deadline is dropped (HTTP 503).
+
+Both carry a ``Retry-After`` estimated from the recent service time, so a burst
+of scenario runs sheds load instead of pushing every other endpoint past its
+latency budget. Depth, occupancy and rejection counters are exported on
+``/metrics``.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List
+
+from graphql import GraphQLError
+
+from .settings import get_settings
+
+SCENARIO = "scenario"
+COMPARE = "compare"
+
+
+class Overloaded(GraphQLError):
+    """Raised when a request is not admitted; ``status`` is the HTTP status to send."""
+
+    def __init__(self, op_class: str, status: int, retry_after: int) -> None:
+        code = "OVERLOADED" if status == 429 else "QUEUE_TIMEOUT"
+        super().__init__(
+            f"Too many concurrent {op_class} requests, retry in {retry_after}s",
+            extensions={"code": code, "retryAfter": retry_after},
+        )
+        self.op_class = op_class
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    """Concurrency limit plus a bounded FIFO queue with a wait deadline."""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout_sec: float) -> None:
+        self.name = name
+        self.limit = max(1, int(limit))
+        self.queue_size = max(0, int(queue_size))
+        self.queue_timeout_sec = max(0.0, float(queue_timeout_sec))
+        self.active = 0
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self._lock = threading.Lock()
+        self._service_sec = 1.0  # EWMA of slot hold time, seeds Retry-After
+        self.stats: Dict[str, int] = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(1 for w in self._waiters if not w.done())
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained."""
+        with self._lock:
+            backlog = len(self._waiters) + self.active
+            service = self._service_sec
+        return max(1, math.ceil(service * backlog / self.limit))
+
+    def _wake_next(self) -> bool:
+        # Hand the slot over to the oldest live waiter (caller holds the lock)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return True
+        return False
+
+    def _release(self) -> None:
+        with self._lock:
+            if not self._wake_next():
+                self.active -= 1
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                self.stats["admitted"] += 1
+                return
+            if len(self._waiters) >= self.queue_size:
+                self.stats["rejected_queue_full"] += 1
+                rejected = True
+            else:
+                rejected = False
+                waiter: "asyncio.Future[None]" = loop.create_future()
+                self._waiters.append(waiter)
+                self.stats["queued"] += 1
+        if rejected:
+            raise Overloaded(self.name, 429, self.retry_after())
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout_sec)
+        except BaseException as exc:
+            with self._lock:
+                granted = waiter.done() and not waiter.cancelled()
+                if not granted:
+                    waiter.cancel()
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+            if granted:
+                if isinstance(exc, asyncio.TimeoutError):
+                    # The slot arrived as the deadline expired: keep it
+                    with self._lock:
+                        self.stats["admitted"] += 1
+                    return
+                self._release()
+                raise
+            if isinstance(exc, asyncio.TimeoutError):
+                with self._lock:
+                    self.stats["rejected_timeout"] += 1
+                raise Overloaded(self.name, 503, self.retry_after()) from None
+            raise
+        with self._lock:
+            self.stats["admitted"] += 1
+
+    def release(self, held_sec: float) -> None:
+        """Give the slot back after holding it for ``held_sec``."""
+        with self._lock:
+            self._service_sec = 0.8 * self._service_sec + 0.2 * max(0.0, held_sec)
+        self._release()
+
+    def metrics_lines(self, prefix: str = "cbl_admission") -> List[str]:
+        depth = self.queue_depth()
+        with self._lock:
+            stats = dict(self.stats)
+            active = self.active
+        label = f'class="{self.name}"'
+        return [
+            f"{prefix}_limit{{{label}}} {self.limit}",
+            f"{prefix}_active{{{label}}} {active}",
+            f"{prefix}_queue_depth{{{label}}} {depth}",
+            f"{prefix}_admitted_total{{{label}}} {stats['admitted']}",
+            f"{prefix}_queued_total{{{label}}} {stats['queued']}",
+            f"{prefix}_rejected_total{{{label},reason=\"queue_full\"}} {stats['rejected_queue_full']}",
+            f"{prefix}_rejected_total{{{label},reason=\"timeout\"}} {stats['rejected_timeout']}",
+        ]
+
+
+def _class_limits() -> Dict[str, int]:
+    from .executors import _cpu_workers
+
+    settings = get_settings()
+    # Default to the CPU pool size: more admitted runs would only queue in the executor
+    scenario = int(settings.admission_scenario_concurrency or 0) or _cpu_workers()
+    compare = int(settings.admission_compare_concurrency or 0) or max(1, scenario // 2)
+    return {SCENARIO: scenario, COMPARE: compare}
+
+
+@lru_cache(maxsize=1)
+def get_admission_gates() -> Dict[str, AdmissionGate]:
+    settings = get_settings()
+    return {
+        name: AdmissionGate(name, limit, settings.admission_queue_size, settings.admission_queue_timeout_sec)
+        for name, limit in _class_limits().items()
+    }
+
+
+def _reject_response(info: Any, exc: Overloaded) -> None:
+    # Set the HTTP status on the GraphQL sub-response (FastAPI router context)
+    context = getattr(info, "context", None)
+    response = context.get("response") if isinstance(context, dict) else getattr(context, "response", None)
+    if response is None:
+        return
+    try:
+        response.status_code = exc.status
+        response.headers["Retry-After"] = str(exc.retry_after)
+    except Exception:
+        pass
+
+
+@asynccontextmanager
+async def admit(op_class: str, info: Any = None) -> AsyncIterator[None]:
+    """Hold a slot of ``op_class`` for the duration of the block."""
+    if not get_settings().admission_control_enabled:
+        yield
+        return
+    gate = get_admission_gates()[op_class]
+    try:
+        await gate.acquire()
+    except Overloaded as exc:
+        _reject_response(info, exc)
+        raise
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        gate.release(time.monotonic() - started)
+
+
+def admitted(op_class: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorate an async resolver so it runs inside an ``op_class`` slot."""
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        async def _wrapper(*args: Any, **kwargs: Any) -> Any:
+            async with admit(op_class, kwargs.get("info")):
+                return await fn(*args, **kwargs)
+
+        return _wrapper
+
+    return decorator
+
+
+def metrics_lines() -> List[str]:
+    if not get_settings().admission_control_enabled:
+        return []
+    lines: List[str] = []
+    for gate in get_admission_gates().values():
+        lines.extend(gate.metrics_lines())
+    return lines
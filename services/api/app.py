@@ -1,10 +1,11 @@
+import hmac
 import json
 import logging
 import os
 import time
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from strawberry.fastapi import GraphQLRouter
 
 from .schema import schema
@@ -29,6 +30,15 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.compression_enabled:
+        from .compression import CompressionMiddleware
+
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_min_size,
+            gzip_level=settings.compression_gzip_level,
+            brotli_quality=settings.compression_brotli_quality,
+        )
 
     # Logging setup
     logging.basicConfig(level=getattr(logging, (settings.log_level or 'INFO').upper(), logging.INFO))
@@ -75,21 +85,17 @@ def create_app() -> FastAPI:
     def root():
         return {"status": "ok", "message": "Citizen Budget Lab API. Visit /graphql"}
 
+    from .health import HealthMonitor
+
+    app.state.health = HealthMonitor(interval_sec=settings.health_refresh_interval_sec)
+    from .prewarm import build_prewarmer
+
+    app.state.prewarm = build_prewarmer()
+
     @app.get("/health")
     def health():
-        # Include warehouse readiness info without failing the overall health
-        try:
-            from .warehouse_client import warehouse_status  # lazy import to avoid duckdb import at app import time
-            wh = warehouse_status()
-        except Exception:  # pragma: no cover
-            wh = {"enabled": False, "available": False, "ready": False, "missing": []}
-        try:
-            from .votes_store import get_vote_store_status
-
-            votes_store = get_vote_store_status()
-        except Exception:
-            votes_store = {"ok": False, "errors": ["failed to inspect vote store configuration"]}
-        return {"status": "healthy", "warehouse": wh, "votes_store": votes_store}
+        # Served from the background-refreshed snapshot; never touches the warehouse inline
+        return app.state.health.snapshot()
 
     @app.get("/build-snapshot")
     def build_snapshot(year: int = 2026) -> Response:
@@ -159,45 +165,40 @@ def create_app() -> FastAPI:
             return JSONResponse(status_code=500, content={"ok": False, "errors": [str(exc)]})
         return JSONResponse(content={"ok": True, **info})
 
-    @app.get("/health/full")
-    def health_full():
-        # Warehouse status + row counts + dbt version if available
-        try:
-            from .warehouse_client import warehouse_status, table_counts  # lazy import
-            wh = warehouse_status()
-            counts = table_counts([
-                "stg_state_budget_lines",
-                "fct_admin_by_mission",
-                "fct_admin_by_cofog",
-                "vw_procurement_contracts",
-                "fct_procurement_suppliers",
-            ])
-        except Exception:  # pragma: no cover
-            wh = {"enabled": False, "available": False, "ready": False, "missing": []}
-            counts = {}
-
-        dbt_ver = None
-        try:  # Prefer Python package
-            import dbt
-
-            dbt_ver = getattr(dbt, "__version__", None)
-        except Exception:
-            dbt_ver = None
+    @app.get("/export/votes")
+    def export_votes(
+        request: Request,
+        after: str | None = None,
+        limit: int | None = None,
+        dsl: bool = True,
+    ) -> Response:
+        token = settings.export_token
+        if not token:
+            return Response(status_code=404)
+        if not hmac.compare_digest(request.headers.get("x-export-token", ""), token):
+            return Response(status_code=403)
+        from .compression import choose_encoding
+        from .export import MEDIA_TYPE, decode_export_cursor, gzip_stream, iter_export
+        from .votes_store import get_vote_store
 
         try:
-            from .votes_store import get_vote_store_status
+            key = decode_export_cursor(after)
+        except ValueError:
+            return JSONResponse(status_code=400, content={"error": "invalid cursor"})
+        if limit is not None and limit < 0:
+            return JSONResponse(status_code=400, content={"error": "limit must be non-negative"})
+        body = iter_export(get_vote_store(), key, limit, dsl, settings.export_chunk_size)
+        headers = {"Cache-Control": "no-store"}
+        # The export only speaks gzip; q-values (e.g. "gzip;q=0") are honoured
+        if choose_encoding(request.headers.get("accept-encoding", ""), brotli_available=False) == "gzip":
+            body = gzip_stream(body)
+            headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(body, media_type=MEDIA_TYPE, headers=headers)
 
-            votes_store = get_vote_store_status()
-        except Exception:
-            votes_store = {"ok": False, "errors": ["failed to inspect vote store configuration"]}
-
-        return {
-            "status": "healthy",
-            "warehouse": wh,
-            "votes_store": votes_store,
-            "rows": counts,
-            "dbt": {"version": dbt_ver},
-        }
+    @app.get("/health/full")
+    def health_full():
+        # Warehouse status + row counts + dbt version, from the cached snapshot
+        return app.state.health.snapshot(full=True)
 
     @app.get("/metrics")
     def metrics() -> Response:
@@ -210,17 +211,72 @@ def create_app() -> FastAPI:
                 if cnt > 0:
                     avg = (ms.get(path, 0.0) / float(cnt))
                     lines.append(f"cbl_request_latency_ms_avg{{path=\"{path}\"}} {avg:.3f}")
+            lines.extend(app.state.health.metrics_lines())
+            from .response_cache import get_response_cache
+
+            response_cache = get_response_cache()
+            if response_cache is not None:
+                lines.extend(response_cache.metrics_lines())
+            from .singleflight import get_scenario_flights
+
+            lines.extend(get_scenario_flights().metrics_lines("cbl_scenario_singleflight"))
+            from .admission import metrics_lines as admission_metrics_lines
+
+            lines.extend(admission_metrics_lines())
+            from .scenario_cache import get_scenario_result_cache
+
+            scenario_cache = get_scenario_result_cache()
+            if scenario_cache is not None:
+                lines.extend(scenario_cache.metrics_lines())
+            lines.extend(app.state.prewarm.metrics_lines())
+            from .store import get_scenario_dsl_cache
+
+            lines.extend(get_scenario_dsl_cache().metrics_lines())
+            from .vote_queue import get_vote_queue
+
+            vote_queue = get_vote_queue()
+            if vote_queue is not None:
+                lines.extend(vote_queue.metrics_lines())
         except Exception:
             pass
         body = "\n".join(lines) + "\n"
         return Response(content=body, media_type="text/plain; version=0.0.4")
 
+    @app.on_event("startup")
+    def _startup() -> None:
+        app.state.health.start()
+        app.state.prewarm.start()
+        try:
+            # Open the vote stores (pool, migrations, partitions) before the first
+            # request rather than inside an async resolver, on the event loop
+            from .votes_store import get_async_vote_store
+
+            get_async_vote_store()
+        except Exception as e:
+            logger.warning("Vote store warm-up failed: %s", e)
+
     @app.on_event("shutdown")
-    def _shutdown() -> None:
+    async def _shutdown() -> None:
+        app.state.health.stop()
+        app.state.prewarm.stop()
+        from .executors import shutdown_executors
+        from .store import flush_pending_writes
+
+        # Scenario writes queued by runScenario run on the I/O pool
+        flush_pending_writes()
+        shutdown_executors()
+        from .response_cache import close_response_cache
+
+        close_response_cache()
         try:
-            from .votes_store import close_vote_store
+            # Drain write-behind votes while the store is still open
+            from .vote_queue import close_vote_queue
+
+            close_vote_queue()
+            from .votes_store import close_async_vote_store, close_vote_store
 
             close_vote_store()
+            await close_async_vote_store()
         except Exception:
             pass
 
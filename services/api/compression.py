@@ -0,0 +1,201 @@
+"""gzip / brotli response compression for the API.
+
+Pure ASGI middleware (no body re-buffering):
+
+- single-message bodies below ``minimum_size`` bytes are sent as-is;
+- only allowlisted content types are compressed (JSON, GraphQL responses, text);
+- streamed responses are compressed from their first chunk on, each with a
+  sync flush, so every chunk (e.g. the initial ``@defer`` part) reaches the
+  client as soon as it is produced;
+- brotli is preferred when the optional ``brotli`` package is installed and the
+  client accepts it, otherwise gzip.
+"""
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:  # optional dependency
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover - depends on the environment
+    brotli = None  # type: ignore[assignment]
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "application/graphql-response+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "multipart/mixed",
+    "text/",
+)
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[token] = q
+    return out
+
+
+def choose_encoding(accept_encoding: str, brotli_available: bool = brotli is not None) -> Optional[str]:
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, or None."""
+    accepted = _parse_accept_encoding(accept_encoding or "")
+    wildcard = accepted.get("*", 0.0)
+    candidates: List[Tuple[float, int, str]] = []
+    if brotli_available:
+        candidates.append((accepted.get("br", wildcard), 1, "br"))
+    candidates.append((accepted.get("gzip", wildcard), 0, "gzip"))
+    q, _pref, name = max(candidates)
+    return name if q > 0 else None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31: gzip container (header + trailer)
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, *, flush: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(data) if data else b""
+            return out + self._br.flush() if flush else out
+        out = self._gz.compress(data) if data else b""
+        return out + self._gz.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return (self._br.process(data) if data else b"") + self._br.finish()
+        return (self._gz.compress(data) if data else b"") + self._gz.flush(zlib.Z_FINISH)
+
+
+def compress_bytes(data: bytes, encoding: str, *, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """One-shot helper (used by the benchmark)."""
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: Callable[[Scope, Receive, Send], Awaitable[None]],
+        *,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Tuple[str, ...] = DEFAULT_CONTENT_TYPES,
+    ) -> None:
+        self.app = app
+        self.minimum_size = max(0, int(minimum_size))
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = tuple(content_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for key, value in scope.get("headers") or []:
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compressible(self, headers: List[Tuple[bytes, bytes]]) -> bool:
+        content_type = b""
+        for key, value in headers:
+            lk = key.lower()
+            if lk == b"content-encoding":
+                return False
+            if lk == b"cache-control" and b"no-transform" in value.lower():
+                return False
+            if lk == b"content-type":
+                content_type = value
+        media = content_type.decode("latin-1").split(";", 1)[0].strip().lower()
+        return any(media.startswith(ct) for ct in self.content_types)
+
+
+class _CompressingResponder:
+    def __init__(self, mw: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.mw = mw
+        self.encoding = encoding
+        self._send = send
+        self._start: Optional[Message] = None
+        self._compressor: Optional[_Compressor] = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = list(message.get("headers") or [])
+            status = int(message.get("status", 200))
+            if status < 200 or status in (204, 304) or not self.mw.compressible(headers):
+                self._passthrough = True
+                await self._send(message)
+                return
+            self._start = dict(message, headers=headers)
+            return
+        if kind != "http.response.body" or self._passthrough or self._start is None:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"") or b""
+        more = bool(message.get("more_body", False))
+        if self._compressor is not None:
+            chunk = self._compressor.compress(body, flush=True) if more else self._compressor.finish(body)
+            if chunk or not more:
+                await self._send({"type": "http.response.body", "body": chunk, "more_body": more})
+            return
+
+        # First body message: a streamed body is compressed right away, never held back
+        payload = body
+        if not more and len(payload) < self.mw.minimum_size:
+            await self._send(self._start)
+            await self._send({"type": "http.response.body", "body": payload, "more_body": False})
+            return
+
+        self._compressor = _Compressor(self.encoding, self.mw.gzip_level, self.mw.brotli_quality)
+        headers = [(k, v) for k, v in self._start["headers"] if k.lower() != b"content-length"]
+        headers.append((b"content-encoding", self.encoding.encode("ascii")))
+        if not any(k.lower() == b"vary" for k, _ in headers):
+            headers.append((b"vary", b"Accept-Encoding"))
+        else:
+            headers = [
+                (k, v + b", Accept-Encoding") if k.lower() == b"vary" and b"accept-encoding" not in v.lower() else (k, v)
+                for k, v in headers
+            ]
+        if not more:
+            compressed = self._compressor.finish(payload)
+            headers.append((b"content-length", str(len(compressed)).encode("ascii")))
+            await self._send(dict(self._start, headers=headers))
+            await self._send({"type": "http.response.body", "body": compressed, "more_body": False})
+            return
+        await self._send(dict(self._start, headers=headers))
+        await self._send({"type": "http.response.body", "body": self._compressor.compress(payload, flush=True), "more_body": True})
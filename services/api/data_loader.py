@@ -5,7 +5,9 @@ import csv
 import datetime as dt
 import io
 import os
+import threading
 from collections import defaultdict
+from dataclasses import dataclass
 import json
 import hashlib
 from functools import lru_cache
@@ -423,7 +425,12 @@ def procurement_top_suppliers(
     procedure_type: str | None = None,
     min_amount_eur: float | None = None,
     max_amount_eur: float | None = None,
+    after: Tuple[float, str] | None = None,
 ) -> List[ProcurementItem]:
+    """Top suppliers by amount, ordered by ``(amount DESC, siren)``.
+
+    ``after`` is the ``(amount, siren)`` key of the last supplier of the previous page.
+    """
     # Prefer warehouse semantic layer if available
     try:
         if wh.warehouse_available():
@@ -435,6 +442,7 @@ def procurement_top_suppliers(
                 min_amount_eur=min_amount_eur,
                 max_amount_eur=max_amount_eur,
                 top_n=top_n,
+                after=after,
             )
             if items:
                 return items
@@ -502,8 +510,16 @@ def procurement_top_suppliers(
     except Exception:
         pass
 
+    ranked = sorted(by_supplier.items(), key=lambda x: (-float(x[1]["amount"]), x[0]))
+    if after is not None:
+        after_amount, after_siren = float(after[0]), str(after[1])
+        ranked = [
+            (siren, ent)
+            for siren, ent in ranked
+            if float(ent["amount"]) < after_amount or (float(ent["amount"]) == after_amount and siren > after_siren)
+        ]
     items: List[ProcurementItem] = []
-    for siren, ent in sorted(by_supplier.items(), key=lambda x: x[1]["amount"], reverse=True)[:top_n]:
+    for siren, ent in ranked[:top_n]:
         items.append(
             ProcurementItem(
                 supplier=Supplier(siren=siren, name=str(ent["name"])),
@@ -828,6 +844,78 @@ def lego_pieces_with_baseline(year: int, scope: str = "S13") -> List[dict]:
     return out
 
 
+@dataclass(frozen=True)
+class LegoPieceIndex:
+    """Enriched LEGO pieces for one (year, scope) and data vintage.
+
+    ``pieces`` are lego_pieces_with_baseline() rows in configuration order, each
+    extended with its raw ``config`` entry and the policy ``bounds_pct`` /
+    ``bounds_amount_eur``. Callers must not mutate them.
+    """
+
+    vintage: str
+    pieces: Tuple[dict, ...]
+    positions: Dict[str, int]
+    locked_ids: frozenset
+
+    def get(self, piece_id: str) -> dict | None:
+        pos = self.positions.get(str(piece_id))
+        return self.pieces[pos] if pos is not None else None
+
+    def labels(self) -> Dict[str, str]:
+        return {p["id"]: str(p.get("label") or p["id"]) for p in self.pieces}
+
+
+# (year, scope, static baseline) -> index of the current data vintage
+_lego_piece_index: Dict[Tuple[int, str, bool], LegoPieceIndex] = {}
+_lego_piece_index_lock = threading.Lock()
+
+
+def _build_lego_piece_index(year: int, scope: str, vintage: str) -> LegoPieceIndex:
+    configs = {str(p.get("id")): p for p in (load_lego_config().get("pieces") or [])}
+    pieces: List[dict] = []
+    for row in lego_pieces_with_baseline(year, scope):
+        cfg = configs.get(row["id"]) or {}
+        pol = cfg.get("policy") or {}
+        pieces.append(
+            dict(
+                row,
+                config=cfg,
+                bounds_pct=pol.get("bounds_pct") or {},
+                bounds_amount_eur=pol.get("bounds_amount_eur") or {},
+            )
+        )
+    return LegoPieceIndex(
+        vintage=vintage,
+        pieces=tuple(pieces),
+        positions={p["id"]: pos for pos, p in enumerate(pieces)},
+        locked_ids=frozenset(pid for pid, cfg in configs.items() if bool(cfg.get("locked", False))),
+    )
+
+
+def lego_piece_index(year: int, scope: str = "S13") -> LegoPieceIndex:
+    """Per-vintage piece index: O(1) lookup of a fully enriched piece by id."""
+    from .response_cache import data_vintage
+
+    vintage = data_vintage()
+    key = (int(year), scope.upper(), bool(get_settings().lego_baseline_static))
+    hit = _lego_piece_index.get(key)
+    if hit is not None and hit.vintage == vintage:
+        return hit
+    # Concurrent resolvers of the same request wait for a single build
+    with _lego_piece_index_lock:
+        hit = _lego_piece_index.get(key)
+        if hit is not None and hit.vintage == vintage:
+            return hit
+        index = _build_lego_piece_index(int(year), scope, vintage)
+        _lego_piece_index[key] = index
+    return index
+
+
+def clear_lego_piece_index() -> None:
+    _lego_piece_index.clear()
+
+
 def lego_distance_from_dsl(year: int, dsl_b64: str, scope: str = "S13") -> dict:
     """Compute a simple distance between the baseline shares and a scenario that tweaks piece.* targets.
 
@@ -902,11 +990,17 @@ def lego_distance_from_dsl(year: int, dsl_b64: str, scope: str = "S13") -> dict:
     return {"score": score, "byPiece": deltas}
 
 
-def _piece_amounts_after_dsl(year: int, dsl_b64: str, scope: str = "S13") -> tuple[dict[str, float], dict[str, float]]:
-    """Return (baseline_amounts_by_piece, scenario_amounts_by_piece) for expenditure pieces.
+@dataclass(frozen=True)
+class _PieceAmountInputs:
+    """Baseline expenditure amounts and piece policies, loaded once per year."""
 
-    Reuses logic from lego_distance_from_dsl to apply piece.* actions to amounts.
-    """
+    base: Dict[str, float]
+    ptypes: Dict[str, str]
+    policy: Dict[str, dict]
+    elasticity: Dict[str, float]
+
+
+def _piece_amount_inputs(year: int) -> _PieceAmountInputs:
     baseline = load_lego_baseline(year)
     cfg = load_lego_config()
     amounts: dict[str, float] = {}
@@ -918,11 +1012,6 @@ def _piece_amounts_after_dsl(year: int, dsl_b64: str, scope: str = "S13") -> tup
         ae = ent.get("amount_eur")
         if isinstance(ae, (int, float)):
             amounts[pid] = float(ae)
-    base = dict(amounts)
-    if not amounts:
-        return base, {}
-    data = _decode_yaml_base64(dsl_b64)
-    actions = data.get("actions") or []
     # Policy settings
     lego_policy: Dict[str, dict] = {}
     lego_elast: Dict[str, float] = {}
@@ -938,6 +1027,38 @@ def _piece_amounts_after_dsl(year: int, dsl_b64: str, scope: str = "S13") -> tup
                 lego_elast[pid] = float(v)
     except Exception:
         pass
+    return _PieceAmountInputs(base=amounts, ptypes=ptypes, policy=lego_policy, elasticity=lego_elast)
+
+
+def _piece_amounts_after_dsl(year: int, dsl_b64: str, scope: str = "S13") -> tuple[dict[str, float], dict[str, float]]:
+    """Return (baseline_amounts_by_piece, scenario_amounts_by_piece) for expenditure pieces.
+
+    Reuses logic from lego_distance_from_dsl to apply piece.* actions to amounts.
+    """
+    inputs = _piece_amount_inputs(year)
+    base = dict(inputs.base)
+    if not base:
+        return base, {}
+    return base, _apply_piece_actions(inputs, dsl_b64)
+
+
+def piece_amounts_after_dsls(year: int, dsls: Iterable[str]) -> tuple[dict[str, float], list[dict[str, float]]]:
+    """Batch variant of _piece_amounts_after_dsl: the baseline is loaded once for all DSLs."""
+    inputs = _piece_amount_inputs(year)
+    base = dict(inputs.base)
+    if not base:
+        return base, [{} for _ in dsls]
+    return base, [_apply_piece_actions(inputs, dsl) for dsl in dsls]
+
+
+def _apply_piece_actions(inputs: _PieceAmountInputs, dsl_b64: str) -> dict[str, float]:
+    """Scenario amounts by piece: the baseline with the DSL's piece.* actions applied."""
+    amounts = dict(inputs.base)
+    ptypes = inputs.ptypes
+    lego_policy = inputs.policy
+    lego_elast = inputs.elasticity
+    data = _decode_yaml_base64(dsl_b64)
+    actions = data.get("actions") or []
     def _apply(pid: str, op: str, amt_eur: float | None, delta_pct: float | None, role: str | None, ptype: str) -> None:
         if pid not in amounts:
             return
@@ -993,7 +1114,7 @@ def _piece_amounts_after_dsl(year: int, dsl_b64: str, scope: str = "S13") -> tup
         dp = act.get("delta_pct")
         delta_pct = float(dp) if isinstance(dp, (int, float)) else None
         _apply(pid, op, amt_eur, delta_pct, role, ptypes.get(pid, "expenditure"))
-    return base, amounts
+    return amounts
 
 
 def _mass_shares_from_piece_amounts(amounts: dict[str, float]) -> dict[str, float]:
@@ -1235,7 +1356,29 @@ def _macro_kernel(horizon: int, shocks_pct_gdp: Dict[str, List[float]], gdp_seri
 
 
 
-def run_scenario(dsl_b64: str, *, lens: str | None = None) -> tuple[str, Accounting, Compliance, MacroResult, dict, List[str]]:
+# Output stages of run_scenario that a caller can skip by passing ``needs``.
+# "accounting" and "compliance" imply the macro kernel (the total deficit
+# includes automatic stabilisers); "ratios" covers the four *_ratio_path series.
+SCENARIO_STAGES = frozenset({"accounting", "ratios", "compliance", "local_balance", "macro", "resolution"})
+
+
+def run_scenario(
+    dsl_b64: str,
+    *,
+    lens: str | None = None,
+    needs: Iterable[str] | None = None,
+) -> tuple[str, Accounting, Compliance, MacroResult, dict, List[str]]:
+    """Evaluate a scenario DSL.
+
+    ``needs`` restricts the work to a subset of SCENARIO_STAGES; skipped stages
+    come back as empty lists (and an empty resolution for the selected lens).
+    Validation, the scenario id and warnings are always computed.
+    """
+    stages = SCENARIO_STAGES if needs is None else SCENARIO_STAGES & frozenset(needs)
+    need_ratios = "ratios" in stages
+    need_compliance = "compliance" in stages
+    need_paths = bool(stages & {"accounting", "ratios", "compliance"})
+    need_macro = need_paths or "macro" in stages
     data = _decode_yaml_base64(dsl_b64)
     if not isinstance(data.get("assumptions"), dict):
         data["assumptions"] = {}
@@ -1684,34 +1827,40 @@ def run_scenario(dsl_b64: str, *, lens: str | None = None) -> tuple[str, Account
         debt_delta_path.append(float(debt))
 
     # Macro kernel
-    macro = _macro_kernel(horizon_years, shocks_pct_gdp, gdp_series)
+    if need_macro:
+        macro = _macro_kernel(horizon_years, shocks_pct_gdp, gdp_series)
+    else:
+        macro = MacroResult(delta_gdp=[], delta_employment=[], delta_deficit=[], assumptions={})
 
     # Net expenditure rule (simplified):
     # - Baseline net primary expenditure (NPE) assumed at 50% of GDP in year 0
     # - Baseline NPE grows by reference rate each year
     # - Scenario NPE_t = BaselineNPE_t + spending delta for year t (from mechanical layer)
     # - Rule: YOY growth(NPE) <= reference rate ⇒ ok, else breach
-    settings = get_settings()
-    ref = float(getattr(settings, "net_exp_reference_rate", 0.015))
-    base_npe0 = 0.50 * gdp_series[0]
-    base_npe_path: List[float] = [base_npe0]
-    for i in range(1, horizon_years):
-        base_npe_path.append(base_npe_path[-1] * (1.0 + ref))
-    scen_npe: List[float] = [base_npe_path[i] + deltas_by_year[i] for i in range(horizon_years)]
     net_exp_status: List[str] = []
-    for i in range(horizon_years):
-        if i == 0 or scen_npe[i - 1] == 0:
-            net_exp_status.append("ok")
-            continue
-        growth = (scen_npe[i] / scen_npe[i - 1]) - 1.0
-        net_exp_status.append("ok" if growth <= ref + 1e-9 else "breach")
+    if need_compliance:
+        settings = get_settings()
+        ref = float(getattr(settings, "net_exp_reference_rate", 0.015))
+        base_npe0 = 0.50 * gdp_series[0]
+        base_npe_path: List[float] = [base_npe0]
+        for i in range(1, horizon_years):
+            base_npe_path.append(base_npe_path[-1] * (1.0 + ref))
+        scen_npe: List[float] = [base_npe_path[i] + deltas_by_year[i] for i in range(horizon_years)]
+        for i in range(horizon_years):
+            if i == 0 or scen_npe[i - 1] == 0:
+                net_exp_status.append("ok")
+                continue
+            growth = (scen_npe[i] / scen_npe[i - 1]) - 1.0
+            net_exp_status.append("ok" if growth <= ref + 1e-9 else "breach")
 
     # Baseline series for compliance
-    try:
-        from . import baselines as _bl  # lazy to avoid cycles
-        base_map = _bl.def_debt_series()
-    except Exception:
-        base_map = _read_baseline_def_debt()
+    base_map: Dict[int, Tuple[float, float]] = {}
+    if need_paths:
+        try:
+            from . import baselines as _bl  # lazy to avoid cycles
+            base_map = _bl.def_debt_series()
+        except Exception:
+            base_map = _read_baseline_def_debt()
     eu3 = []
     debt_ratio_path: List[float] = []
     baseline_deficit_path: List[float] = []
@@ -1722,7 +1871,7 @@ def run_scenario(dsl_b64: str, *, lens: str | None = None) -> tuple[str, Account
     baseline_deficit_ratio_path: List[float] = []
     deficit_ratio_path: List[float] = []
     baseline_debt_ratio_path: List[float] = []
-    for i in range(horizon_years):
+    for i in range(horizon_years if need_paths else 0):
         year = baseline_year + i
         base_def, base_debt = base_map.get(year, (0.0, 0.0))
         baseline_deficit_path.append(float(base_def))
@@ -1744,12 +1893,16 @@ def run_scenario(dsl_b64: str, *, lens: str | None = None) -> tuple[str, Account
             base_debt_ratio = 0.0
             scen_debt_ratio = 0.0
         ratio_def = scen_def_ratio
-        eu3.append("breach" if ratio_def < -0.03 else "ok")
+        if need_compliance:
+            eu3.append("breach" if ratio_def < -0.03 else "ok")
         debt_ratio_path.append(scen_debt_ratio)
         baseline_deficit_ratio_path.append(base_def_ratio)
         deficit_ratio_path.append(scen_def_ratio)
         baseline_debt_ratio_path.append(base_debt_ratio)
-    eu60 = ["above" if r > 0.60 else "info" for r in debt_ratio_path]
+    eu60 = ["above" if r > 0.60 else "info" for r in debt_ratio_path] if need_compliance else []
+    if not need_ratios:
+        deficit_ratio_path, baseline_deficit_ratio_path = [], []
+        debt_ratio_path, baseline_debt_ratio_path = [], []
 
     # Local balance checks by subsector
     apu = str((data.get("assumptions") or {}).get("apu_subsector") or "").upper()
@@ -1758,7 +1911,9 @@ def run_scenario(dsl_b64: str, *, lens: str | None = None) -> tuple[str, Account
     except Exception:
         tol = 0.0
     lb: List[str]
-    if apu == "APUL":
+    if "local_balance" not in stages:
+        lb = []
+    elif apu == "APUL":
         # Local gov: balanced each year within tolerance, using local offsets
         lb = ["ok" if abs(d) <= tol else "breach" for d in local_deltas_by_year]
     elif apu == "ASSO":
@@ -1794,115 +1949,107 @@ def run_scenario(dsl_b64: str, *, lens: str | None = None) -> tuple[str, Account
         baseline_debt_ratio_path=baseline_debt_ratio_path,
     )
 
-    # Build resolution payloads for both mission and COFOG lenses
+    # Build the resolution payload for the selected lens only
     mission_ids = set(
         list(resolution_target_by_mission_total.keys()) + list(resolution_specified_by_mission_total.keys())
     )
 
     cp_target_by_mission = resolution_target_by_mission_dim.get("cp", {})
     cp_spec_by_mission = resolution_specified_by_mission_dim.get("cp", {})
-    by_mass_mission: List[dict] = []
-    total_target_abs = 0.0
-    total_spec_abs = 0.0
-    for mid in sorted(mission_ids):
-        t = float(resolution_target_by_mission_total.get(mid, 0.0))
-        s = float(resolution_specified_by_mission_total.get(mid, 0.0))
-        cp_t = float(cp_target_by_mission.get(mid, 0.0))
-        cp_s = float(cp_spec_by_mission.get(mid, 0.0))
-        if abs(cp_t) > 1e-9:
-            # Bucket filling overflow logic for UI
-            if (cp_t < 0 and cp_s < cp_t) or (cp_t > 0 and cp_s > cp_t):
+    resolution: dict = {"overallPct": 0.0, "byMass": [], "lens": selected_lens}
+    if "resolution" in stages and selected_lens == "MISSION":
+        by_mass_mission: List[dict] = []
+        total_target_abs = 0.0
+        total_spec_abs = 0.0
+        for mid in sorted(mission_ids):
+            t = float(resolution_target_by_mission_total.get(mid, 0.0))
+            s = float(resolution_specified_by_mission_total.get(mid, 0.0))
+            cp_t = float(cp_target_by_mission.get(mid, 0.0))
+            cp_s = float(cp_spec_by_mission.get(mid, 0.0))
+            if abs(cp_t) > 1e-9:
+                # Bucket filling overflow logic for UI
+                if (cp_t < 0 and cp_s < cp_t) or (cp_t > 0 and cp_s > cp_t):
+                    cp_delta = cp_s
+                    cp_unspecified = 0.0
+                else:
+                    cp_delta = cp_t
+                    cp_unspecified = cp_t - cp_s
+            else:
                 cp_delta = cp_s
                 cp_unspecified = 0.0
+            by_mass_mission.append(
+                {
+                    "massId": mid,
+                    "targetDeltaEur": t,
+                    "specifiedDeltaEur": s,
+                    "cpTargetDeltaEur": cp_t,
+                    "cpSpecifiedDeltaEur": cp_s,
+                    "cpDeltaEur": cp_delta,
+                    "unspecifiedCpDeltaEur": cp_unspecified,
+                }
+            )
+            total_target_abs += abs(t)
+            total_spec_abs += abs(s)
+        overall_mission = (total_spec_abs / total_target_abs) if total_target_abs > 0 else 0.0
+        resolution = {"overallPct": overall_mission, "byMass": by_mass_mission, "lens": selected_lens}
+
+    if "resolution" in stages and selected_lens == "COFOG":
+        cofog_target_totals: Dict[str, float] = defaultdict(float)
+        cofog_spec_totals: Dict[str, float] = defaultdict(float)
+        cofog_cp_target_totals: Dict[str, float] = defaultdict(float)
+        cofog_cp_spec_totals: Dict[str, float] = defaultdict(float)
+        for mid in mission_ids:
+            t = float(resolution_target_by_mission_total.get(mid, 0.0))
+            s = float(resolution_specified_by_mission_total.get(mid, 0.0))
+            cp_t = float(cp_target_by_mission.get(mid, 0.0))
+            cp_s = float(cp_spec_by_mission.get(mid, 0.0))
+            weights = mission_to_cofog_weights(mid, cofog_to_mission)
+            if weights:
+                for major, cof_weight in weights:
+                    cofog_target_totals[major] += t * cof_weight
+                    cofog_spec_totals[major] += s * cof_weight
+                    cofog_cp_target_totals[major] += cp_t * cof_weight
+                    cofog_cp_spec_totals[major] += cp_s * cof_weight
+            elif abs(t) > 0 or abs(s) > 0:
+                cofog_target_totals["UNKNOWN"] += t
+                cofog_spec_totals["UNKNOWN"] += s
+                cofog_cp_target_totals["UNKNOWN"] += cp_t
+                cofog_cp_spec_totals["UNKNOWN"] += cp_s
+
+        by_mass_cofog: List[dict] = []
+        cofog_target_abs = 0.0
+        cofog_spec_abs = 0.0
+        for code in sorted(cofog_target_totals.keys()):
+            t = float(cofog_target_totals.get(code, 0.0))
+            s = float(cofog_spec_totals.get(code, 0.0))
+            cp_t = float(cofog_cp_target_totals.get(code, 0.0))
+            cp_s = float(cofog_cp_spec_totals.get(code, 0.0))
+            if abs(cp_t) > 1e-9:
+                # Bucket filling overflow logic for UI
+                if (cp_t < 0 and cp_s < cp_t) or (cp_t > 0 and cp_s > cp_t):
+                    cp_delta = cp_s
+                    cp_unspecified = 0.0
+                else:
+                    cp_delta = cp_t
+                    cp_unspecified = cp_t - cp_s
             else:
-                cp_delta = cp_t
-                cp_unspecified = cp_t - cp_s
-        else:
-            cp_delta = cp_s
-            cp_unspecified = 0.0
-        by_mass_mission.append(
-            {
-                "massId": mid,
-                "targetDeltaEur": t,
-                "specifiedDeltaEur": s,
-                "cpTargetDeltaEur": cp_t,
-                "cpSpecifiedDeltaEur": cp_s,
-                "cpDeltaEur": cp_delta,
-                "unspecifiedCpDeltaEur": cp_unspecified,
-            }
-        )
-        total_target_abs += abs(t)
-        total_spec_abs += abs(s)
-    overall_mission = (total_spec_abs / total_target_abs) if total_target_abs > 0 else 0.0
-    resolution_mission = {"overallPct": overall_mission, "byMass": by_mass_mission}
-
-    cofog_target_totals: Dict[str, float] = defaultdict(float)
-    cofog_spec_totals: Dict[str, float] = defaultdict(float)
-    cofog_cp_target_totals: Dict[str, float] = defaultdict(float)
-    cofog_cp_spec_totals: Dict[str, float] = defaultdict(float)
-    for mid in mission_ids:
-        t = float(resolution_target_by_mission_total.get(mid, 0.0))
-        s = float(resolution_specified_by_mission_total.get(mid, 0.0))
-        cp_t = float(cp_target_by_mission.get(mid, 0.0))
-        cp_s = float(cp_spec_by_mission.get(mid, 0.0))
-        weights = mission_to_cofog_weights(mid, cofog_to_mission)
-        if weights:
-            for major, cof_weight in weights:
-                cofog_target_totals[major] += t * cof_weight
-                cofog_spec_totals[major] += s * cof_weight
-                cofog_cp_target_totals[major] += cp_t * cof_weight
-                cofog_cp_spec_totals[major] += cp_s * cof_weight
-        elif abs(t) > 0 or abs(s) > 0:
-            cofog_target_totals["UNKNOWN"] += t
-            cofog_spec_totals["UNKNOWN"] += s
-            cofog_cp_target_totals["UNKNOWN"] += cp_t
-            cofog_cp_spec_totals["UNKNOWN"] += cp_s
-
-    by_mass_cofog: List[dict] = []
-    cofog_target_abs = 0.0
-    cofog_spec_abs = 0.0
-    for code in sorted(cofog_target_totals.keys()):
-        t = float(cofog_target_totals.get(code, 0.0))
-        s = float(cofog_spec_totals.get(code, 0.0))
-        cp_t = float(cofog_cp_target_totals.get(code, 0.0))
-        cp_s = float(cofog_cp_spec_totals.get(code, 0.0))
-        if abs(cp_t) > 1e-9:
-            # Bucket filling overflow logic for UI
-            if (cp_t < 0 and cp_s < cp_t) or (cp_t > 0 and cp_s > cp_t):
                 cp_delta = cp_s
                 cp_unspecified = 0.0
-            else:
-                cp_delta = cp_t
-                cp_unspecified = cp_t - cp_s
-        else:
-            cp_delta = cp_s
-            cp_unspecified = 0.0
-        by_mass_cofog.append(
-            {
-                "massId": code,
-                "targetDeltaEur": t,
-                "specifiedDeltaEur": s,
-                "cpTargetDeltaEur": cp_t,
-                "cpSpecifiedDeltaEur": cp_s,
-                "cpDeltaEur": cp_delta,
-                "unspecifiedCpDeltaEur": cp_unspecified,
-            }
-        )
-        cofog_target_abs += abs(t)
-        cofog_spec_abs += abs(s)
-    overall_cofog = (cofog_spec_abs / cofog_target_abs) if cofog_target_abs > 0 else 0.0
-    resolution_cofog = {"overallPct": overall_cofog, "byMass": by_mass_cofog}
-
-    resolution_by_lens = {
-        "MISSION": resolution_mission,
-        "COFOG": resolution_cofog,
-    }
-    selected_resolution = resolution_by_lens.get(selected_lens, resolution_mission)
-    resolution = {
-        "overallPct": selected_resolution["overallPct"],
-        "byMass": selected_resolution["byMass"],
-        "lens": selected_lens,
-    }
+            by_mass_cofog.append(
+                {
+                    "massId": code,
+                    "targetDeltaEur": t,
+                    "specifiedDeltaEur": s,
+                    "cpTargetDeltaEur": cp_t,
+                    "cpSpecifiedDeltaEur": cp_s,
+                    "cpDeltaEur": cp_delta,
+                    "unspecifiedCpDeltaEur": cp_unspecified,
+                }
+            )
+            cofog_target_abs += abs(t)
+            cofog_spec_abs += abs(s)
+        overall_cofog = (cofog_spec_abs / cofog_target_abs) if cofog_target_abs > 0 else 0.0
+        resolution = {"overallPct": overall_cofog, "byMass": by_mass_cofog, "lens": selected_lens}
 
     return sid, acc, comp, macro, resolution, warnings
 def _procurement_path(year: int) -> str:
@@ -13,11 +13,19 @@ def votes_migrations_dir() -> str:
     )
 
 
+_DIALECTS = ("sqlite", "postgres")
+
+
 def apply_migrations(conn, migrations_dir: str, table_name: str = "vote_migrations") -> List[str]:
-    """Apply SQL migrations in order and record them in a migrations table."""
+    """Apply SQL migrations in order and record them in a migrations table.
+
+    ``NNN_name.sql`` runs on every backend; ``NNN_name.sqlite.sql`` and
+    ``NNN_name.postgres.sql`` only on theirs, for steps with no portable SQL.
+    """
     _ensure_migrations_table(conn, table_name)
     applied = _fetch_applied(conn, table_name)
-    pending = [name for name in _list_sql_files(migrations_dir) if name not in applied]
+    dialect = "sqlite" if _is_sqlite(conn) else "postgres"
+    pending = [name for name in _list_sql_files(migrations_dir, dialect) if name not in applied]
     applied_now: List[str] = []
     for name in pending:
         path = os.path.join(migrations_dir, name)
@@ -30,12 +38,46 @@ def apply_migrations(conn, migrations_dir: str, table_name: str = "vote_migratio
     return applied_now
 
 
-def _list_sql_files(migrations_dir: str) -> List[str]:
+def _list_sql_files(migrations_dir: str, dialect: str) -> List[str]:
     if not os.path.isdir(migrations_dir):
         return []
-    return sorted(
-        name for name in os.listdir(migrations_dir) if name.endswith(".sql")
-    )
+    names = []
+    for name in os.listdir(migrations_dir):
+        if not name.endswith(".sql"):
+            continue
+        suffix = name[: -len(".sql")].rpartition(".")[2]
+        if suffix in _DIALECTS and suffix != dialect:
+            continue
+        names.append(name)
+    return sorted(names)
+
+
+def month_starts(start: datetime, count: int) -> List[datetime]:
+    """First instants (UTC) of ``count`` consecutive months, from the month of ``start``."""
+    year, month = start.year, start.month
+    out = []
+    for _ in range(max(0, count)):
+        out.append(datetime(year, month, 1, tzinfo=timezone.utc))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return out
+
+
+def ensure_vote_partitions(conn, months_ahead: int = 1) -> List[str]:
+    """Create the monthly ``votes`` partitions for this month and the next ``months_ahead`` (Postgres only).
+
+    Votes outside every monthly partition land in ``votes_default``; creating
+    partitions ahead of time keeps it empty.
+    """
+    if _is_sqlite(conn):
+        return []
+    now = datetime.now(timezone.utc)
+    names: List[str] = []
+    with closing(conn.cursor()) as cur:
+        for start in month_starts(now, months_ahead + 1):
+            cur.execute("SELECT votes_ensure_partition(%s)", (start.timestamp(),))
+            names.append(cur.fetchone()[0])
+    conn.commit()
+    return names
 
 
 def _load_sql(path: str) -> str:
@@ -0,0 +1,103 @@
+"""Bounded executors used by the async GraphQL resolvers.
+
+Resolvers that run the scenario engine go to the CPU pool; resolvers that wait
+on the vote store, the warehouse or upstream HTTP APIs go to the I/O pool. The
+event loop only runs cheap resolvers inline, so a slow scenario computation no
+longer stalls label queries on the same instance.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .settings import get_settings
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_cpu_pool: Optional[Executor] = None
+_cpu_process_pool: Optional[Executor] = None
+_io_pool: Optional[Executor] = None
+
+
+def _cpu_workers() -> int:
+    configured = int(get_settings().graphql_cpu_workers or 0)
+    if configured > 0:
+        return configured
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _get_cpu_pool(process_safe: bool) -> Executor:
+    global _cpu_pool, _cpu_process_pool
+    use_process = process_safe and get_settings().graphql_cpu_executor.strip().lower() == "process"
+    with _lock:
+        if use_process:
+            if _cpu_process_pool is None:
+                _cpu_process_pool = ProcessPoolExecutor(max_workers=_cpu_workers())
+            return _cpu_process_pool
+        if _cpu_pool is None:
+            _cpu_pool = ThreadPoolExecutor(max_workers=_cpu_workers(), thread_name_prefix="cbl-cpu")
+        return _cpu_pool
+
+
+def _get_io_pool() -> Executor:
+    global _io_pool
+    with _lock:
+        if _io_pool is None:
+            workers = max(1, int(get_settings().graphql_io_workers or 1))
+            _io_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cbl-io")
+        return _io_pool
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, process_safe: bool = False, **kwargs: Any) -> T:
+    """Run CPU-bound work off the event loop.
+
+    ``process_safe`` marks module-level callables with picklable arguments and
+    results; they go to a process pool when GRAPHQL_CPU_EXECUTOR=process.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_cpu_pool(process_safe), functools.partial(fn, *args, **kwargs))
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking I/O (vote store, warehouse, upstream HTTP) off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_pool(), functools.partial(fn, *args, **kwargs))
+
+
+def submit_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+    """Start blocking I/O on the I/O pool without waiting for it (write-behind work)."""
+    return _get_io_pool().submit(fn, *args, **kwargs)
+
+
+def offload_cpu(fn: Callable[..., T]) -> Callable[..., Any]:
+    """Turn a sync resolver into an async one executed on the CPU pool."""
+
+    @functools.wraps(fn)
+    async def _wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_cpu(fn, *args, **kwargs)
+
+    return _wrapper
+
+
+def offload_io(fn: Callable[..., T]) -> Callable[..., Any]:
+    """Turn a sync resolver into an async one executed on the I/O pool."""
+
+    @functools.wraps(fn)
+    async def _wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_io(fn, *args, **kwargs)
+
+    return _wrapper
+
+
+def shutdown_executors() -> None:
+    global _cpu_pool, _cpu_process_pool, _io_pool
+    with _lock:
+        pools = [p for p in (_cpu_pool, _cpu_process_pool, _io_pool) if p is not None]
+        _cpu_pool = _cpu_process_pool = _io_pool = None
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
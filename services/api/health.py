@@ -0,0 +1,153 @@
+"""Background-refreshed health snapshot served by /health and /health/full.
+
+Probes used to open a DuckDB connection, scan information_schema and count rows
+on every hit. The monitor collects those facts on a timer in a daemon thread
+and the endpoints read the last snapshot, so a probe costs a dict copy.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Relations counted for /health/full.
+HEALTH_COUNT_TABLES = [
+    "stg_state_budget_lines",
+    "fct_admin_by_mission",
+    "fct_admin_by_cofog",
+    "vw_procurement_contracts",
+    "fct_procurement_suppliers",
+]
+
+_WAREHOUSE_UNAVAILABLE = {"enabled": False, "available": False, "ready": False, "missing": []}
+
+
+def _collect_warehouse() -> tuple[dict, dict[str, int]]:
+    try:
+        from .warehouse_client import table_counts, warehouse_status  # lazy import to avoid duckdb import at app import time
+
+        wh = warehouse_status()
+        counts = table_counts(HEALTH_COUNT_TABLES) if wh.get("available") else {}
+    except Exception:
+        wh = dict(_WAREHOUSE_UNAVAILABLE)
+        counts = {}
+    return wh, counts
+
+
+def _collect_votes_store() -> dict:
+    try:
+        from .votes_store import get_vote_store_status
+
+        return get_vote_store_status()
+    except Exception:
+        return {"ok": False, "errors": ["failed to inspect vote store configuration"]}
+
+
+def _collect_dbt_version() -> Optional[str]:
+    try:  # Prefer Python package
+        import dbt
+
+        return getattr(dbt, "__version__", None)
+    except Exception:
+        return None
+
+
+class HealthMonitor:
+    """Periodically refresh health facts and serve the cached snapshot.
+
+    The first read refreshes synchronously when the background loop has not run
+    yet (e.g. TestClient without lifespan), so callers always get data.
+    """
+
+    def __init__(self, interval_sec: float = 30.0) -> None:
+        self.interval_sec = max(1.0, float(interval_sec))
+        self._lock = threading.Lock()
+        self._facts: Optional[Dict[str, Any]] = None
+        self._refreshed_at: Optional[float] = None
+        self._refreshed_mono: Optional[float] = None
+        self._refresh_ms: float = 0.0
+        self._refresh_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> None:
+        start = time.perf_counter()
+        wh, counts = _collect_warehouse()
+        facts = {
+            "warehouse": wh,
+            "votes_store": _collect_votes_store(),
+            "rows": counts,
+            "dbt": {"version": _collect_dbt_version()},
+        }
+        with self._lock:
+            self._facts = facts
+            self._refreshed_at = time.time()
+            self._refreshed_mono = time.monotonic()
+            self._refresh_ms = (time.perf_counter() - start) * 1000.0
+            self._refresh_count += 1
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as exc:  # pragma: no cover - collectors already swallow errors
+                logger.warning("Health refresh failed: %s", exc)
+            self._stop.wait(self.interval_sec)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cbl-health-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5.0)
+        self._thread = None
+
+    def age_sec(self) -> Optional[float]:
+        with self._lock:
+            if self._refreshed_mono is None:
+                return None
+            return time.monotonic() - self._refreshed_mono
+
+    def snapshot(self, full: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            ready = self._facts is not None
+        if not ready:
+            self.refresh()
+        with self._lock:
+            facts = self._facts or {}
+            age = time.monotonic() - (self._refreshed_mono or time.monotonic())
+            out: Dict[str, Any] = {
+                "status": "healthy",
+                "warehouse": facts.get("warehouse"),
+                "votes_store": facts.get("votes_store"),
+            }
+            if full:
+                out["rows"] = facts.get("rows")
+                out["dbt"] = facts.get("dbt")
+            out["snapshot"] = {
+                "refreshed_at": self._refreshed_at,
+                "age_sec": round(age, 3),
+                "interval_sec": self.interval_sec,
+                # Stale once two refresh intervals have passed without an update.
+                "stale": age > 2 * self.interval_sec,
+                "refresh_ms": round(self._refresh_ms, 3),
+                "background": self._thread is not None and self._thread.is_alive(),
+            }
+        return out
+
+    def metrics_lines(self) -> List[str]:
+        age = self.age_sec()
+        lines = [f"cbl_health_refresh_total {self._refresh_count}"]
+        if age is not None:
+            lines.append(f"cbl_health_snapshot_age_seconds {age:.3f}")
+            lines.append(f"cbl_health_refresh_ms {self._refresh_ms:.3f}")
+        return lines
@@ -0,0 +1,127 @@
+"""In-process top-N of the vote leaderboard.
+
+``voteSummary``, ``voteLeaderboard`` and the prewarmer read the most-voted
+scenarios far more often than votes change the order. Each vote store keeps a
+``Leaderboard`` holding the top ``size`` rows of ``vote_stats``:
+
+- it is loaded from the store on first use (and again once ``refresh_sec`` old,
+  so votes recorded by other instances show up);
+- every accepted vote feeds the scenario's new absolute count to ``record``,
+  which moves it within, into or out of the top-N without a store read.
+
+Counts only grow, so a scenario outside the top-N can only enter it through a
+vote recorded here: with a single writer the cached rows are exact.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .votes_store import VoteSummary
+
+
+def _rank(row: VoteSummary) -> Tuple[int, str]:
+    return (-row.votes, row.scenario_id)
+
+
+class Leaderboard:
+    """Top ``size`` scenarios by ``(votes DESC, scenario_id)``, updated per vote."""
+
+    def __init__(self, size: int = 100, refresh_sec: Optional[float] = None) -> None:
+        self.size = max(0, int(size))
+        self.refresh_sec = refresh_sec if refresh_sec and refresh_sec > 0 else None
+        self._rows: Optional[List[VoteSummary]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        # Votes recorded while a load is in flight, replayed on top of it
+        self._loading = 0
+        self._during_load: List[VoteSummary] = []
+        self.stats: Dict[str, int] = {"hit": 0, "load": 0}
+
+    def _stale(self) -> bool:
+        if self._rows is None:
+            return True
+        return self.refresh_sec is not None and time.monotonic() - self._loaded_at > self.refresh_sec
+
+    def _apply(self, row: VoteSummary) -> None:
+        # Caller holds the lock and self._rows is loaded
+        rows = self._rows
+        assert rows is not None
+        for i, current in enumerate(rows):
+            if current.scenario_id == row.scenario_id:
+                if row.votes < current.votes:
+                    return  # an older count than the one held
+                rows[i] = row
+                rows.sort(key=_rank)
+                return
+        if len(rows) >= self.size and _rank(row) >= _rank(rows[-1]):
+            return
+        rows.append(row)
+        rows.sort(key=_rank)
+        del rows[self.size :]
+
+    def _cached(self, limit: int) -> Optional[List[VoteSummary]]:
+        # Fresh rows, or None after registering the caller as a loader
+        with self._lock:
+            if not self._stale():
+                self.stats["hit"] += 1
+                return list(self._rows[: max(limit, 0)])  # type: ignore[index]
+            self._loading += 1
+            return None
+
+    def _loaded(self, rows: Optional[List[VoteSummary]], limit: int) -> List[VoteSummary]:
+        with self._lock:
+            self._loading -= 1
+            if rows is not None:
+                self._rows = sorted(rows, key=_rank)[: self.size]
+                self._loaded_at = time.monotonic()
+                self.stats["load"] += 1
+                for row in self._during_load:
+                    self._apply(row)
+            if not self._loading:
+                self._during_load = []
+            return list((self._rows or [])[: max(limit, 0)])
+
+    def top(self, limit: int, load: Callable[[int], List[VoteSummary]]) -> Optional[List[VoteSummary]]:
+        """First ``limit`` rows, loading them with ``load(size)`` when needed; None if ``limit`` exceeds the cache."""
+        if limit > self.size:
+            return None
+        cached = self._cached(limit)
+        if cached is not None:
+            return cached
+        try:
+            rows = load(self.size)
+        except BaseException:
+            self._loaded(None, limit)
+            raise
+        return self._loaded(rows, limit)
+
+    async def atop(
+        self, limit: int, load: Callable[[int], Awaitable[List[VoteSummary]]]
+    ) -> Optional[List[VoteSummary]]:
+        """``top`` for an async ``load``."""
+        if limit > self.size:
+            return None
+        cached = self._cached(limit)
+        if cached is not None:
+            return cached
+        try:
+            rows = await load(self.size)
+        except BaseException:
+            self._loaded(None, limit)
+            raise
+        return self._loaded(rows, limit)
+
+    def record(self, row: VoteSummary) -> None:
+        """Feed the new absolute count of a scenario that just received votes."""
+        with self._lock:
+            if self._loading:
+                self._during_load.append(row)
+            if self._rows is not None:
+                self._apply(row)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._rows = None
@@ -0,0 +1,62 @@
+"""Request-scoped DataLoaders over the vote store.
+
+A GraphQL document with several ``scenario(id:)`` aliases, or a
+``scenarioCompare`` with two ids, resolves every scenario DSL through one
+batched store query (``WHERE id = ANY(...)`` on Postgres, ``IN (...)`` on
+SQLite) and ids repeated within the request are fetched once.
+"""
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+from strawberry.dataloader import DataLoader
+from strawberry.extensions import SchemaExtension
+
+from .executors import run_io
+
+_CONTEXT_KEY = "loaders"
+
+
+async def _batch_load_scenario_dsls(sids: List[str]) -> List[Optional[str]]:
+    from .store import scenario_dsl_store
+
+    found = await run_io(scenario_dsl_store.get_many, sids)
+    return [found.get(sid) for sid in sids]
+
+
+class Loaders:
+    """Per-request loader bundle (one instance per GraphQL operation)."""
+
+    def __init__(self) -> None:
+        self.scenario_dsl: DataLoader[str, Optional[str]] = DataLoader(load_fn=_batch_load_scenario_dsls)
+
+
+def get_loaders(context: Any) -> Loaders:
+    """Return the loaders attached to a request context, creating them if missing."""
+    if isinstance(context, dict):
+        loaders = context.get(_CONTEXT_KEY)
+        if loaders is None:
+            loaders = context[_CONTEXT_KEY] = Loaders()
+        return loaders
+    if context is not None:
+        loaders = getattr(context, _CONTEXT_KEY, None)
+        if loaders is None:
+            loaders = Loaders()
+            setattr(context, _CONTEXT_KEY, loaders)
+        return loaders
+    # No context to share (should not happen with DataLoadersExtension): unbatched fallback.
+    return Loaders()
+
+
+async def load_scenario_dsl(context: Any, sid: str) -> Optional[str]:
+    return await get_loaders(context).scenario_dsl.load(str(sid))
+
+
+class DataLoadersExtension(SchemaExtension):
+    """Attach fresh loaders to every operation, including direct schema.execute calls."""
+
+    def on_operation(self):  # noqa: ANN201
+        if self.execution_context.context is None:
+            self.execution_context.context = {}
+        get_loaders(self.execution_context.context)
+        yield
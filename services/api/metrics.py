@@ -0,0 +1,9 @@
+"""Prometheus text helpers shared by the in-process caches, queues and warmers."""
+from __future__ import annotations
+
+from typing import List, Mapping
+
+
+def counter_lines(prefix: str, stats: Mapping[str, int]) -> List[str]:
+    """One ``<prefix>_total{result="<name>"}`` line per counter in ``stats``."""
+    return [f"{prefix}_total{{result=\"{name}\"}} {int(value)}" for name, value in stats.items()]
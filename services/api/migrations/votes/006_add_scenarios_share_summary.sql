@@ -0,0 +1 @@
+ALTER TABLE scenarios ADD COLUMN share_summary_json JSONB;
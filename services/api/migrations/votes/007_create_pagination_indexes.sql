@@ -0,0 +1,3 @@
+CREATE INDEX IF NOT EXISTS idx_vote_stats_order ON vote_stats(vote_count DESC, scenario_id);
+
+CREATE INDEX IF NOT EXISTS idx_scenarios_created_id ON scenarios(created_at DESC, id DESC);
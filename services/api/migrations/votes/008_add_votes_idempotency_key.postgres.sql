@@ -0,0 +1,21 @@
+ALTER TABLE votes ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+
+UPDATE votes
+SET idempotency_key = NULLIF(btrim(meta_json::jsonb ->> 'idempotencyKey'), '')
+WHERE idempotency_key IS NULL
+  AND meta_json LIKE '%idempotencyKey%';
+
+-- Duplicates slipped in before the key was enforced: the oldest vote keeps it
+UPDATE votes AS v
+SET idempotency_key = NULL
+FROM (
+    SELECT id, ROW_NUMBER() OVER (
+        PARTITION BY scenario_id, idempotency_key ORDER BY timestamp, id
+    ) AS rn
+    FROM votes
+    WHERE idempotency_key IS NOT NULL
+) AS d
+WHERE v.id = d.id AND d.rn > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_votes_idempotency_key
+    ON votes(scenario_id, idempotency_key) WHERE idempotency_key IS NOT NULL;
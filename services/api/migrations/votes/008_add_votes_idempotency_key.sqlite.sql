@@ -0,0 +1,20 @@
+ALTER TABLE votes ADD COLUMN idempotency_key TEXT;
+
+UPDATE votes
+SET idempotency_key = NULLIF(trim(CAST(json_extract(meta_json, '$.idempotencyKey') AS TEXT)), '')
+WHERE idempotency_key IS NULL
+  AND json_valid(meta_json);
+
+-- Duplicates slipped in before the key was enforced: the oldest vote keeps it
+UPDATE votes
+SET idempotency_key = NULL
+WHERE idempotency_key IS NOT NULL
+  AND EXISTS (
+      SELECT 1 FROM votes AS o
+      WHERE o.scenario_id = votes.scenario_id
+        AND o.idempotency_key = votes.idempotency_key
+        AND (o.timestamp < votes.timestamp OR (o.timestamp = votes.timestamp AND o.id < votes.id))
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_votes_idempotency_key
+    ON votes(scenario_id, idempotency_key) WHERE idempotency_key IS NOT NULL;
@@ -0,0 +1,7 @@
+-- vote_stats used to be maintained on Postgres only: rebuild it from the votes
+DELETE FROM vote_stats;
+
+INSERT INTO vote_stats (scenario_id, vote_count, last_ts)
+SELECT scenario_id, COUNT(*), MAX(timestamp)
+FROM votes
+GROUP BY scenario_id;
@@ -0,0 +1,95 @@
+-- Range-partition votes by calendar month (UTC) of `timestamp` (epoch seconds).
+-- Closed months are exported to Parquet and dropped by tools/archive_votes.py,
+-- so indexes and vacuum only ever cover the months still in Postgres.
+
+-- A unique index on a partitioned table must include the partition key, which
+-- would let a replayed vote land in another month: idempotency keys get their
+-- own (narrow, unpartitioned) table instead.
+CREATE TABLE IF NOT EXISTS vote_idempotency_keys (
+    scenario_id TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL,
+    vote_id TEXT NOT NULL,
+    timestamp DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (scenario_id, idempotency_key)
+);
+
+INSERT INTO vote_idempotency_keys (scenario_id, idempotency_key, vote_id, timestamp)
+SELECT scenario_id, idempotency_key, id, timestamp
+FROM votes
+WHERE idempotency_key IS NOT NULL
+ON CONFLICT DO NOTHING;
+
+ALTER TABLE votes RENAME TO votes_unpartitioned;
+ALTER TABLE votes_unpartitioned RENAME CONSTRAINT votes_pkey TO votes_unpartitioned_pkey;
+DROP INDEX IF EXISTS votes_scenario_idx;
+DROP INDEX IF EXISTS votes_scenario_ts_idx;
+DROP INDEX IF EXISTS idx_votes_idempotency_key;
+
+CREATE TABLE votes (
+    id TEXT NOT NULL,
+    scenario_id TEXT NOT NULL,
+    timestamp DOUBLE PRECISION NOT NULL,
+    user_email TEXT,
+    meta_json TEXT NOT NULL,
+    idempotency_key TEXT,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Catches timestamps outside the monthly partitions created so far
+CREATE TABLE votes_default PARTITION OF votes DEFAULT;
+
+-- Create the partition holding `ts` (votes_YYYY_MM); returns its name. Rows
+-- that landed in votes_default for that month move into the new partition.
+CREATE OR REPLACE FUNCTION votes_ensure_partition(ts DOUBLE PRECISION) RETURNS TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    month_start TIMESTAMP := date_trunc('month', to_timestamp(ts) AT TIME ZONE 'UTC');
+    lower_bound DOUBLE PRECISION := extract(epoch FROM month_start);
+    upper_bound DOUBLE PRECISION := extract(epoch FROM month_start + INTERVAL '1 month');
+    part TEXT := 'votes_' || to_char(month_start, 'YYYY_MM');
+BEGIN
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN part;
+    END IF;
+    -- Instances call this at startup: serialize the check-then-create
+    PERFORM pg_advisory_xact_lock(hashtext('votes_ensure_partition'));
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN part;
+    END IF;
+    CREATE TEMP TABLE votes_partition_move (LIKE votes);
+    WITH moved AS (
+        DELETE FROM votes_default
+        WHERE timestamp >= lower_bound AND timestamp < upper_bound
+        RETURNING *
+    )
+    INSERT INTO votes_partition_move SELECT * FROM moved;
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF votes FOR VALUES FROM (%s) TO (%s)',
+        part, lower_bound, upper_bound
+    );
+    INSERT INTO votes SELECT * FROM votes_partition_move;
+    DROP TABLE votes_partition_move;
+    RETURN part;
+END;
+$$;
+
+-- One partition per month that has votes, plus the current and next month
+SELECT votes_ensure_partition(extract(epoch FROM month_start))
+FROM (
+    SELECT DISTINCT date_trunc('month', to_timestamp(timestamp) AT TIME ZONE 'UTC') AS month_start
+    FROM votes_unpartitioned
+    UNION
+    SELECT date_trunc('month', now() AT TIME ZONE 'UTC')
+    UNION
+    SELECT date_trunc('month', now() AT TIME ZONE 'UTC') + INTERVAL '1 month'
+) AS months
+ORDER BY month_start;
+
+INSERT INTO votes (id, scenario_id, timestamp, user_email, meta_json, idempotency_key)
+SELECT id, scenario_id, timestamp, user_email, meta_json, idempotency_key
+FROM votes_unpartitioned;
+
+DROP TABLE votes_unpartitioned;
+
+-- Created once the rows are in; votes_scenario_idx was a prefix of this one
+CREATE INDEX IF NOT EXISTS votes_scenario_ts_idx ON votes (scenario_id, timestamp);
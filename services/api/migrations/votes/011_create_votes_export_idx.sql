@@ -0,0 +1,2 @@
+-- Bulk export (/export/votes) walks votes in (timestamp, id) order and resumes after a key
+CREATE INDEX IF NOT EXISTS votes_ts_id_idx ON votes (timestamp, id);
@@ -0,0 +1,72 @@
+"""Relay-style cursor pagination helpers.
+
+Cursors are opaque base64url-encoded JSON arrays holding the sort key of the
+last returned row (e.g. ``[votes, scenario_id]`` or ``[piece_id]``). Backends
+seek past that key (an indexed ``WHERE key > cursor`` or an id -> position map
+over a compiled catalog) instead of scanning an offset.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from .settings import get_settings
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    raw = json.dumps(list(key), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], arity: int) -> Optional[List[Any]]:
+    """Return the key stored in ``cursor`` (None for the first page)."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(key, list) or len(key) != arity:
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def page_size(first: Optional[int]) -> int:
+    """Clamp ``first`` to ``[0, GRAPHQL_MAX_PAGE_SIZE]``."""
+    limit = DEFAULT_PAGE_SIZE if first is None else int(first)
+    if limit < 0:
+        raise ValueError("first must be non-negative")
+    return min(limit, max(1, int(get_settings().graphql_max_page_size)))
+
+
+def slice_after(
+    items: Sequence[T],
+    index: Mapping[str, int],
+    after: Optional[str],
+    limit: int,
+) -> Tuple[Sequence[T], bool]:
+    """Page of a compiled sequence keyed by id, seeking through ``index``.
+
+    Returns ``(page, has_next_page)``. An ``after`` id that is no longer in the
+    sequence (catalog reloaded) is an invalid cursor.
+    """
+    start = 0
+    if after is not None:
+        pos = index.get(str(after))
+        if pos is None:
+            raise ValueError("Invalid cursor")
+        start = pos + 1
+    page = items[start : start + limit]
+    return page, start + limit < len(items)
+
+
+def trim_page(rows: List[T], limit: int) -> Tuple[List[T], bool]:
+    """Split a ``limit + 1`` fetch into the page and a has-next flag."""
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,136 @@
+"""Automatic persisted queries (APQ) and allowlist mode for /graphql.
+
+Clients send ``extensions.persistedQuery.sha256Hash`` and omit the query text
+once the server has seen it (Apollo APQ protocol). In allowlist mode only the
+documents listed in the manifest (``{sha256: query}`` JSON) may run and new
+documents cannot be registered at runtime.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+from graphql import GraphQLError
+from strawberry.extensions import SchemaExtension
+
+logger = logging.getLogger(__name__)
+
+
+def query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path: str) -> Dict[str, str]:
+    """Read a manifest as either ``{sha256: query}`` or a list of query strings."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    if isinstance(raw, list):
+        return {query_hash(q): q for q in raw if isinstance(q, str)}
+    if isinstance(raw, dict):
+        out: Dict[str, str] = {}
+        for digest, query in raw.items():
+            if not isinstance(query, str):
+                continue
+            if query_hash(query) != str(digest).lower():
+                logger.warning("Persisted query manifest entry %s does not match its query; skipped", digest)
+                continue
+            out[str(digest).lower()] = query
+        return out
+    return {}
+
+
+class PersistedQueryStore:
+    """Bounded LRU of hash -> query text; manifest entries are pinned."""
+
+    def __init__(self, maxsize: int = 1000, pinned: Optional[Dict[str, str]] = None) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self._pinned: Dict[str, str] = dict(pinned or {})
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest: str) -> Optional[str]:
+        pinned = self._pinned.get(digest)
+        if pinned is not None:
+            return pinned
+        with self._lock:
+            query = self._lru.get(digest)
+            if query is not None:
+                self._lru.move_to_end(digest)
+            return query
+
+    def put(self, digest: str, query: str) -> None:
+        if digest in self._pinned:
+            return
+        with self._lock:
+            self._lru[digest] = query
+            self._lru.move_to_end(digest)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def is_pinned(self, digest: str) -> bool:
+        return digest in self._pinned
+
+    def __len__(self) -> int:
+        return len(self._pinned) + len(self._lru)
+
+
+def _error(message: str, code: str) -> GraphQLError:
+    return GraphQLError(message, extensions={"code": code})
+
+
+class PersistedQueriesExtension(SchemaExtension):
+    """Resolve APQ hashes to documents and enforce the allowlist when enabled."""
+
+    def __init__(self, store: PersistedQueryStore, allowlist_only: bool = False) -> None:
+        self.store = store
+        self.allowlist_only = allowlist_only
+
+    def on_operation(self) -> Iterator[None]:
+        ctx = self.execution_context
+        ext = (ctx.operation_extensions or {}).get("persistedQuery")
+        digest: Optional[str] = None
+        if isinstance(ext, dict):
+            if int(ext.get("version") or 1) != 1:
+                raise _error("Unsupported persisted query version", "PERSISTED_QUERY_NOT_SUPPORTED")
+            digest = str(ext.get("sha256Hash") or "").strip().lower()
+            if ctx.query is None:
+                query = self.store.get(digest)
+                if query is None:
+                    raise _error("PersistedQueryNotFound", "PERSISTED_QUERY_NOT_FOUND")
+                ctx.query = query
+            else:
+                if query_hash(ctx.query) != digest:
+                    raise _error("provided sha does not match query", "PERSISTED_QUERY_HASH_MISMATCH")
+                if not self.allowlist_only:
+                    self.store.put(digest, ctx.query)
+        if self.allowlist_only and ctx.query is not None:
+            if digest is None:
+                digest = query_hash(ctx.query)
+            if not self.store.is_pinned(digest):
+                raise _error("Query is not in the persisted query allowlist", "PERSISTED_QUERY_NOT_ALLOWED")
+        yield
+
+
+def build_persisted_queries_extension(mode: str, manifest_path: Optional[str], maxsize: int) -> Optional[PersistedQueriesExtension]:
+    """Return the extension for GRAPHQL_PERSISTED_QUERIES (off|apq|allowlist)."""
+    normalized = (mode or "").strip().lower()
+    if normalized in ("", "0", "off", "false", "none"):
+        return None
+    pinned: Dict[str, str] = {}
+    if manifest_path:
+        if os.path.exists(manifest_path):
+            pinned = load_manifest(manifest_path)
+        else:
+            logger.warning("Persisted query manifest %s not found", manifest_path)
+    if normalized == "allowlist":
+        if not pinned:
+            raise RuntimeError("GRAPHQL_PERSISTED_QUERIES=allowlist requires a non-empty GRAPHQL_PERSISTED_QUERIES_PATH manifest.")
+        return PersistedQueriesExtension(PersistedQueryStore(maxsize, pinned), allowlist_only=True)
+    if normalized != "apq":
+        raise RuntimeError(f"Unsupported GRAPHQL_PERSISTED_QUERIES='{mode}'. Allowed values: off, apq, allowlist.")
+    return PersistedQueriesExtension(PersistedQueryStore(maxsize, pinned), allowlist_only=False)
@@ -5,7 +5,7 @@ import json
 import os
 import shutil
 from functools import lru_cache
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import unicodedata
 
 import yaml
@@ -306,6 +306,34 @@ def list_policy_levers(family: Optional[str] = None, search: Optional[str] = Non
     return results
 
 
+# (family, normalized search) -> (catalog it was built from, levers, id -> position)
+_compiled_levers: Dict[Tuple[Optional[str], Optional[str]], Tuple[list, Tuple[dict, ...], Dict[str, int]]] = {}
+_COMPILED_LEVERS_MAX = 128
+
+
+def compiled_policy_levers(
+    family: Optional[str] = None, search: Optional[str] = None
+) -> Tuple[Tuple[dict, ...], Dict[str, int]]:
+    """
+    Filtered levers in catalog order plus an id -> position index.
+
+    Built once per catalog load and filter, so paginated reads seek by id
+    instead of re-normalizing the whole catalog. Callers must not mutate the
+    returned levers.
+    """
+    catalog = load_policy_catalog()
+    key = (family, _normalize_search(search) if search else None)
+    hit = _compiled_levers.get(key)
+    if hit is not None and hit[0] is catalog:
+        return hit[1], hit[2]
+    items = tuple(list_policy_levers(family, search))
+    index = {str(it.get("id")): pos for pos, it in enumerate(items)}
+    if len(_compiled_levers) >= _COMPILED_LEVERS_MAX:
+        _compiled_levers.clear()
+    _compiled_levers[key] = (catalog, items, index)
+    return items, index
+
+
 def suggest_levers_for_mass(mass_id: str, limit: int = 5) -> List[dict]:
     """
     Return a list of policy levers relevant to a specific budget mass/mission.
@@ -0,0 +1,188 @@
+"""Background pre-computation of the most-voted scenarios.
+
+Popular scenarios are the ones most likely to be opened, shared and compared.
+On a timer a daemon thread reads the top-N scenario ids from the vote store
+(its cached leaderboard) and, for each one not warm yet, fills:
+
+- the scenario result cache (full engine run, default lens), used by
+  ``scenario(id)`` and ``scenarioCompare``;
+- the stored share-card summary (``shareCard``);
+- the compare-vs-baseline breakdown and baseline run (``scenarioCompare(a)``).
+
+The warmer is a background citizen: its thread runs at the lowest OS priority
+where supported, stays under a CPU budget (a fraction of one core, measured
+with the thread's CPU clock) and skips work while scenario requests are queued
+by admission control.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .metrics import counter_lines
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Leave the instance time to serve its first requests before the first pass
+_STARTUP_DELAY_SEC = 5.0
+
+
+def _lower_thread_priority() -> None:
+    # Linux applies nice values per thread (native id); elsewhere this is a no-op
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+def _live_scenario_backlog() -> int:
+    """Scenario-engine requests waiting for an admission slot right now."""
+    try:
+        from .admission import get_admission_gates
+
+        if not get_settings().admission_control_enabled:
+            return 0
+        return sum(gate.queue_depth() for gate in get_admission_gates().values())
+    except Exception:
+        return 0
+
+
+def warm_scenario(sid: str) -> bool:
+    """Fill the caches for one stored scenario; False when it was already warm or is unknown."""
+    from . import schema as gql_schema
+    from .scenario_cache import compare_key, get_scenario_result_cache, run_key
+    from .share_summary import ensure_share_summary, load_share_summary
+    from .store import scenario_dsl_store
+
+    cache = get_scenario_result_cache()
+    dsl = scenario_dsl_store.get(sid)
+    if not dsl:
+        return False
+    lens_key = gql_schema._scenario_lens(dsl)
+    warm = (
+        (cache is None or (run_key(sid, lens_key) in cache and compare_key(sid, None) in cache))
+        and load_share_summary(sid) is not None
+    )
+    if warm:
+        return False
+    _sid, acc, comp, _macro, reso, _warnings = gql_schema._cached_scenario_run(sid, dsl)
+    ensure_share_summary(sid, dsl, (acc, comp, reso))
+    if cache is not None and compare_key(sid, None) not in cache:
+        year = gql_schema._scenario_year(dsl)
+        gql_schema._cached_baseline_run(year)
+        deltas = gql_schema._scenario_compare_deltas(dsl, gql_schema._baseline_dsl(year))
+        cache.put(compare_key(sid, None), deltas)
+    return True
+
+
+class PopularScenarioPrewarmer:
+    """Periodically warm the top-N voted scenarios within a CPU budget."""
+
+    def __init__(self, top_n: int = 20, interval_sec: float = 300.0, cpu_budget: float = 0.25) -> None:
+        self.top_n = max(0, int(top_n))
+        self.interval_sec = max(1.0, float(interval_sec))
+        # Fraction of one core the warmer may use on average
+        self.cpu_budget = min(1.0, max(0.01, float(cpu_budget)))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"runs": 0, "warmed": 0, "skipped": 0, "errors": 0, "deferred": 0}
+        self._cpu_sec = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += n
+
+    def _throttle(self, cpu_used: float) -> None:
+        # Sleep long enough that cpu_used / (cpu_used + pause) <= budget
+        pause = cpu_used * (1.0 - self.cpu_budget) / self.cpu_budget
+        if pause > 0:
+            self._stop.wait(pause)
+
+    def top_scenarios(self) -> List[str]:
+        from .votes_store import get_vote_store
+
+        return [row.scenario_id for row in get_vote_store().summary(limit=self.top_n)]
+
+    def run_once(self) -> int:
+        """Warm the current top-N; returns how many scenarios were computed."""
+        self._count("runs")
+        try:
+            sids = self.top_scenarios()
+        except Exception as exc:
+            self._count("errors")
+            logger.warning("Scenario prewarm could not read vote summary: %s", exc)
+            return 0
+        warmed = 0
+        for sid in sids:
+            if self._stop.is_set():
+                break
+            if _live_scenario_backlog() > 0:
+                # Live requests are waiting for the engine: yield this pass
+                self._count("deferred")
+                break
+            started = time.thread_time()
+            try:
+                did = warm_scenario(sid)
+            except Exception as exc:
+                self._count("errors")
+                logger.warning("Scenario prewarm failed for %s: %s", sid, exc)
+                did = False
+            cpu_used = time.thread_time() - started
+            with self._lock:
+                self._cpu_sec += cpu_used
+            if did:
+                warmed += 1
+                self._count("warmed")
+                self._throttle(cpu_used)
+            else:
+                self._count("skipped")
+        return warmed
+
+    def _run(self) -> None:
+        _lower_thread_priority()
+        if self._stop.wait(min(_STARTUP_DELAY_SEC, self.interval_sec)):
+            return
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval_sec)
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cbl-scenario-prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5.0)
+        self._thread = None
+
+    def metrics_lines(self) -> List[str]:
+        with self._lock:
+            stats = dict(self.stats)
+            cpu_sec = self._cpu_sec
+        lines = [f"cbl_scenario_prewarm_cpu_seconds_total {cpu_sec:.3f}"]
+        return lines + counter_lines("cbl_scenario_prewarm", stats)
+
+
+def build_prewarmer() -> PopularScenarioPrewarmer:
+    settings = get_settings()
+    return PopularScenarioPrewarmer(
+        top_n=settings.scenario_prewarm_top_n,
+        interval_sec=settings.scenario_prewarm_interval_sec,
+        cpu_budget=settings.scenario_prewarm_cpu_budget,
+    )
@@ -0,0 +1,416 @@
+"""Full-response cache for idempotent GraphQL queries.
+
+Reference-data queries (allocation, LEGO pieces/baseline, builder masses, policy
+levers, the 2026 baseline, EU COFOG comparisons) are pure functions of their
+arguments for a given data vintage. Responses are cached under
+``(document hash, operation name, variables, data vintage)`` in two tiers:
+
+- an in-process LRU with a TTL (always on when the cache is enabled);
+- an optional shared tier (``SharedResponseCache``) so Cloud Run instances
+  reuse each other's payloads. ``RedisResponseCache`` speaks the Redis protocol
+  (RESP) over a plain socket, so no client library is required.
+
+Shared-tier failures degrade to a miss; they never fail the request.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from graphql import ExecutionResult, FieldNode, OperationDefinitionNode, OperationType
+from strawberry.extensions import SchemaExtension
+
+from .executors import run_io
+from .metrics import counter_lines
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Root fields whose result depends only on arguments and the data vintage.
+CACHEABLE_FIELDS = frozenset(
+    {
+        "allocation",
+        "legoPieces",
+        "legoPiecesConnection",
+        "legoBaseline",
+        "builderMasses",
+        "policyLevers",
+        "policyLeversConnection",
+        "budgetBaseline2026",
+        "euCofogCompare",
+    }
+)
+
+_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+_VINTAGE_SUFFIXES = (".json", ".csv", ".yaml", ".yml", ".duckdb")
+_VINTAGE_TTL_SEC = 5.0
+_vintage_lock = threading.Lock()
+_vintage_state: Dict[str, Any] = {"value": None, "at": 0.0, "warehouse": None, "stamp": None}
+
+
+def _fingerprint_dir(path: str, h: "hashlib._Hash") -> None:
+    try:
+        entries = sorted(os.scandir(path), key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        # Vote stores live next to the snapshots but do not feed cached queries
+        if entry.name.startswith("votes") or not entry.name.endswith(_VINTAGE_SUFFIXES):
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        h.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns};".encode("utf-8"))
+
+
+def _compute_vintage() -> Tuple[str, str]:
+    settings = get_settings()
+    if settings.data_vintage:
+        return settings.data_vintage, settings.duckdb_path
+    h = hashlib.sha256()
+    # Cloud Run bakes snapshots into the image: a new revision is a new vintage
+    h.update(os.getenv("K_REVISION", "").encode("utf-8"))
+    _fingerprint_dir(_DATA_DIR, h)
+    _fingerprint_dir(os.path.join(_DATA_DIR, "cache"), h)
+    try:
+        st = os.stat(settings.duckdb_path)
+        h.update(f"warehouse:{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+    except OSError:
+        pass
+    return h.hexdigest()[:16], settings.duckdb_path
+
+
+def _quick_stamp(warehouse_path: str) -> Tuple[int, ...]:
+    # Directory mtimes move on create/delete/rename, so swapped snapshots are seen at once
+    out = []
+    for path in (_DATA_DIR, os.path.join(_DATA_DIR, "cache"), warehouse_path):
+        try:
+            out.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            out.append(0)
+    return tuple(out)
+
+
+def data_vintage() -> str:
+    """Fingerprint of the data snapshots served by cacheable queries.
+
+    DATA_VINTAGE pins it explicitly. Otherwise it is derived from the size and
+    mtime of the snapshot files, re-derived whenever a directory changes and at
+    least every few seconds (to catch files rewritten in place).
+    """
+    now = time.monotonic()
+    with _vintage_lock:
+        value = _vintage_state["value"]
+        warehouse_path = _vintage_state.get("warehouse") or ""
+        fresh = value is not None and now - _vintage_state["at"] < _VINTAGE_TTL_SEC
+        stamp = _vintage_state.get("stamp")
+    if fresh and stamp == _quick_stamp(warehouse_path):
+        return value
+    value, warehouse_path = _compute_vintage()
+    with _vintage_lock:
+        _vintage_state.update(value=value, at=now, warehouse=warehouse_path, stamp=_quick_stamp(warehouse_path))
+    return value
+
+
+def response_cache_key(query: str, operation_name: Optional[str], variables: Optional[dict], vintage: str) -> str:
+    h = hashlib.sha256()
+    h.update(query.encode("utf-8"))
+    h.update(b"\0")
+    h.update((operation_name or "").encode("utf-8"))
+    h.update(b"\0")
+    h.update(json.dumps(variables or {}, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"))
+    h.update(b"\0")
+    h.update(vintage.encode("utf-8"))
+    return "cbl:gql:" + h.hexdigest()
+
+
+class SharedResponseCache:
+    """Interface for the shared (cross-instance) tier. Values are JSON bytes."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl_sec: float) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:  # pragma: no cover - optional
+        return None
+
+
+class RedisError(RuntimeError):
+    pass
+
+
+class RedisResponseCache(SharedResponseCache):
+    """Minimal RESP client (GET / SET PX) for ``redis://[:password@]host[:port][/db]``."""
+
+    def __init__(self, url: str, timeout: float = 0.5, retry_after_sec: float = 30.0) -> None:
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", ""):
+            raise ValueError(f"Unsupported response cache URL scheme '{parsed.scheme}'")
+        self.host = parsed.hostname or "localhost"
+        self.port = int(parsed.port or 6379)
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.strip("/") or 0)
+        self.timeout = timeout
+        self.retry_after_sec = retry_after_sec
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader: Any = None
+        self._down_until = 0.0
+
+    def _connect(self) -> None:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._reader = sock.makefile("rb")
+        if self.password:
+            self._roundtrip(b"AUTH", self.password.encode("utf-8"))
+        if self.db:
+            self._roundtrip(b"SELECT", str(self.db).encode("ascii"))
+
+    def _disconnect(self) -> None:
+        for closer in (self._reader, self._sock):
+            try:
+                if closer is not None:
+                    closer.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._reader = None
+
+    def _roundtrip(self, *parts: bytes) -> Any:
+        assert self._sock is not None
+        out = [b"*%d\r\n" % len(parts)]
+        for part in parts:
+            out.append(b"$%d\r\n%s\r\n" % (len(part), part))
+        self._sock.sendall(b"".join(out))
+        return self._read_reply()
+
+    def _read_reply(self) -> Any:
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise RedisError("connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body
+        if kind == b"-":
+            raise RedisError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RedisError(f"unexpected reply {line[:16]!r}")
+
+    def _command(self, *parts: bytes) -> Any:
+        with self._lock:
+            if time.monotonic() < self._down_until:
+                raise RedisError("shared cache unavailable")
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._roundtrip(*parts)
+            except (OSError, RedisError, ValueError):
+                self._disconnect()
+                self._down_until = time.monotonic() + self.retry_after_sec
+                raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command(b"GET", key.encode("utf-8"))
+
+    def set(self, key: str, value: bytes, ttl_sec: float) -> None:
+        px = str(max(1, int(ttl_sec * 1000))).encode("ascii")
+        self._command(b"SET", key.encode("utf-8"), value, b"PX", px)
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+
+class ResponseCache:
+    """In-process TTL LRU in front of an optional shared tier."""
+
+    def __init__(self, maxsize: int = 512, ttl_sec: float = 300.0, shared: Optional[SharedResponseCache] = None) -> None:
+        self.maxsize = max(0, int(maxsize))
+        self.ttl_sec = float(ttl_sec)
+        self.shared = shared
+        self._lru: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hit_local": 0, "hit_shared": 0, "miss": 0, "store": 0, "shared_errors": 0}
+
+    def _get_local(self, key: str) -> Any:
+        if not self.maxsize:
+            return None
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < time.monotonic():
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return data
+
+    def _put_local(self, key: str, data: Any, ttl_sec: float) -> None:
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._lru[key] = (time.monotonic() + ttl_sec, data)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def get(self, key: str) -> Any:
+        data = self._get_local(key)
+        if data is not None:
+            self.stats["hit_local"] += 1
+            return data
+        if self.shared is not None:
+            try:
+                raw = self.shared.get(key)
+            except Exception as exc:
+                self.stats["shared_errors"] += 1
+                logger.debug("Shared response cache get failed: %s", exc)
+                raw = None
+            if raw is not None:
+                try:
+                    data = json.loads(raw)
+                except ValueError:
+                    data = None
+                if data is not None:
+                    self.stats["hit_shared"] += 1
+                    self._put_local(key, data, self.ttl_sec)
+                    return data
+        self.stats["miss"] += 1
+        return None
+
+    def put(self, key: str, data: Any) -> None:
+        self.stats["store"] += 1
+        self._put_local(key, data, self.ttl_sec)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, json.dumps(data, separators=(",", ":")).encode("utf-8"), self.ttl_sec)
+            except Exception as exc:
+                self.stats["shared_errors"] += 1
+                logger.debug("Shared response cache set failed: %s", exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def metrics_lines(self) -> List[str]:
+        lines = [f"cbl_graphql_response_cache_entries {len(self._lru)}"]
+        return lines + counter_lines("cbl_graphql_response_cache", self.stats)
+
+    def close(self) -> None:
+        if self.shared is not None:
+            self.shared.close()
+
+
+def response_cache_enabled() -> bool:
+    settings = get_settings()
+    return settings.graphql_response_cache_size > 0 or bool(settings.graphql_response_cache_url)
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> Optional[ResponseCache]:
+    if not response_cache_enabled():
+        return None
+    settings = get_settings()
+    shared: Optional[SharedResponseCache] = None
+    if settings.graphql_response_cache_url:
+        shared = RedisResponseCache(settings.graphql_response_cache_url)
+    return ResponseCache(
+        maxsize=settings.graphql_response_cache_size,
+        ttl_sec=settings.graphql_response_cache_ttl_sec,
+        shared=shared,
+    )
+
+
+def close_response_cache() -> None:
+    if get_response_cache.cache_info().currsize:
+        cache = get_response_cache()
+        if cache is not None:
+            cache.close()
+    get_response_cache.cache_clear()
+
+
+def is_cacheable_operation(document: Any, operation_name: Optional[str]) -> bool:
+    """True when the selected operation is a query over CACHEABLE_FIELDS only."""
+    ops = [d for d in getattr(document, "definitions", []) if isinstance(d, OperationDefinitionNode)]
+    if operation_name:
+        ops = [d for d in ops if d.name is not None and d.name.value == operation_name]
+    if len(ops) != 1 or ops[0].operation != OperationType.QUERY:
+        return False
+    fields = ops[0].selection_set.selections
+    if not fields:
+        return False
+    for sel in fields:
+        # Root fragments are rare enough that we just skip caching them
+        if not isinstance(sel, FieldNode):
+            return False
+        if sel.name.value != "__typename" and sel.name.value not in CACHEABLE_FIELDS:
+            return False
+    return True
+
+
+def _http_request_and_response(context: Any) -> Tuple[Any, Any]:
+    if isinstance(context, dict):
+        return context.get("request"), context.get("response")
+    return getattr(context, "request", None), getattr(context, "response", None)
+
+
+class ResponseCacheExtension(SchemaExtension):
+    """Serve cacheable queries from ResponseCache and set Cache-Control on GET."""
+
+    async def on_execute(self):  # noqa: ANN201
+        ctx = self.execution_context
+        cache = get_response_cache()
+        cacheable = (
+            cache is not None
+            and ctx.query is not None
+            and is_cacheable_operation(ctx.graphql_document, ctx.operation_name)
+        )
+        request, response = _http_request_and_response(ctx.context)
+        if response is not None and getattr(request, "method", None) == "GET":
+            response.headers["Cache-Control"] = (
+                f"public, max-age={int(cache.ttl_sec)}" if cacheable and cache is not None else "no-store"
+            )
+        if not cacheable or cache is None:
+            yield
+            return
+
+        key = response_cache_key(ctx.query, ctx.operation_name, ctx.variables, data_vintage())
+        data = await run_io(cache.get, key) if cache.shared is not None else cache.get(key)
+        if data is not None:
+            ctx.result = ExecutionResult(data=data)
+            yield
+            return
+        yield
+        result = ctx.result
+        if isinstance(result, ExecutionResult) and not result.errors and result.data is not None:
+            if cache.shared is not None:
+                await run_io(cache.put, key, result.data)
+            else:
+                cache.put(key, result.data)
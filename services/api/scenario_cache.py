@@ -0,0 +1,96 @@
+"""In-process cache of stored-scenario evaluations.
+
+Stored scenarios are content-addressed (the id is a hash of the canonical DSL),
+so the engine run for a ``(sid, lens)`` pair only changes with the data vintage,
+which is part of every key. Entries remember the engine stages they hold: a
+request needing a subset of them is a hit. The compare-vs-baseline breakdown of
+``scenarioCompare`` is cached alongside.
+
+Entries are filled on demand by ``scenario``/``shareCard``/``scenarioCompare``
+and ahead of time for the most-voted scenarios by ``prewarm``.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+from .metrics import counter_lines
+from .response_cache import data_vintage
+from .settings import get_settings
+
+
+def run_key(sid: str, lens: str) -> Tuple[Hashable, ...]:
+    return ("run", str(sid), str(lens).upper(), data_vintage())
+
+
+def baseline_run_key(year: int) -> Tuple[Hashable, ...]:
+    return ("baseline", int(year), data_vintage())
+
+
+def compare_key(a: str, b: Optional[str]) -> Tuple[Hashable, ...]:
+    return ("compare", str(a), str(b) if b else None, data_vintage())
+
+
+class ScenarioResultCache:
+    """Thread-safe LRU of engine results tagged with the stages they cover."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self._lru: "OrderedDict[Hashable, Tuple[Optional[FrozenSet[str]], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hit": 0, "miss": 0, "store": 0}
+
+    def get(self, key: Hashable, needs: Optional[Iterable[str]] = None) -> Any:
+        """Cached value for ``key`` if it holds at least ``needs`` (None = every stage)."""
+        wanted = None if needs is None else frozenset(needs)
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                held, value = entry
+                if held is None or (wanted is not None and wanted <= held):
+                    self._lru.move_to_end(key)
+                    self.stats["hit"] += 1
+                    return value
+            self.stats["miss"] += 1
+            return None
+
+    def put(self, key: Hashable, value: Any, needs: Optional[Iterable[str]] = None) -> None:
+        held = None if needs is None else frozenset(needs)
+        with self._lock:
+            entry = self._lru.get(key)
+            # Never replace a full evaluation by a partial one
+            if entry is not None and entry[0] is None and held is not None:
+                return
+            self._lru[key] = (held, value)
+            self._lru.move_to_end(key)
+            self.stats["store"] += 1
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._lru
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def metrics_lines(self) -> List[str]:
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._lru)
+        lines = [f"cbl_scenario_result_cache_entries {entries}"]
+        return lines + counter_lines("cbl_scenario_result_cache", stats)
+
+
+@lru_cache(maxsize=1)
+def get_scenario_result_cache() -> Optional[ScenarioResultCache]:
+    size = int(get_settings().scenario_result_cache_size)
+    if size <= 0:
+        return None
+    return ScenarioResultCache(size)
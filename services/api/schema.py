@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
+import itertools
 import logging
 import math
+import operator
 import re
 import time
-from typing import List, Optional
+from typing import Any, Callable, Generic, Iterable, List, Optional, Sequence, TypeVar
 
 import strawberry
 from strawberry.scalars import JSON
+from strawberry.schema.config import StrawberryConfig
+from strawberry.types.nodes import SelectedField
 
 from .data_loader import (
     allocation_by_mission,
@@ -19,10 +24,13 @@ from .data_loader import (
     procurement_top_suppliers,
     run_scenario,
     list_sources,
-    lego_pieces_with_baseline,
+    lego_piece_index,
     load_lego_baseline,
     lego_distance_from_dsl,
 )
+from .admission import COMPARE, SCENARIO, admit, admitted
+from .executors import offload_cpu, offload_io, run_cpu, run_io
+from .loaders import DataLoadersExtension, get_loaders, load_scenario_dsl
 from .models import Basis, MissionAllocation
 from .clients import insee as insee_client
 from .clients import data_gouv as datagouv_client
@@ -191,6 +199,19 @@ class ProcurementItemType:
     companySize: Optional[str]
 
 
+def _procurement_item_type(i: Any) -> ProcurementItemType:
+    return ProcurementItemType(
+        supplier=SupplierType(siren=i.supplier.siren, name=i.supplier.name),
+        amountEur=i.amount_eur,
+        cpv=i.cpv,
+        procedureType=i.procedure_type,
+        locationCode=getattr(i, "location_code", None),
+        sourceUrl=getattr(i, "source_url", None),
+        naf=getattr(i, "naf", None),
+        companySize=getattr(i, "company_size", None),
+    )
+
+
 @strawberry.type
 class AccountingType:
     deficitPath: List[float]
@@ -243,6 +264,61 @@ class VoteSummaryType:
     lastVoteTs: float | None = None
 
 
+@strawberry.type
+class SavedScenarioType:
+    id: strawberry.ID
+    title: str
+    description: str
+    createdAt: str | None = None
+
+
+NodeT = TypeVar("NodeT")
+
+
+@strawberry.type
+class PageInfoType:
+    hasNextPage: bool
+    hasPreviousPage: bool
+    startCursor: str | None = None
+    endCursor: str | None = None
+
+
+@strawberry.type
+class Edge(Generic[NodeT]):
+    cursor: str
+    node: NodeT
+
+
+@strawberry.type
+class Connection(Generic[NodeT]):
+    """Relay-style page; cursors are opaque (see services/api/pagination.py)."""
+
+    edges: List[Edge[NodeT]]
+    pageInfo: PageInfoType
+
+
+def _connection(
+    rows: Sequence[Any],
+    key: Callable[[Any], Sequence[Any]],
+    node: Callable[[Any], Any],
+    *,
+    has_next: bool,
+    after: str | None,
+) -> Connection:
+    from .pagination import encode_cursor
+
+    edges = [Edge(cursor=encode_cursor(key(row)), node=node(row)) for row in rows]
+    return Connection(
+        edges=edges,
+        pageInfo=PageInfoType(
+            hasNextPage=has_next,
+            hasPreviousPage=after is not None,
+            startCursor=edges[0].cursor if edges else None,
+            endCursor=edges[-1].cursor if edges else None,
+        ),
+    )
+
+
 @strawberry.type
 class SourceType:
     id: str
@@ -352,6 +428,28 @@ class LegoPieceType:
     familyId: str | None
 
 
+def _lego_piece_type(i: dict) -> LegoPieceType:
+    return LegoPieceType(
+        id=i["id"],
+        label=i.get("label") or i["id"],
+        type=i.get("type") or "expenditure",
+        description=i.get("description"),
+        amountEur=i.get("amount_eur"),
+        share=i.get("share"),
+        cofogMajors=[str(x) for x in (i.get("cofog_majors") or [])],
+        missions=[
+            MissionWeightType(code=str(m.get("code")), weight=float(m.get("weight", 0.0)))
+            for m in (i.get("missions") or [])
+            if m.get("code")
+        ],
+        beneficiaries=i.get("beneficiaries") or {},
+        examples=list(i.get("examples") or []),
+        sources=list(i.get("sources") or []),
+        locked=bool(i.get("locked", False)),
+        familyId=i.get("family_id"),
+    )
+
+
 @strawberry.type
 class CofogWeightType:
     code: str
@@ -499,6 +597,55 @@ class PolicyLeverType:
     distributionalFlags: JSON | None = None
 
 
+def _policy_lever_type(it: dict) -> PolicyLeverType:
+    return PolicyLeverType(
+        id=str(it.get("id")),
+        family=PolicyFamilyEnum(str(it.get("family", "OTHER"))),
+        budgetSide=BudgetSideEnum(str(it.get("budget_side", "SPENDING"))),
+        majorAmendment=bool(it.get("major_amendment", False)),
+        label=str(it.get("label")),
+        description=str(it.get("description") or ""),
+        paramsSchema=it.get("params_schema") or {},
+        fixedImpactEur=it.get("fixed_impact_eur"),
+        feasibility=it.get("feasibility") or {},
+        conflictsWith=[str(x) for x in (it.get("conflicts_with") or [])],
+        sources=[str(x) for x in (it.get("sources") or [])],
+        shortLabel=str(it.get("short_label") or ""),
+        popularity=float(it.get("popularity", 0.0)),
+        massMapping=it.get("cofog_mapping") or it.get("mass_mapping") or {},
+        cofogMapping=it.get("cofog_mapping") or it.get("mass_mapping") or {},
+        missionMapping=it.get("mission_mapping") or {},
+        impact=(
+            ImpactStructType(
+                householdsImpacted=it["impact"].get("householdsImpacted"),
+                decile1ImpactEur=it["impact"].get("decile1ImpactEur"),
+                decile10ImpactEur=it["impact"].get("decile10ImpactEur"),
+                gdpImpactPct=it["impact"].get("gdpImpactPct"),
+                jobsImpactCount=it["impact"].get("jobsImpactCount"),
+            )
+            if it.get("impact")
+            else None
+        ),
+        multiYearImpact=it.get("multi_year_impact"),
+        pushbacks=[
+            PushbackType(
+                type=str(p.get("type")),
+                description=str(p.get("description")),
+                source=p.get("source"),
+            )
+            for p in (it.get("pushbacks") or [])
+        ] if it.get("pushbacks") else None,
+        vigilancePoints=it.get("vigilance_points"),
+        authoritativeSources=it.get("authoritative_sources"),
+        targetRevenueCategoryId=(
+            strawberry.ID(it["target_revenue_category_id"])
+            if it.get("target_revenue_category_id")
+            else None
+        ),
+        distributionalFlags=it.get("distributional_flags"),
+    )
+
+
 @strawberry.type
 class BudgetBaselineMissionType:
     missionCode: str
@@ -559,9 +706,433 @@ class IntentType:
     tags: list[str]
 
 
+_RATIO_FIELDS = {"deficitRatioPath", "baselineDeficitRatioPath", "debtRatioPath", "baselineDebtRatioPath"}
+
+
+def _selected_fields(selections: Iterable) -> Iterable[SelectedField]:
+    """Flatten fragment spreads and inline fragments into plain fields."""
+    for sel in selections:
+        if isinstance(sel, SelectedField):
+            yield sel
+        else:
+            yield from _selected_fields(getattr(sel, "selections", None) or [])
+
+
+def _scenario_needs(selections: Iterable) -> set[str]:
+    """Map a RunScenarioPayload selection set to run_scenario stages."""
+    needs: set[str] = set()
+    for field in _selected_fields(selections):
+        if field.name == "accounting":
+            for sub in _selected_fields(field.selections):
+                needs.add("ratios" if sub.name in _RATIO_FIELDS else "accounting")
+        elif field.name == "compliance":
+            for sub in _selected_fields(field.selections):
+                needs.add("local_balance" if sub.name == "localBalance" else "compliance")
+        elif field.name in ("macro", "resolution"):
+            needs.add(field.name)
+    return needs
+
+
+def _info_needs(info: strawberry.Info, *payload_fields: str) -> frozenset[str] | None:
+    """Stages needed by the current field, or None (everything) if unknown.
+
+    With ``payload_fields`` the current field returns a wrapper type and only
+    those sub-fields (e.g. ``a``/``b`` of scenarioCompare) are payloads.
+    """
+    try:
+        selections = info.selected_fields[0].selections
+    except (AttributeError, IndexError):
+        return None
+    if payload_fields:
+        nested = [f.selections for f in _selected_fields(selections) if f.name in payload_fields]
+        selections = [sel for group in nested for sel in group]
+    return frozenset(_scenario_needs(selections))
+
+
+def _share_summary_type(scenario_id: str, summary: dict) -> ShareSummaryType:
+    from .store import scenario_store
+
+    title = scenario_store.get(scenario_id, {}).get("title") or f"Scenario {scenario_id[:8]}"
+    return ShareSummaryType(title=title, **summary)
+
+
+def _scenario_lens(dsl: str) -> str:
+    """Lens a stored scenario is evaluated with (as run_scenario resolves it)."""
+    import base64 as _b64
+    import yaml as _yaml
+
+    try:
+        dsl_obj = _yaml.safe_load(_b64.b64decode(dsl).decode("utf-8")) or {}
+    except Exception:
+        dsl_obj = {}
+    if not isinstance(dsl_obj, dict):
+        dsl_obj = {}
+    assumptions = dsl_obj.get("assumptions") or {}
+    lens_key = str(assumptions.get("lens") or dsl_obj.get("lens") or "MISSION").upper()
+    if lens_key not in {"MISSION", "COFOG"}:
+        lens_key = "MISSION"
+    return lens_key
+
+
+async def _evaluate_stored_scenario(sid: str, dsl: str, needs: Iterable[str] | None = None) -> tuple:
+    """run_scenario() for a stored scenario.
+
+    Served from the scenario result cache when it holds the requested stages;
+    otherwise coalesced with concurrent calls for the same sid and lens.
+    """
+    from .scenario_cache import get_scenario_result_cache, run_key
+    from .singleflight import get_scenario_flights
+
+    lens_key = _scenario_lens(dsl)
+    wanted = None if needs is None else frozenset(needs)
+    cache = get_scenario_result_cache()
+    key = run_key(sid, lens_key)
+    if cache is not None:
+        cached = cache.get(key, wanted)
+        if cached is not None:
+            return cached
+    results = await get_scenario_flights().do(
+        ("scenario", sid, lens_key),
+        lambda: run_cpu(run_scenario, dsl, lens=lens_key, needs=wanted, process_safe=True),
+        needs=wanted,
+    )
+    if cache is not None:
+        cache.put(key, results, wanted)
+    return results
+
+
+def _cached_scenario_run(sid: str | None, dsl: str, needs: Iterable[str] | None = None) -> tuple:
+    """Synchronous run_scenario() through the scenario result cache (default lens)."""
+    from .scenario_cache import get_scenario_result_cache, run_key
+
+    lens_key = _scenario_lens(dsl)
+    cache = get_scenario_result_cache() if sid else None
+    if cache is None:
+        return run_scenario(dsl, lens=lens_key, needs=needs)
+    key = run_key(str(sid), lens_key)
+    cached = cache.get(key, needs)
+    if cached is None:
+        cached = run_scenario(dsl, lens=lens_key, needs=needs)
+        cache.put(key, cached, needs)
+    return cached
+
+
+def _scenario_year(dsl: str) -> int:
+    import json as _json
+
+    try:
+        data = _json.loads(base64.b64decode(dsl).decode("utf-8"))
+        return int(data.get("baseline_year", 2026))
+    except Exception:
+        return 2026
+
+
+def _baseline_dsl(year: int) -> str:
+    """Empty scenario (no actions) used as the compare-vs-baseline reference."""
+    import json as _json
+
+    empty = _json.dumps({"version": 0.1, "baseline_year": year, "assumptions": {"horizon_years": 3}, "actions": []})
+    return base64.b64encode(empty.encode("utf-8")).decode("ascii")
+
+
+def _cached_baseline_run(year: int, needs: Iterable[str] | None = None) -> tuple:
+    from .scenario_cache import baseline_run_key, get_scenario_result_cache
+
+    cache = get_scenario_result_cache()
+    if cache is None:
+        return run_scenario(_baseline_dsl(year), needs=needs)
+    key = baseline_run_key(year)
+    cached = cache.get(key, needs)
+    if cached is None:
+        cached = run_scenario(_baseline_dsl(year), needs=needs)
+        cache.put(key, cached, needs)
+    return cached
+
+
+def _scenario_payload_from_results(dsl: str, results: tuple) -> RunScenarioPayload:
+    sid, acc, comp, macro, reso, warnings = results
+    lens_key = str(reso.get("lens") or "MISSION").upper()
+
+    return RunScenarioPayload(
+        id=strawberry.ID(sid),
+        scenarioId=strawberry.ID(sid),
+        accounting=AccountingType(
+            deficitPath=acc.deficit_path,
+            debtPath=acc.debt_path,
+            commitmentsPath=acc.commitments_path or [],
+            deficitDeltaPath=acc.deficit_delta_path or [],
+            debtDeltaPath=acc.debt_delta_path or [],
+            baselineDeficitPath=acc.baseline_deficit_path or [],
+            baselineDebtPath=acc.baseline_debt_path or [],
+            gdpPath=acc.gdp_path or [],
+            deficitRatioPath=acc.deficit_ratio_path or [],
+            baselineDeficitRatioPath=acc.baseline_deficit_ratio_path or [],
+            debtRatioPath=acc.debt_ratio_path or [],
+            baselineDebtRatioPath=acc.baseline_debt_ratio_path or [],
+        ),
+        compliance=ComplianceType(
+            eu3pct=comp.eu3pct,
+            eu60pct=comp.eu60pct,
+            netExpenditure=comp.net_expenditure,
+            localBalance=comp.local_balance,
+        ),
+        macro=MacroType(
+            deltaGDP=macro.delta_gdp,
+            deltaEmployment=macro.delta_employment,
+            deltaDeficit=macro.delta_deficit,
+            assumptions={k: v for k, v in macro.assumptions.items()},
+        ),
+        resolution=ResolutionType(
+            overallPct=float(reso.get("overallPct", 0.0)),
+            byMass=[
+                MassTargetType(
+                    massId=str(e.get("massId")),
+                    targetDeltaEur=float(e.get("targetDeltaEur", 0.0)),
+                    specifiedDeltaEur=float(e.get("specifiedDeltaEur", 0.0)),
+                    cpTargetDeltaEur=(
+                        float(e["cpTargetDeltaEur"])
+                        if e.get("cpTargetDeltaEur") is not None
+                        else None
+                    ),
+                    cpSpecifiedDeltaEur=(
+                        float(e["cpSpecifiedDeltaEur"])
+                        if e.get("cpSpecifiedDeltaEur") is not None
+                        else None
+                    ),
+                    cpDeltaEur=(
+                        float(e["cpDeltaEur"])
+                        if e.get("cpDeltaEur") is not None
+                        else None
+                    ),
+                    unspecifiedCpDeltaEur=(
+                        float(e["unspecifiedCpDeltaEur"])
+                        if e.get("unspecifiedCpDeltaEur") is not None
+                        else None
+                    ),
+                )
+                for e in reso.get("byMass", [])
+            ],
+            lens=(LensEnum.ADMIN if lens_key == "MISSION" else LensEnum.COFOG),
+        ),
+        warnings=warnings,
+        dsl=dsl,
+    )
+
+
+def _scenario_compare_result(
+    a: str, dsl_a: str, b: str | None, dsl_b: str | None, needs: Iterable[str] | None = None
+) -> "ScenarioCompareResultType":
+    sid_a, acc_a, comp_a, macro_a, reso_a, _warn_a = _cached_scenario_run(a, dsl_a, needs)
+
+    # If b is missing, compare against baseline (no actions)
+    if b:
+        sid_b, acc_b, comp_b, macro_b, reso_b, _warn_b = _cached_scenario_run(b, dsl_b, needs)
+    else:
+        # Empty scenario with the same baseline_year
+        year = _scenario_year(dsl_a)
+        dsl_b = _baseline_dsl(year)
+        sid_b, acc_b, comp_b, macro_b, reso_b, _warn_b = _cached_baseline_run(year, needs)
+
+    scenario_a_payload = RunScenarioPayload(
+        id=strawberry.ID(sid_a),
+        scenarioId=strawberry.ID(sid_a),
+        accounting=AccountingType(
+            deficitPath=acc_a.deficit_path,
+            debtPath=acc_a.debt_path,
+            commitmentsPath=acc_a.commitments_path or [],
+            deficitDeltaPath=acc_a.deficit_delta_path or [],
+            debtDeltaPath=acc_a.debt_delta_path or [],
+            baselineDeficitPath=acc_a.baseline_deficit_path or [],
+            baselineDebtPath=acc_a.baseline_debt_path or [],
+            gdpPath=acc_a.gdp_path or [],
+            deficitRatioPath=acc_a.deficit_ratio_path or [],
+            baselineDeficitRatioPath=acc_a.baseline_deficit_ratio_path or [],
+            debtRatioPath=acc_a.debt_ratio_path or [],
+            baselineDebtRatioPath=acc_a.baseline_debt_ratio_path or [],
+        ),
+        compliance=ComplianceType(
+            eu3pct=comp_a.eu3pct,
+            eu60pct=comp_a.eu60pct,
+            netExpenditure=comp_a.net_expenditure,
+            localBalance=comp_a.local_balance,
+        ),
+        macro=MacroType(
+            deltaGDP=macro_a.delta_gdp,
+            deltaEmployment=macro_a.delta_employment,
+            deltaDeficit=macro_a.delta_deficit,
+            assumptions={k: v for k, v in macro_a.assumptions.items()},
+        ),
+        resolution=ResolutionType(
+            overallPct=float(reso_a.get("overallPct", 0.0)),
+            byMass=[
+                MassTargetType(
+                    massId=str(e.get("massId")),
+                    targetDeltaEur=float(e.get("targetDeltaEur", 0.0)),
+                    specifiedDeltaEur=float(e.get("specifiedDeltaEur", 0.0)),
+                )
+                for e in reso_a.get("byMass", [])
+            ],
+            lens=(
+                LensEnum.ADMIN
+                if str(reso_a.get("lens", "MISSION")).upper() == "MISSION"
+                else LensEnum.COFOG
+            ),
+        ),
+    )
+
+    scenario_b_payload = RunScenarioPayload(
+        id=strawberry.ID(sid_b),
+        scenarioId=strawberry.ID(sid_b),
+        accounting=AccountingType(
+            deficitPath=acc_b.deficit_path,
+            debtPath=acc_b.debt_path,
+            commitmentsPath=acc_b.commitments_path or [],
+            deficitDeltaPath=acc_b.deficit_delta_path or [],
+            debtDeltaPath=acc_b.debt_delta_path or [],
+            baselineDeficitPath=acc_b.baseline_deficit_path or [],
+            baselineDebtPath=acc_b.baseline_debt_path or [],
+            gdpPath=acc_b.gdp_path or [],
+            deficitRatioPath=acc_b.deficit_ratio_path or [],
+            baselineDeficitRatioPath=acc_b.baseline_deficit_ratio_path or [],
+            debtRatioPath=acc_b.debt_ratio_path or [],
+            baselineDebtRatioPath=acc_b.baseline_debt_ratio_path or [],
+        ),
+        compliance=ComplianceType(
+            eu3pct=comp_b.eu3pct,
+            eu60pct=comp_b.eu60pct,
+            netExpenditure=comp_b.net_expenditure,
+            localBalance=comp_b.local_balance,
+        ),
+        macro=MacroType(
+            deltaGDP=macro_b.delta_gdp,
+            deltaEmployment=macro_b.delta_employment,
+            deltaDeficit=macro_b.delta_deficit,
+            assumptions={k: v for k, v in macro_b.assumptions.items()},
+        ),
+        resolution=ResolutionType(
+            overallPct=float(reso_b.get("overallPct", 0.0)),
+            byMass=[
+                MassTargetType(
+                    massId=str(e.get("massId")),
+                    targetDeltaEur=float(e.get("targetDeltaEur", 0.0)),
+                    specifiedDeltaEur=float(e.get("specifiedDeltaEur", 0.0)),
+                )
+                for e in reso_b.get("byMass", [])
+            ],
+            lens=(
+                LensEnum.ADMIN
+                if str(reso_b.get("lens", "MISSION")).upper() == "MISSION"
+                else LensEnum.COFOG
+            ),
+        ),
+    )
+
+    return ScenarioCompareResultType(
+        a=scenario_a_payload, b=scenario_b_payload, dsl_a=dsl_a, dsl_b=dsl_b, ids=(str(a), str(b) if b else None)
+    )
+
+
+def _mission_labels() -> dict[str, str]:
+    import json as _json
+    import os as _os
+    from .data_loader import DATA_DIR
+
+    mission_labels: dict[str, str] = {}
+    try:
+        with open(_os.path.join(DATA_DIR, "ux_labels.json"), "r", encoding="utf-8") as f:
+            labels_js = _json.load(f)
+        for ent in labels_js.get("missions", []):
+            mission_labels[str(ent.get("id"))] = str(ent.get("displayLabel") or ent.get("id"))
+    except Exception:
+        mission_labels = {}
+    return mission_labels
+
+
+# Pairwise cells grow quadratically: 25 scenarios are 25 + 300 breakdowns
+SCENARIO_MATRIX_MAX_IDS = 25
+
+
+class _PieceDeltaMatrix:
+    """Per-scenario piece deltas vs the baseline, aligned on one piece index.
+
+    The baseline is loaded once for all scenarios; the delta of A vs B is then
+    an element-wise difference of two vectors, projected onto missions through
+    the piece -> mission weights of the LEGO config.
+    """
+
+    def __init__(self, year: int, dsls: Sequence[str]) -> None:
+        from .data_loader import mission_bridges, piece_amounts_after_dsls
+
+        base, scenarios = piece_amounts_after_dsls(year, dsls)
+        keys: set[str] = set(base)
+        for amounts in scenarios:
+            keys.update(amounts)
+        self.pieces = sorted(keys)
+        self.vectors = [
+            [amounts.get(pid, 0.0) - base.get(pid, 0.0) for pid in self.pieces] for amounts in scenarios
+        ]
+        mission_map, _cofog_to_mission = mission_bridges()
+        self.projection = [mission_map.get(pid) or [] for pid in self.pieces]
+        self.zero = [0.0] * len(self.pieces)
+
+    def breakdown(self, i: int, j: int | None = None) -> tuple[list[dict], list[dict]]:
+        """Ribbons and waterfall of scenario ``i`` minus scenario ``j`` (None = baseline)."""
+        other = self.zero if j is None else self.vectors[j]
+        ribbons: list[dict] = []
+        mass_totals: dict[str, float] = {}
+        for pid, missions, dv in zip(self.pieces, self.projection, map(operator.sub, self.vectors[i], other)):
+            if abs(dv) <= 0 or not missions:
+                continue
+            for mission_code, weight in missions:
+                amt = float(dv) * float(weight)
+                ribbons.append({"pieceId": pid, "massId": mission_code, "amountEur": amt})
+                mass_totals[mission_code] = mass_totals.get(mission_code, 0.0) + amt
+        waterfall = [{"massId": k, "deltaEur": float(v)} for k, v in mass_totals.items()]
+        waterfall.sort(key=lambda x: abs(x["deltaEur"]), reverse=True)
+        return ribbons, waterfall
+
+
+def _scenario_compare_deltas(dsl_a: str, dsl_b: str) -> dict:
+    """Piece ribbons, mass waterfall and labels for scenarioCompare (A minus B)."""
+    year = _scenario_year(dsl_a)
+    # Piece delta of A vs B: (scen_a - base) - (scen_b - base), baseline from LEGO
+    matrix = _PieceDeltaMatrix(year, [dsl_a, dsl_b])
+    ribbons, waterfall = matrix.breakdown(0, 1)
+    piece_labels = lego_piece_index(year).labels()
+    return {"waterfall": waterfall, "ribbons": ribbons, "pieceLabels": piece_labels, "massLabels": _mission_labels()}
+
+
+def _scenario_matrix(sids: Sequence[str], dsls: Sequence[str], needs: Iterable[str] | None = None) -> "ScenarioMatrixType":
+    years = {_scenario_year(dsl) for dsl in dsls}
+    if len(years) > 1:
+        raise ValueError("scenarioMatrix needs scenarios with the same baseline_year")
+    year = years.pop()
+    baseline = _cached_baseline_run(year, needs)
+    runs = [_cached_scenario_run(sid, dsl, needs) for sid, dsl in zip(sids, dsls)]
+    matrix = _PieceDeltaMatrix(year, dsls)
+    cells: list[ScenarioMatrixCellType] = []
+    for i, sid in enumerate(sids):
+        ribbons, waterfall = matrix.breakdown(i)
+        cells.append(ScenarioMatrixCellType(a=strawberry.ID(sid), b=None, waterfall=waterfall, ribbons=ribbons))
+    for i, j in itertools.combinations(range(len(sids)), 2):
+        ribbons, waterfall = matrix.breakdown(i, j)
+        cells.append(
+            ScenarioMatrixCellType(a=strawberry.ID(sids[i]), b=strawberry.ID(sids[j]), waterfall=waterfall, ribbons=ribbons)
+        )
+    return ScenarioMatrixType(
+        ids=[strawberry.ID(sid) for sid in sids],
+        scenarios=[_scenario_payload_from_results(dsl, run) for dsl, run in zip(dsls, runs)],
+        baseline=_scenario_payload_from_results(_baseline_dsl(year), baseline),
+        cells=cells,
+        pieceLabels=lego_piece_index(year).labels(),
+        massLabels=_mission_labels(),
+    )
+
+
 @strawberry.type
 class Query:
     @strawberry.field
+    @offload_io
     def allocation(self, year: int, basis: BasisEnum = BasisEnum.CP, lens: LensEnum = LensEnum.ADMIN) -> AllocationType:
         if lens == LensEnum.ADMIN:
             alloc = allocation_by_mission(year, Basis(basis.value))
@@ -649,6 +1220,7 @@ class Query:
             )
 
     @strawberry.field
+    @offload_io
     def allocationProgramme(self, year: int, basis: BasisEnum = BasisEnum.CP, missionCode: str = "") -> list[MissionAllocationType]:  # noqa: N802
         from .data_loader import allocation_by_programme as _by_prog  # type: ignore
 
@@ -659,6 +1231,7 @@ class Query:
         ]
 
     @strawberry.field
+    @offload_io
     def cofogSubfunctions(self, year: int, country: str = "FR", major: str = "07") -> list[MissionAllocationType]:  # noqa: N802
         from .data_loader import allocation_by_cofog_subfunctions as _by_sub  # type: ignore
 
@@ -669,6 +1242,7 @@ class Query:
         ]
 
     @strawberry.field
+    @offload_io
     def procurement(
         self,
         year: int,
@@ -686,19 +1260,44 @@ class Query:
             min_amount_eur=minAmountEur,
             max_amount_eur=maxAmountEur,
         )
-        return [
-            ProcurementItemType(
-                supplier=SupplierType(siren=i.supplier.siren, name=i.supplier.name),
-                amountEur=i.amount_eur,
-                cpv=i.cpv,
-                procedureType=i.procedure_type,
-                locationCode=getattr(i, "location_code", None),
-                sourceUrl=getattr(i, "source_url", None),
-                naf=getattr(i, "naf", None),
-                companySize=getattr(i, "company_size", None),
-            )
-            for i in items
-        ]
+        return [_procurement_item_type(i) for i in items]
+
+    @strawberry.field
+    @offload_io
+    def procurementConnection(  # noqa: N802
+        self,
+        year: int,
+        region: str,
+        cpvPrefix: Optional[str] = None,  # noqa: N803
+        procedureType: Optional[str] = None,
+        minAmountEur: Optional[float] = None,
+        maxAmountEur: Optional[float] = None,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> Connection[ProcurementItemType]:
+        """Suppliers ordered by (amount desc, SIREN); pages seek past the cursor key."""
+        from .pagination import decode_cursor, page_size, trim_page
+
+        limit = page_size(first)
+        key = decode_cursor(after, 2)
+        rows = procurement_top_suppliers(
+            year,
+            region,
+            top_n=limit + 1,
+            cpv_prefix=cpvPrefix,
+            procedure_type=procedureType,
+            min_amount_eur=minAmountEur,
+            max_amount_eur=maxAmountEur,
+            after=(float(key[0]), str(key[1])) if key else None,
+        )
+        page, has_next = trim_page(rows, limit)
+        return _connection(
+            page,
+            lambda i: [float(i.amount_eur), str(i.supplier.siren)],
+            _procurement_item_type,
+            has_next=has_next,
+            after=after,
+        )
 
     @strawberry.field
     def sources(self) -> List[SourceType]:
@@ -717,31 +1316,37 @@ class Query:
 
     # Official APIs
     @strawberry.field
+    @offload_io
     def sirene(self, siren: str) -> JSON:
         """Lookup basic company info by SIREN via INSEE SIRENE API."""
         return insee_client.sirene_by_siren(siren)
 
     @strawberry.field
+    @offload_io
     def inseeSeries(self, dataset: str, series: List[str], sinceYear: int | None = None) -> JSON:  # noqa: N802
         """Fetch INSEE BDM series."""
         since = str(sinceYear) if sinceYear else None
         return insee_client.bdm_series(dataset, series, since)
 
     @strawberry.field
+    @offload_io
     def dataGouvSearch(self, query: str, pageSize: int = 5) -> JSON:  # noqa: N802
         return datagouv_client.search_datasets(query, page_size=pageSize)
 
     @strawberry.field
+    @offload_io
     def communes(self, department: str) -> JSON:
         return geo_client.communes_by_departement(department)
 
     @strawberry.field
+    @offload_io
     def commune(self, code: str) -> JSON:
         """Lookup a commune by INSEE code (geo.api.gouv.fr)."""
         return geo_client.commune_by_code(code)
 
     # V1 stubs (EU comparisons)
     @strawberry.field
+    @offload_io
     def euCofogCompare(self, year: int, countries: List[str], level: int = 1) -> List[EUCountryCofogType]:  # noqa: N802
         # Try warmed cache first if present, then Eurostat live fetch; on failure, fall back to local FR mapping
         import os
@@ -831,57 +1436,80 @@ class Query:
         return FiscalPathType(years=years, deficitRatio=def_ratios, debtRatio=debt_ratios)
 
     @strawberry.field
+    @offload_io
     def legoPieces(self, year: int, scope: ScopeEnum = ScopeEnum.S13) -> list[LegoPieceType]:
-        items = lego_pieces_with_baseline(year, scope.value)
-        return [
-            LegoPieceType(
-                id=i["id"],
-                label=i.get("label") or i["id"],
-                type=i.get("type") or "expenditure",
-                description=i.get("description"),
-                amountEur=i.get("amount_eur"),
-                share=i.get("share"),
-                cofogMajors=[str(x) for x in (i.get("cofog_majors") or [])],
-                missions=[
-                    MissionWeightType(code=str(m.get("code")), weight=float(m.get("weight", 0.0)))
-                    for m in (i.get("missions") or [])
-                    if m.get("code")
-                ],
-                beneficiaries=i.get("beneficiaries") or {},
-                examples=list(i.get("examples") or []),
-                sources=list(i.get("sources") or []),
-                locked=bool(i.get("locked", False)),
-                familyId=i.get("family_id"),
-            )
-            for i in items
-        ]
+        return [_lego_piece_type(i) for i in lego_piece_index(year, scope.value).pieces]
+
+    @strawberry.field
+    @offload_io
+    def legoPiecesConnection(  # noqa: N802
+        self,
+        year: int,
+        scope: ScopeEnum = ScopeEnum.S13,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> Connection[LegoPieceType]:
+        """LEGO pieces in configuration order, served from the per-vintage piece index."""
+        from .pagination import decode_cursor, page_size, slice_after
+
+        index = lego_piece_index(year, scope.value)
+        key = decode_cursor(after, 1)
+        page, has_next = slice_after(index.pieces, index.positions, key[0] if key else None, page_size(first))
+        return _connection(page, lambda i: [i["id"]], _lego_piece_type, has_next=has_next, after=after)
 
     @strawberry.field
-    def savedScenarios(self) -> JSON:  # noqa: N802
-        """List saved scenarios with basic metadata (id, title, description)."""
+    @offload_io
+    def savedScenarios(self, limit: int = 50) -> JSON:  # noqa: N802
+        """List the most recent saved scenarios with basic metadata (id, title, description)."""
         try:
-            from .store import scenario_store
-
-            out = []
-            for sid, meta in scenario_store.items():
-                out.append({
-                    "id": sid,
-                    "title": meta.get("title") or "",
-                    "description": meta.get("description") or "",
-                })
-            return out
+            from .pagination import page_size
+            from .votes_store import get_vote_store
+
+            return [
+                {
+                    "id": row.scenario_id,
+                    "title": row.meta.get("title") or "",
+                    "description": row.meta.get("description") or "",
+                }
+                for row in get_vote_store().list_scenarios(limit=page_size(limit))
+            ]
         except Exception:
             return []
 
     @strawberry.field
+    @offload_io
+    def savedScenariosConnection(  # noqa: N802
+        self, first: Optional[int] = None, after: Optional[str] = None
+    ) -> Connection[SavedScenarioType]:
+        """Saved scenarios, newest first (keyset on created_at, id)."""
+        from .pagination import decode_cursor, page_size, trim_page
+        from .votes_store import get_vote_store
+
+        limit = page_size(first)
+        key = decode_cursor(after, 2)
+        rows = get_vote_store().list_scenarios(
+            limit=limit + 1, after=(str(key[0] or ""), str(key[1])) if key else None
+        )
+        page, has_next = trim_page(rows, limit)
+        return _connection(
+            page,
+            lambda row: [row.created_at, row.scenario_id],
+            lambda row: SavedScenarioType(
+                id=strawberry.ID(row.scenario_id),
+                title=str(row.meta.get("title") or ""),
+                description=str(row.meta.get("description") or ""),
+                createdAt=row.created_at,
+            ),
+            has_next=has_next,
+            after=after,
+        )
+
+    @strawberry.field
+    @offload_io
     def explainPiece(self, id: str, year: int, scope: ScopeEnum = ScopeEnum.S13) -> ExplainPieceType:  # noqa: N802
         """Explain a LEGO piece: mapping, bounds, baseline, beneficiaries, sources."""
-        from .data_loader import load_lego_config as _cfg, lego_pieces_with_baseline as _lp
-
-        cfg = _cfg() or {}
-        by_id = {str(p.get("id")): p for p in (cfg.get("pieces") or [])}
-        p = by_id.get(id)
-        if not p:
+        piece = lego_piece_index(year, scope.value).get(id)
+        if not piece:
             # Return an empty shell to avoid errors
             return ExplainPieceType(
                 id=id,
@@ -899,6 +1527,7 @@ class Query:
                 elasticity={},
                 sources=[],
             )
+        p = piece["config"]
         mapping = p.get("mapping") or {}
         cof = []
         for ent in (mapping.get("cofog") or []):
@@ -912,22 +1541,9 @@ class Query:
                 nai.append(NaItemWeightType(code=str(ent.get("code")), weight=float(ent.get("weight", 1.0))))
             except Exception:
                 continue
-        pol = p.get("policy") or {}
-        locked = bool(pol.get("locked_default", False))
-        bounds_pct = pol.get("bounds_pct") or {}
-        bounds_amt = pol.get("bounds_amount_eur") or {}
         elasticity = p.get("elasticity") or {}
-        # Baseline amount/share from warmed baseline
-        baseline_amt = None
-        baseline_share = None
-        try:
-            for it in _lp(year, scope.value):
-                if str(it.get("id")) == id:
-                    baseline_amt = it.get("amount_eur")
-                    baseline_share = it.get("share")
-                    break
-        except Exception:
-            pass
+        baseline_amt = piece.get("amount_eur")
+        baseline_share = piece.get("share")
         return ExplainPieceType(
             id=id,
             label=str(p.get("label") or id),
@@ -938,14 +1554,15 @@ class Query:
             naItems=nai,
             baselineAmountEur=(float(baseline_amt) if isinstance(baseline_amt, (int, float)) else None),
             baselineShare=(float(baseline_share) if isinstance(baseline_share, (int, float)) else None),
-            lockedDefault=locked,
-            boundsPct=bounds_pct,
-            boundsAmountEur=bounds_amt,
+            lockedDefault=bool(piece.get("locked", False)),
+            boundsPct=piece["bounds_pct"],
+            boundsAmountEur=piece["bounds_amount_eur"],
             elasticity=elasticity,
             sources=[str(x) for x in (p.get("sources") or [])],
         )
 
     @strawberry.field
+    @offload_io
     def legoBaseline(self, year: int, scope: ScopeEnum = ScopeEnum.S13) -> LegoBaselineType:  # noqa: N802
         # Prefer warehouse, fallback to warmed JSON
         bl: dict
@@ -1050,6 +1667,7 @@ class Query:
         )
 
     @strawberry.field
+    @offload_io
     def builderMasses(self, year: int, lens: LensEnum = LensEnum.ADMIN) -> list[BuilderMassType]:  # noqa: N802
         from .data_loader import builder_mass_allocation as _builder_mass
 
@@ -1070,6 +1688,7 @@ class Query:
         return out
 
     @strawberry.field
+    @offload_cpu
     def legoDistance(self, year: int, dsl: str, scope: ScopeEnum = ScopeEnum.S13) -> DistanceType:  # noqa: N802
         res = lego_distance_from_dsl(year, dsl, scope.value)
         return DistanceType(
@@ -1086,60 +1705,29 @@ class Query:
         from . import policy_catalog as pol
 
         fam = family.value if family else None
-        items = pol.list_policy_levers(fam, search)
-        out: list[PolicyLeverType] = []
-        for it in items:
-            out.append(
-                PolicyLeverType(
-                    id=str(it.get("id")),
-                    family=PolicyFamilyEnum(str(it.get("family", "OTHER"))),
-                    budgetSide=BudgetSideEnum(str(it.get("budget_side", "SPENDING"))),
-                    majorAmendment=bool(it.get("major_amendment", False)),
-                    label=str(it.get("label")),
-                    description=str(it.get("description") or ""),
-                    paramsSchema=it.get("params_schema") or {},
-                    fixedImpactEur=it.get("fixed_impact_eur"),
-                    feasibility=it.get("feasibility") or {},
-                    conflictsWith=[str(x) for x in (it.get("conflicts_with") or [])],
-                    sources=[str(x) for x in (it.get("sources") or [])],
-                    shortLabel=str(it.get("short_label") or ""),
-                    popularity=float(it.get("popularity", 0.0)),
-                    massMapping=it.get("cofog_mapping") or it.get("mass_mapping") or {},
-                    cofogMapping=it.get("cofog_mapping") or it.get("mass_mapping") or {},
-                    missionMapping=it.get("mission_mapping") or {},
-                    impact=(
-                        ImpactStructType(
-                            householdsImpacted=it["impact"].get("householdsImpacted"),
-                            decile1ImpactEur=it["impact"].get("decile1ImpactEur"),
-                            decile10ImpactEur=it["impact"].get("decile10ImpactEur"),
-                            gdpImpactPct=it["impact"].get("gdpImpactPct"),
-                            jobsImpactCount=it["impact"].get("jobsImpactCount"),
-                        )
-                        if it.get("impact")
-                        else None
-                    ),
-                    multiYearImpact=it.get("multi_year_impact"),
-                    pushbacks=[
-                        PushbackType(
-                            type=str(p.get("type")),
-                            description=str(p.get("description")),
-                            source=p.get("source"),
-                        )
-                        for p in (it.get("pushbacks") or [])
-                    ] if it.get("pushbacks") else None,
-                    vigilancePoints=it.get("vigilance_points"),
-                    authoritativeSources=it.get("authoritative_sources"),
-                    targetRevenueCategoryId=(
-                        strawberry.ID(it["target_revenue_category_id"])
-                        if it.get("target_revenue_category_id")
-                        else None
-                    ),
-                    distributionalFlags=it.get("distributional_flags"),
-                )
-            )
-        return out
+        items, _index = pol.compiled_policy_levers(fam, search)
+        return [_policy_lever_type(it) for it in items]
+
+    @strawberry.field
+    def policyLeversConnection(  # noqa: N802
+        self,
+        family: "PolicyFamilyEnum | None" = None,
+        search: str | None = None,
+        first: Optional[int] = None,
+        after: Optional[str] = None,
+    ) -> Connection[PolicyLeverType]:
+        """Policy levers in catalog order, paged over the compiled catalog."""
+        from . import policy_catalog as pol
+        from .pagination import decode_cursor, page_size, slice_after
+
+        fam = family.value if family else None
+        items, index = pol.compiled_policy_levers(fam, search)
+        key = decode_cursor(after, 1)
+        page, has_next = slice_after(items, index, key[0] if key else None, page_size(first))
+        return _connection(page, lambda it: [str(it.get("id"))], _policy_lever_type, has_next=has_next, after=after)
 
     @strawberry.field
+    @offload_io
     def budgetBaseline2026(self) -> list[BudgetBaselineMissionType]:  # noqa: N802
         from . import warehouse_client as _wh
 
@@ -1268,11 +1856,15 @@ class Query:
         return out
 
     @strawberry.field
-    def voteSummary(self, limit: int = 25) -> list[VoteSummaryType]:  # noqa: N802
+    async def voteSummary(self, limit: int = 25) -> list[VoteSummaryType]:  # noqa: N802
         try:
-            from .votes_store import get_vote_store
+            from .votes_store import get_async_vote_store, get_vote_store
 
-            summaries = get_vote_store().summary(limit=limit)
+            async_store = get_async_vote_store()
+            if async_store is not None:
+                summaries = await async_store.summary(limit=limit)
+            else:
+                summaries = await run_io(get_vote_store().summary, limit=limit)
             return [
                 VoteSummaryType(
                     scenarioId=strawberry.ID(s.scenario_id),
@@ -1284,130 +1876,54 @@ class Query:
         except Exception:
             return []
 
+    @strawberry.field
+    @offload_io
+    def voteSummaryConnection(  # noqa: N802
+        self, first: Optional[int] = None, after: Optional[str] = None
+    ) -> Connection[VoteSummaryType]:
+        """Most-voted scenarios ordered by (votes desc, scenario id)."""
+        from .pagination import decode_cursor, page_size, trim_page
+        from .votes_store import get_vote_store
+
+        limit = page_size(first)
+        key = decode_cursor(after, 2)
+        rows = get_vote_store().summary(limit=limit + 1, after=(int(key[0]), str(key[1])) if key else None)
+        page, has_next = trim_page(rows, limit)
+        return _connection(
+            page,
+            lambda s: [int(s.votes), s.scenario_id],
+            lambda s: VoteSummaryType(scenarioId=strawberry.ID(s.scenario_id), votes=int(s.votes), lastVoteTs=s.last_vote_ts),
+            has_next=has_next,
+            after=after,
+        )
+
     # Suggest levers for a mass id
     @strawberry.field
     def suggestLevers(self, massId: str, limit: int = 5) -> list["PolicyLeverType"]:  # noqa: N802
         from . import policy_catalog as pol
         items = pol.suggest_levers_for_mass(massId, limit)
-        out: list[PolicyLeverType] = []
-        for it in items:
-            out.append(
-                PolicyLeverType(
-                    id=str(it.get("id")),
-                    family=PolicyFamilyEnum(str(it.get("family", "OTHER"))),
-                    budgetSide=BudgetSideEnum(str(it.get("budget_side", "SPENDING"))),
-                    majorAmendment=bool(it.get("major_amendment", False)),
-                    label=str(it.get("label")),
-                    description=str(it.get("description") or ""),
-                    paramsSchema=it.get("params_schema") or {},
-                    fixedImpactEur=it.get("fixed_impact_eur"),
-                    feasibility=it.get("feasibility") or {},
-                    conflictsWith=[str(x) for x in (it.get("conflicts_with") or [])],
-                    sources=[str(x) for x in (it.get("sources") or [])],
-                    shortLabel=str(it.get("short_label") or ""),
-                    popularity=float(it.get("popularity", 0.0)),
-                    massMapping=it.get("cofog_mapping") or it.get("mass_mapping") or {},
-                    cofogMapping=it.get("cofog_mapping") or it.get("mass_mapping") or {},
-                    missionMapping=it.get("mission_mapping") or {},
-                    impact=(
-                        ImpactStructType(
-                            householdsImpacted=it["impact"].get("householdsImpacted"),
-                            decile1ImpactEur=it["impact"].get("decile1ImpactEur"),
-                            decile10ImpactEur=it["impact"].get("decile10ImpactEur"),
-                            gdpImpactPct=it["impact"].get("gdpImpactPct"),
-                            jobsImpactCount=it["impact"].get("jobsImpactCount"),
-                        )
-                        if it.get("impact")
-                        else None
-                    ),
-                    multiYearImpact=it.get("multi_year_impact"),
-                    pushbacks=[
-                        PushbackType(
-                            type=str(p.get("type")),
-                            description=str(p.get("description")),
-                            source=p.get("source"),
-                        )
-                        for p in (it.get("pushbacks") or [])
-                    ] if it.get("pushbacks") else None,
-                    vigilancePoints=it.get("vigilance_points"),
-                    authoritativeSources=it.get("authoritative_sources"),
-                    targetRevenueCategoryId=(
-                        strawberry.ID(it["target_revenue_category_id"])
-                        if it.get("target_revenue_category_id")
-                        else None
-                    ),
-                    distributionalFlags=it.get("distributional_flags"),
-                )
-            )
-        return out
+        return [_policy_lever_type(it) for it in items]
 
     @strawberry.field
-    def shareCard(self, scenarioId: strawberry.ID) -> "ShareSummaryType":  # noqa: N802
+    async def shareCard(self, info: strawberry.Info, scenarioId: strawberry.ID) -> "ShareSummaryType":  # noqa: N802
         """Return a compact summary for OG images/permalinks.
 
-        If DSL is stored in-memory for this scenario id, recompute a minimal summary.
+        Served from the summary precomputed when the scenario was stored; older
+        scenarios are summarized from their stored DSL once and backfilled.
         """
-        from .store import scenario_dsl_store, scenario_store
-        from .data_loader import run_scenario as _run
+        from .share_summary import SHARE_SUMMARY_NEEDS, empty_share_summary, ensure_share_summary, load_share_summary
 
-        dsl = scenario_dsl_store.get(scenarioId)
+        sid = str(scenarioId)
+        summary = await run_io(load_share_summary, sid)
+        if summary is not None:
+            return _share_summary_type(sid, summary)
+        dsl = await load_scenario_dsl(info.context, scenarioId)
         if not dsl:
-            # Return placeholder summary
-            return ShareSummaryType(title=f"Scenario {scenarioId[:8]}", deficit=0.0, debtDeltaPct=0.0, highlight="", resolutionPct=0.0, masses={}, eu3="info", eu60="info")
-        # Run with 1-year horizon if not specified to get fast summary
-        sid, acc, comp, macro, reso, _warnings = _run(dsl)
-        title = scenario_store.get(sid, {}).get("title") or f"Scenario {sid[:8]}"
-        deficit = float(acc.deficit_path[0]) if acc.deficit_path else 0.0
-        # Debt delta ratio (pp) at horizon end vs baseline
-        debt_delta_pct = 0.0
-        try:
-            import json as _json
-            from . import baselines as _bl
-            data = _json.loads(base64.b64decode(dsl).decode("utf-8"))
-            baseline_year = int(data.get("baseline_year", 2026))
-            horizon_years = int((data.get("assumptions") or {}).get("horizon_years", 5))
-            end_year = baseline_year + max(0, horizon_years - 1)
-            base_def, base_debt = _bl.year_def_debt(end_year)
-            g = _bl.year_gdp(end_year)
-            scen_debt = float(base_debt) + float(acc.debt_path[-1] if acc.debt_path else 0.0)
-            base_ratio = (float(base_debt) / g) if g else 0.0
-            scen_ratio = (scen_debt / g) if g else 0.0
-            debt_delta_pct = (scen_ratio - base_ratio) * 100.0
-        except Exception:
-            debt_delta_pct = 0.0
-        # Mass shares baseline vs scenario
-        try:
-            from .data_loader import _piece_amounts_after_dsl as _pad, _mass_shares_from_piece_amounts as _ms
-            from .data_loader import load_lego_baseline as _load_bl
-            import json as _json
-            data = _json.loads(base64.b64decode(dsl).decode("utf-8"))
-            year = int(data.get("baseline_year", 2026))
-            base_amt, scen_amt = _pad(year, dsl)
-            base_sh = _ms(base_amt)
-            scen_sh = _ms(scen_amt)
-            masses = {}
-            # Top 5 by baseline share
-            for mid in sorted(base_sh.keys(), key=lambda k: base_sh[k], reverse=True)[:5]:
-                masses[mid] = {"base": float(base_sh[mid]), "scen": float(scen_sh.get(mid, 0.0))}
-        except Exception:
-            masses = {}
-        # Highlight: largest unresolved mass
-        hi = ""
-        try:
-            arr = reso.get("byMass") or []
-            best = None
-            for e in arr:
-                pend = abs(float(e.get("targetDeltaEur", 0.0))) - abs(float(e.get("specifiedDeltaEur", 0.0)))
-                if best is None or pend > best[0]:
-                    best = (pend, str(e.get("massId")))
-            if best and best[0] > 0:
-                hi = f"Pending {best[0]:,.0f}€ in {best[1]}"
-        except Exception:
-            pass
-        # EU lights first-year
-        eu3 = (comp.eu3pct[0] if comp.eu3pct else "info")
-        eu60 = (comp.eu60pct[0] if comp.eu60pct else "info")
-        return ShareSummaryType(title=title, deficit=deficit, debtDeltaPct=debt_delta_pct, highlight=hi, resolutionPct=float(reso.get("overallPct", 0.0)), masses=masses, eu3=eu3, eu60=eu60)
+            return _share_summary_type(sid, empty_share_summary())
+        # Backfill: the engine run is shared with concurrent scenario(id) requests
+        _sid, acc, comp, _macro, reso, _warnings = await _evaluate_stored_scenario(sid, dsl, SHARE_SUMMARY_NEEDS)
+        summary = await run_cpu(ensure_share_summary, sid, dsl, (acc, comp, reso))
+        return _share_summary_type(sid, summary)
 
     @strawberry.field
     def macroSeries(self, country: str = "FR") -> JSON:  # noqa: N802
@@ -1426,95 +1942,16 @@ class Query:
             return {}
 
     @strawberry.field
-    def scenario(self, id: strawberry.ID) -> RunScenarioPayload:
-        from .store import scenario_dsl_store
-        from .data_loader import run_scenario as _run
-
-        import base64 as _b64
-        import yaml as _yaml
-
-        dsl = scenario_dsl_store.get(id)
+    async def scenario(self, info: strawberry.Info, id: strawberry.ID) -> RunScenarioPayload:
+        dsl = await load_scenario_dsl(info.context, id)
         if not dsl:
             raise ValueError(f"Scenario {id} not found")
-
-        try:
-            dsl_obj = _yaml.safe_load(_b64.b64decode(dsl).decode("utf-8")) or {}
-        except Exception:
-            dsl_obj = {}
-        assumptions = dsl_obj.get("assumptions") or {}
-        lens_key = str(assumptions.get("lens") or dsl_obj.get("lens") or "MISSION").upper()
-        if lens_key not in {"MISSION", "COFOG"}:
-            lens_key = "MISSION"
-
-        sid, acc, comp, macro, reso, warnings = _run(dsl, lens=lens_key)
-        
-        return RunScenarioPayload(
-            id=strawberry.ID(sid),
-            scenarioId=strawberry.ID(sid),
-            accounting=AccountingType(
-                deficitPath=acc.deficit_path,
-                debtPath=acc.debt_path,
-                commitmentsPath=acc.commitments_path or [],
-                deficitDeltaPath=acc.deficit_delta_path or [],
-                debtDeltaPath=acc.debt_delta_path or [],
-                baselineDeficitPath=acc.baseline_deficit_path or [],
-                baselineDebtPath=acc.baseline_debt_path or [],
-                gdpPath=acc.gdp_path or [],
-                deficitRatioPath=acc.deficit_ratio_path or [],
-                baselineDeficitRatioPath=acc.baseline_deficit_ratio_path or [],
-                debtRatioPath=acc.debt_ratio_path or [],
-                baselineDebtRatioPath=acc.baseline_debt_ratio_path or [],
-            ),
-            compliance=ComplianceType(
-                eu3pct=comp.eu3pct,
-                eu60pct=comp.eu60pct,
-                netExpenditure=comp.net_expenditure,
-                localBalance=comp.local_balance,
-            ),
-            macro=MacroType(
-                deltaGDP=macro.delta_gdp,
-                deltaEmployment=macro.delta_employment,
-                deltaDeficit=macro.delta_deficit,
-                assumptions={k: v for k, v in macro.assumptions.items()},
-            ),
-            resolution=ResolutionType(
-                overallPct=float(reso.get("overallPct", 0.0)),
-                byMass=[
-                    MassTargetType(
-                        massId=str(e.get("massId")),
-                        targetDeltaEur=float(e.get("targetDeltaEur", 0.0)),
-                        specifiedDeltaEur=float(e.get("specifiedDeltaEur", 0.0)),
-                        cpTargetDeltaEur=(
-                            float(e["cpTargetDeltaEur"])
-                            if e.get("cpTargetDeltaEur") is not None
-                            else None
-                        ),
-                        cpSpecifiedDeltaEur=(
-                            float(e["cpSpecifiedDeltaEur"])
-                            if e.get("cpSpecifiedDeltaEur") is not None
-                            else None
-                        ),
-                        cpDeltaEur=(
-                            float(e["cpDeltaEur"])
-                            if e.get("cpDeltaEur") is not None
-                            else None
-                        ),
-                        unspecifiedCpDeltaEur=(
-                            float(e["unspecifiedCpDeltaEur"])
-                            if e.get("unspecifiedCpDeltaEur") is not None
-                            else None
-                        ),
-                    )
-                    for e in reso.get("byMass", [])
-                ],
-                lens=(LensEnum.ADMIN if lens_key == "MISSION" else LensEnum.COFOG),
-            ),
-            warnings=warnings,
-            dsl=dsl,
-        )
+        results = await _evaluate_stored_scenario(str(id), dsl, _info_needs(info))
+        return _scenario_payload_from_results(dsl, results)
 
     @strawberry.field
-    def scenarioCompare(self, a: strawberry.ID, b: strawberry.ID | None = None) -> "ScenarioCompareResultType":  # noqa: N802
+    @admitted(COMPARE)
+    async def scenarioCompare(self, info: strawberry.Info, a: strawberry.ID, b: strawberry.ID | None = None) -> "ScenarioCompareResultType":  # noqa: N802
         """Return ribbons and waterfall deltas between two scenarios (or vs baseline if b is None).
 
         Output shape (JSON):
@@ -1525,208 +1962,150 @@ class Query:
           "massLabels": { "M_HEALTH": "Santé", ... }
         }
         """
-        import json as _json
-        from .store import scenario_dsl_store
-        from .data_loader import (
-            DATA_DIR,
-            mission_bridges as _mission_bridges,
-            _piece_amounts_after_dsl as _pad,
-            load_lego_config as _cfg,
-            run_scenario as _run,
-        )
-
-        dsl_a = scenario_dsl_store.get(a)
+        ids = [str(a)] + ([str(b)] if b else [])
+        dsls = await get_loaders(info.context).scenario_dsl.load_many(ids)
+        dsl_a = dsls[0]
         if not dsl_a:
             raise ValueError(f"Scenario {a} not found")
+        dsl_b = dsls[1] if b else None
+        if b and not dsl_b:
+            raise ValueError(f"Scenario {b} not found")
+        return await run_cpu(_scenario_compare_result, str(a), dsl_a, b, dsl_b, _info_needs(info, "a", "b"))
 
-        sid_a, acc_a, comp_a, macro_a, reso_a, _warn_a = _run(dsl_a)
-        
-        # If b is missing, compare against baseline (no actions)
-        if b:
-            dsl_b = scenario_dsl_store.get(b)
-            if not dsl_b:
-                raise ValueError(f"Scenario {b} not found")
-            sid_b, acc_b, comp_b, macro_b, reso_b, _warn_b = _run(dsl_b)
-        else:
-            # Create empty scenario with same baseline_year
-            try:
-                data = _json.loads(base64.b64decode(dsl_a).decode("utf-8"))
-                year = int(data.get("baseline_year", 2026))
-            except Exception:
-                year = 2026
-            empty = _json.dumps({"version": 0.1, "baseline_year": year, "assumptions": {"horizon_years": 3}, "actions": []})
-            dsl_b = base64.b64encode(empty.encode("utf-8")).decode("ascii")
-            sid_b, acc_b, comp_b, macro_b, reso_b = _run(dsl_b)
+    @strawberry.field
+    @admitted(COMPARE)
+    async def scenarioMatrix(self, info: strawberry.Info, ids: List[strawberry.ID]) -> "ScenarioMatrixType":  # noqa: N802
+        """Compare many stored scenarios at once (e.g. party platforms).
 
-        # Year from a
-        try:
-            data = _json.loads(base64.b64decode(dsl_a).decode("utf-8"))
-            year = int(data.get("baseline_year", 2026))
-        except Exception:
-            year = 2026
-
-        base_a, scen_a = _pad(year, dsl_a)
-        base_b, scen_b = _pad(year, dsl_b)
-        # We want deltas of scenario A vs B: (scen_a - base_a) - (scen_b - base_b)
-        # Approximate piece delta as scen - base for each scenario (baseline from LEGO), then diff
-        delta_a = {k: scen_a.get(k, 0.0) - base_a.get(k, 0.0) for k in set(base_a) | set(scen_a)}
-        delta_b = {k: scen_b.get(k, 0.0) - base_b.get(k, 0.0) for k in set(base_b) | set(scen_b)}
-        piece_delta = {k: float(delta_a.get(k, 0.0) - delta_b.get(k, 0.0)) for k in set(delta_a) | set(delta_b)}
-
-        # Map piece deltas to mass majors via config weights
-        cfg = _cfg()
-        mission_map, cofog_to_mission = _mission_bridges()
-        piece_labels: dict[str, str] = {}
-        for p in cfg.get("pieces", []):
-            pid = str(p.get("id"))
-            piece_labels[pid] = str(p.get("label") or pid)
-        ribbons: list[dict] = []
-        mass_totals: dict[str, float] = {}
-        for pid, dv in piece_delta.items():
-            if abs(dv) <= 0:
-                continue
-            missions = mission_map.get(pid) or []
-            if not missions:
-                continue
-            for mission_code, weight in missions:
-                amt = float(dv) * float(weight)
-                ribbons.append({"pieceId": pid, "massId": mission_code, "amountEur": amt})
-                mass_totals[mission_code] = mass_totals.get(mission_code, 0.0) + amt
-        waterfall = [{"massId": k, "deltaEur": float(v)} for k, v in mass_totals.items()]
-        waterfall.sort(key=lambda x: abs(x["deltaEur"]), reverse=True)
-        # Mission labels
-        mission_labels: dict[str, str] = {}
-        try:
-            import os as _os
+        The baseline is evaluated once and each scenario once. ``cells`` holds
+        every scenario against the baseline (``b`` null), then every pair
+        ``(a, b)`` in ``ids`` order as A minus B; B minus A is its negation.
+        """
+        sids = list(dict.fromkeys(str(i) for i in ids))
+        if not sids:
+            raise ValueError("ids must not be empty")
+        if len(sids) > SCENARIO_MATRIX_MAX_IDS:
+            raise ValueError(f"scenarioMatrix accepts at most {SCENARIO_MATRIX_MAX_IDS} scenarios")
+        dsls = await get_loaders(info.context).scenario_dsl.load_many(sids)
+        for sid, dsl in zip(sids, dsls):
+            if not dsl:
+                raise ValueError(f"Scenario {sid} not found")
+        return await run_cpu(_scenario_matrix, sids, dsls, _info_needs(info, "scenarios", "baseline"))
+
+
+def _cached_compare_deltas(ids: tuple | None) -> dict | None:
+    from .scenario_cache import compare_key, get_scenario_result_cache
+
+    cache = get_scenario_result_cache()
+    if cache is None or not ids:
+        return None
+    return cache.get(compare_key(*ids))
 
-            with open(_os.path.join(DATA_DIR, "ux_labels.json"), "r", encoding="utf-8") as f:
-                labels_js = _json.load(f)
-            for ent in labels_js.get("missions", []):
-                mission_labels[str(ent.get("id"))] = str(ent.get("displayLabel") or ent.get("id"))
-        except Exception:
-            mission_labels = {}
-        
-        scenario_a_payload = RunScenarioPayload(
-            id=strawberry.ID(sid_a),
-            scenarioId=strawberry.ID(sid_a),
-            accounting=AccountingType(
-                deficitPath=acc_a.deficit_path,
-                debtPath=acc_a.debt_path,
-                commitmentsPath=acc_a.commitments_path or [],
-                deficitDeltaPath=acc_a.deficit_delta_path or [],
-                debtDeltaPath=acc_a.debt_delta_path or [],
-                baselineDeficitPath=acc_a.baseline_deficit_path or [],
-                baselineDebtPath=acc_a.baseline_debt_path or [],
-                gdpPath=acc_a.gdp_path or [],
-                deficitRatioPath=acc_a.deficit_ratio_path or [],
-                baselineDeficitRatioPath=acc_a.baseline_deficit_ratio_path or [],
-                debtRatioPath=acc_a.debt_ratio_path or [],
-                baselineDebtRatioPath=acc_a.baseline_debt_ratio_path or [],
-            ),
-            compliance=ComplianceType(
-                eu3pct=comp_a.eu3pct,
-                eu60pct=comp_a.eu60pct,
-                netExpenditure=comp_a.net_expenditure,
-                localBalance=comp_a.local_balance,
-            ),
-            macro=MacroType(
-                deltaGDP=macro_a.delta_gdp,
-                deltaEmployment=macro_a.delta_employment,
-                deltaDeficit=macro_a.delta_deficit,
-                assumptions={k: v for k, v in macro_a.assumptions.items()},
-            ),
-            resolution=ResolutionType(
-                overallPct=float(reso_a.get("overallPct", 0.0)),
-                byMass=[
-                    MassTargetType(
-                        massId=str(e.get("massId")),
-                        targetDeltaEur=float(e.get("targetDeltaEur", 0.0)),
-                        specifiedDeltaEur=float(e.get("specifiedDeltaEur", 0.0)),
-                    )
-                    for e in reso_a.get("byMass", [])
-                ],
-            ),
-        )
 
-        scenario_b_payload = RunScenarioPayload(
-            id=strawberry.ID(sid_b),
-            scenarioId=strawberry.ID(sid_b),
-            accounting=AccountingType(
-                deficitPath=acc_b.deficit_path,
-                debtPath=acc_b.debt_path,
-                commitmentsPath=acc_b.commitments_path or [],
-                deficitDeltaPath=acc_b.deficit_delta_path or [],
-                debtDeltaPath=acc_b.debt_delta_path or [],
-                baselineDeficitPath=acc_b.baseline_deficit_path or [],
-                baselineDebtPath=acc_b.baseline_debt_path or [],
-                gdpPath=acc_b.gdp_path or [],
-                deficitRatioPath=acc_b.deficit_ratio_path or [],
-                baselineDeficitRatioPath=acc_b.baseline_deficit_ratio_path or [],
-                debtRatioPath=acc_b.debt_ratio_path or [],
-                baselineDebtRatioPath=acc_b.baseline_debt_ratio_path or [],
-            ),
-            compliance=ComplianceType(
-                eu3pct=comp_b.eu3pct,
-                eu60pct=comp_b.eu60pct,
-                netExpenditure=comp_b.net_expenditure,
-                localBalance=comp_b.local_balance,
-            ),
-            macro=MacroType(
-                deltaGDP=macro_b.delta_gdp,
-                deltaEmployment=macro_b.delta_employment,
-                deltaDeficit=macro_b.delta_deficit,
-                assumptions={k: v for k, v in macro_b.assumptions.items()},
-            ),
-            resolution=ResolutionType(
-                overallPct=float(reso_b.get("overallPct", 0.0)),
-                byMass=[
-                    MassTargetType(
-                        massId=str(e.get("massId")),
-                        targetDeltaEur=float(e.get("targetDeltaEur", 0.0)),
-                        specifiedDeltaEur=float(e.get("specifiedDeltaEur", 0.0)),
-                    )
-                    for e in reso_b.get("byMass", [])
-                ],
-            ),
-        )
+def _store_compare_deltas(ids: tuple | None, deltas: dict) -> None:
+    from .scenario_cache import compare_key, get_scenario_result_cache
+
+    cache = get_scenario_result_cache()
+    if cache is not None and ids:
+        cache.put(compare_key(*ids), deltas)
+
+
+async def _admitted_compare_deltas(dsl_a: str, dsl_b: str | None, ids: tuple | None = None) -> dict:
+    deltas = _cached_compare_deltas(ids)
+    if deltas is not None:
+        return deltas
+    # The breakdown may resolve after scenarioCompare returned (@defer): take its own slot
+    async with admit(COMPARE):
+        deltas = await run_cpu(_scenario_compare_deltas, dsl_a, dsl_b)
+    _store_compare_deltas(ids, deltas)
+    return deltas
 
-        return ScenarioCompareResultType(
-            a=scenario_a_payload,
-            b=scenario_b_payload,
-            waterfall=waterfall, 
-            ribbons=ribbons, 
-            pieceLabels=piece_labels, 
-            massLabels=mission_labels
-        )
 
 @strawberry.type
 class ScenarioCompareResultType:
+    """Headline payloads resolve eagerly; the piece/mass breakdown is computed on
+    first access so clients can ``@defer`` it behind the deficit numbers."""
+
     a: RunScenarioPayload
     b: RunScenarioPayload | None = None
+    dsl_a: strawberry.Private[str]
+    dsl_b: strawberry.Private[str]
+    ids: strawberry.Private[Optional[tuple]] = None
+    deltas: strawberry.Private[Optional["asyncio.Future[dict]"]] = None
+
+    async def _deltas(self) -> dict:
+        if self.deltas is None:
+            self.deltas = asyncio.ensure_future(_admitted_compare_deltas(self.dsl_a, self.dsl_b, self.ids))
+        return await self.deltas
+
+    @strawberry.field
+    async def waterfall(self) -> JSON:
+        return (await self._deltas())["waterfall"]
+
+    @strawberry.field
+    async def ribbons(self) -> JSON:
+        return (await self._deltas())["ribbons"]
+
+    @strawberry.field
+    async def pieceLabels(self) -> JSON:  # noqa: N802
+        return (await self._deltas())["pieceLabels"]
+
+    @strawberry.field
+    async def massLabels(self) -> JSON:  # noqa: N802
+        return (await self._deltas())["massLabels"]
+
+
+@strawberry.type
+class ScenarioMatrixCellType:
+    """Breakdown of scenario ``a`` minus scenario ``b`` (the baseline when ``b`` is null)."""
+
+    a: strawberry.ID
+    b: strawberry.ID | None
     waterfall: JSON
     ribbons: JSON
+
+
+@strawberry.type
+class ScenarioMatrixType:
+    ids: List[strawberry.ID]
+    scenarios: List[RunScenarioPayload]
+    baseline: RunScenarioPayload
+    cells: List[ScenarioMatrixCellType]
     pieceLabels: JSON
     massLabels: JSON
 
+
 @strawberry.type
 class Mutation:
     @strawberry.mutation
-    def runScenario(self, input: RunScenarioInput) -> RunScenarioPayload:  # noqa: N802
+    @admitted(SCENARIO)
+    async def runScenario(self, info: strawberry.Info, input: RunScenarioInput) -> RunScenarioPayload:  # noqa: N802
         lens_value: str | None = None
         if input.lens == LensEnum.ADMIN:
             lens_value = "MISSION"
         elif input.lens == LensEnum.COFOG:
             lens_value = "COFOG"
 
+        needs = _info_needs(info)
         try:
-            sid, acc, comp, macro, reso, warnings = run_scenario(input.dsl, lens=lens_value)
+            sid, acc, comp, macro, reso, warnings = await run_cpu(
+                run_scenario, input.dsl, lens=lens_value, needs=needs, process_safe=True
+            )
         except ValueError as e:
             raise ValueError(str(e)) from e
 
-        # Store DSL for shareCard/permalinks (persistent store)
+        # Store DSL and its share summary for shareCard/permalinks (persistent store);
+        # the summary reuses this run when it covered the default-lens stages.
         try:
-            from .store import set_dsl
-            set_dsl(str(sid), input.dsl)
+            from .share_summary import SHARE_SUMMARY_NEEDS
+            from .store import needs_persist, persist_in_background
+
+            # Most runs are re-runs of stored scenarios: nothing to write then
+            if needs_persist(str(sid)):
+                engine_results = None
+                if lens_value is None and (needs is None or needs.issuperset(SHARE_SUMMARY_NEEDS)):
+                    engine_results = (acc, comp, reso)
+                persist_in_background(str(sid), input.dsl, engine_results)
         except Exception:
             pass
         return RunScenarioPayload(
@@ -1800,6 +2179,7 @@ class Mutation:
 
     # In-memory scenario metadata store
     @strawberry.mutation
+    @offload_io
     def saveScenario(self, id: strawberry.ID, title: Optional[str] = None, description: Optional[str] = None) -> bool:  # noqa: N802
         try:
             from .store import set_meta
@@ -1809,7 +2189,7 @@ class Mutation:
             return False
 
     @strawberry.mutation
-    def submitVote(  # noqa: N802
+    async def submitVote(  # noqa: N802
         self,
         scenarioId: strawberry.ID,
         userEmail: Optional[str] = None,
@@ -1823,7 +2203,8 @@ class Mutation:
         finalVoteSnapshotTruncated: Optional[bool] = None,
     ) -> bool:
         try:
-            from .votes_store import get_vote_store
+            from .vote_queue import get_vote_queue
+            from .votes_store import get_async_vote_store, get_vote_store
 
             meta = {"timestamp": time.time()}
             normalized_meta, warnings = _normalize_submit_vote_meta(
@@ -1847,12 +2228,22 @@ class Mutation:
             idempotency_key = _derive_vote_idempotency_key(str(scenarioId), meta)
             if idempotency_key:
                 meta["idempotencyKey"] = idempotency_key
-            get_vote_store().add_vote(str(scenarioId), userEmail, meta)
+            queue = get_vote_queue()
+            if queue is not None:
+                # May block on back-pressure: keep it off the event loop
+                await run_io(queue.submit, str(scenarioId), userEmail, meta)
+            else:
+                async_store = get_async_vote_store()
+                if async_store is not None:
+                    await async_store.add_vote(str(scenarioId), userEmail, meta)
+                else:
+                    await run_io(get_vote_store().add_vote, str(scenarioId), userEmail, meta)
             return True
         except Exception:
             return False
 
     @strawberry.mutation
+    @offload_io
     def deleteScenario(self, id: strawberry.ID) -> bool:  # noqa: N802
         try:
             from .store import delete as _del
@@ -1861,7 +2252,9 @@ class Mutation:
             return False
 
     @strawberry.mutation
-    def specifyMass(self, input: SpecifyMassInput) -> SpecifyMassPayload:  # noqa: N802
+    @admitted(SCENARIO)
+    @offload_cpu
+    def specifyMass(self, info: strawberry.Info, input: SpecifyMassInput) -> SpecifyMassPayload:  # noqa: N802
         """Validate a mass split plan against the current scenario and return an updated DSL.
 
         Rules:
@@ -1871,7 +2264,7 @@ class Mutation:
         """
         import base64 as _b64
         import yaml as _yaml
-        from .data_loader import run_scenario as _run, load_lego_config as _cfg
+        from .data_loader import run_scenario as _run
 
         # Decode DSL to infer current lens and compute pending
         try:
@@ -1912,8 +2305,7 @@ class Mutation:
 
         # Locked pieces
         try:
-            cfg = _cfg()
-            locked_ids = {str(p.get("id")) for p in (cfg.get("pieces") or []) if bool(p.get("locked", False))}
+            locked_ids = lego_piece_index(int(dsl_obj.get("baseline_year", 2026))).locked_ids
             for sp in input.splits:
                 if str(sp.pieceId) in locked_ids:
                     errors.append(SpecifyErrorType(code="locked", message="Piece is locked", pieceId=str(sp.pieceId)))
@@ -2003,4 +2395,40 @@ class Mutation:
         )
 
 
-schema = strawberry.Schema(query=Query, mutation=Mutation)
+def _schema_extensions() -> list:
+    from strawberry.extensions import ParserCache, ValidationCache
+
+    from .persisted_queries import build_persisted_queries_extension
+    from .response_cache import ResponseCacheExtension, response_cache_enabled
+    from .settings import get_settings
+
+    settings = get_settings()
+    extensions: list = [DataLoadersExtension]
+    # APQ must run before parsing so a hash-only request gets its document first
+    apq = build_persisted_queries_extension(
+        settings.graphql_persisted_queries,
+        settings.graphql_persisted_queries_path,
+        settings.graphql_persisted_queries_max,
+    )
+    if apq is not None:
+        extensions.append(apq)
+    # LRU of parsed and validated documents: the frontend sends a small fixed set of operations
+    if settings.graphql_document_cache_size > 0:
+        extensions.append(ParserCache(maxsize=settings.graphql_document_cache_size))
+        extensions.append(ValidationCache(maxsize=settings.graphql_document_cache_size))
+    if response_cache_enabled():
+        extensions.append(ResponseCacheExtension)
+    return extensions
+
+
+def _schema_config() -> StrawberryConfig:
+    from strawberry.utils import IS_GQL_33
+
+    from .settings import get_settings
+
+    # @defer/@stream need graphql-core 3.3 (incremental delivery over multipart/mixed)
+    incremental = get_settings().graphql_incremental_delivery and IS_GQL_33
+    return StrawberryConfig(enable_experimental_incremental_execution=incremental)
+
+
+schema = strawberry.Schema(query=Query, mutation=Mutation, extensions=_schema_extensions(), config=_schema_config())
@@ -48,6 +48,60 @@ class Settings:
     pg_dsn: str | None = os.getenv("WAREHOUSE_PG_DSN")
     warehouse_cofog_override: bool = os.getenv("WAREHOUSE_COFOG_OVERRIDE", "0") in ("1", "true", "True")
 
+    # Health probes: seconds between background refreshes of the /health snapshot
+    health_refresh_interval_sec: float = float(os.getenv("HEALTH_REFRESH_INTERVAL_SEC", "30"))
+
+    # GraphQL resolver executors: CPU pool (scenario engine) and I/O pool (stores, warehouse, upstream APIs).
+    # GRAPHQL_CPU_WORKERS=0 sizes the CPU pool from os.cpu_count() (capped at 4).
+    graphql_cpu_workers: int = int(os.getenv("GRAPHQL_CPU_WORKERS", "0"))
+    graphql_cpu_executor: str = os.getenv("GRAPHQL_CPU_EXECUTOR", "thread")  # thread|process
+    graphql_io_workers: int = int(os.getenv("GRAPHQL_IO_WORKERS", "16"))
+
+    # GraphQL documents: automatic persisted queries (off|apq|allowlist) and parse/validate LRU size
+    graphql_persisted_queries: str = os.getenv("GRAPHQL_PERSISTED_QUERIES", "apq")
+    graphql_persisted_queries_path: str | None = os.getenv("GRAPHQL_PERSISTED_QUERIES_PATH")
+    graphql_persisted_queries_max: int = int(os.getenv("GRAPHQL_PERSISTED_QUERIES_MAX", "1000"))
+    graphql_document_cache_size: int = int(os.getenv("GRAPHQL_DOCUMENT_CACHE_SIZE", "256"))
+    # Incremental delivery: @defer/@stream answered as multipart/mixed (requires graphql-core 3.3)
+    graphql_incremental_delivery: bool = _env_bool("GRAPHQL_INCREMENTAL_DELIVERY", True)
+    # Seconds followers wait on a coalesced scenario evaluation (same sid and lens) before
+    # computing on their own; 0 disables single-flight coalescing
+    scenario_singleflight_timeout_sec: float = float(os.getenv("SCENARIO_SINGLEFLIGHT_TIMEOUT_SEC", "30"))
+    # Admission control for engine resolvers: per-class concurrency (0 = sized from the CPU
+    # pool), bounded wait queue and queue deadline before answering 429/503
+    admission_control_enabled: bool = _env_bool("ADMISSION_CONTROL_ENABLED", True)
+    admission_scenario_concurrency: int = int(os.getenv("ADMISSION_SCENARIO_CONCURRENCY", "0"))
+    admission_compare_concurrency: int = int(os.getenv("ADMISSION_COMPARE_CONCURRENCY", "0"))
+    admission_queue_size: int = int(os.getenv("ADMISSION_QUEUE_SIZE", "16"))
+    admission_queue_timeout_sec: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SEC", "5"))
+    # Evaluated stored scenarios kept in process (0 disables), and the background warmer
+    # that precomputes the top-N voted ones every interval within a CPU budget (share of a core)
+    scenario_result_cache_size: int = int(os.getenv("SCENARIO_RESULT_CACHE_SIZE", "256"))
+    scenario_prewarm_top_n: int = int(os.getenv("SCENARIO_PREWARM_TOP_N", "20"))
+    scenario_prewarm_interval_sec: float = float(os.getenv("SCENARIO_PREWARM_INTERVAL_SEC", "300"))
+    scenario_prewarm_cpu_budget: float = float(os.getenv("SCENARIO_PREWARM_CPU_BUDGET", "0.25"))
+    # Stored-scenario ids remembered in process so re-runs skip the persistence write
+    scenario_known_ids_size: int = int(os.getenv("SCENARIO_KNOWN_IDS_SIZE", "50000"))
+    # Read-through cache of stored scenario DSLs (immutable) and of unknown ids
+    scenario_dsl_cache_size: int = int(os.getenv("SCENARIO_DSL_CACHE_SIZE", "4096"))
+    scenario_dsl_negative_ttl_sec: float = float(os.getenv("SCENARIO_DSL_NEGATIVE_TTL_SEC", "30"))
+    # Upper bound for `first` on cursor-paginated (*Connection) fields
+    graphql_max_page_size: int = int(os.getenv("GRAPHQL_MAX_PAGE_SIZE", "200"))
+
+    # Full-response cache for reference-data queries: in-process LRU (0 disables) plus an
+    # optional shared Redis tier (redis://[:password@]host:port/db). DATA_VINTAGE pins the
+    # cache key's data version instead of fingerprinting data/ snapshots.
+    graphql_response_cache_size: int = int(os.getenv("GRAPHQL_RESPONSE_CACHE_SIZE", "512"))
+    graphql_response_cache_ttl_sec: float = float(os.getenv("GRAPHQL_RESPONSE_CACHE_TTL_SEC", "300"))
+    graphql_response_cache_url: str | None = os.getenv("GRAPHQL_RESPONSE_CACHE_URL")
+    data_vintage: str | None = os.getenv("DATA_VINTAGE")
+
+    # Response compression (gzip, or brotli when the `brotli` package is installed)
+    compression_enabled: bool = _env_bool("COMPRESSION_ENABLED", True)
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    compression_gzip_level: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    compression_brotli_quality: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
     # Logging / Error reporting
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
     sentry_dsn: str | None = os.getenv("SENTRY_DSN")
@@ -90,8 +144,26 @@ class Settings:
     votes_db_pool_timeout: float = float(os.getenv("VOTES_DB_POOL_TIMEOUT", "30"))
     votes_db_pool_max_idle: float = float(os.getenv("VOTES_DB_POOL_MAX_IDLE", "300"))
     votes_db_pool_max_lifetime: float = float(os.getenv("VOTES_DB_POOL_MAX_LIFETIME", "1800"))
+    # Async resolvers (submitVote, voteSummary) use an AsyncConnectionPool sized like the sync one
+    votes_db_async: bool = _env_bool("VOTES_DB_ASYNC", True)
     votes_sqlite_path: str = os.getenv("VOTES_SQLITE_PATH", os.path.join("data", "cache", "votes.sqlite3"))
+    votes_sqlite_busy_timeout_ms: int = int(os.getenv("VOTES_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    votes_sqlite_cache_size_kib: int = int(os.getenv("VOTES_SQLITE_CACHE_SIZE_KIB", "8192"))
+    votes_sqlite_mmap_size: int = int(os.getenv("VOTES_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     votes_file_path: str = os.getenv("VOTES_FILE_PATH", os.path.join("data", "cache", "votes.json"))
+    votes_file_fsync_interval_sec: float = float(os.getenv("VOTES_FILE_FSYNC_INTERVAL_SEC", "1"))
+    # In-process top-N of the vote leaderboard (0 disables); DB stores reload it after the refresh interval
+    votes_leaderboard_size: int = int(os.getenv("VOTES_LEADERBOARD_SIZE", "100"))
+    votes_leaderboard_refresh_sec: float = float(os.getenv("VOTES_LEADERBOARD_REFRESH_SEC", "30"))
+    # Write-behind submitVote: queue in process, flush in batches
+    votes_write_behind_enabled: bool = _env_bool("VOTES_WRITE_BEHIND_ENABLED", False)
+    votes_write_behind_batch_size: int = int(os.getenv("VOTES_WRITE_BEHIND_BATCH_SIZE", "200"))
+    votes_write_behind_flush_ms: float = float(os.getenv("VOTES_WRITE_BEHIND_FLUSH_MS", "50"))
+    votes_write_behind_max_pending: int = int(os.getenv("VOTES_WRITE_BEHIND_MAX_PENDING", "10000"))
+    votes_write_behind_enqueue_timeout_sec: float = float(os.getenv("VOTES_WRITE_BEHIND_ENQUEUE_TIMEOUT_SEC", "2"))
+    # Researcher bulk export (/export/votes); disabled unless a token is set
+    export_token: str | None = os.getenv("EXPORT_TOKEN")
+    export_chunk_size: int = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
 
 
 def get_settings() -> Settings:
@@ -0,0 +1,152 @@
+"""Precomputed share-card summaries.
+
+``Query.shareCard`` is mostly hit by crawlers rendering OG images. The summary
+(deficit, debt delta in pp, top masses, highlight, EU lights) is computed once
+when a scenario is stored (``store.set_dsl``) and persisted next to its DSL in
+the vote store, so a share card is a single primary-key read.
+
+Summaries are tagged with the data vintage they were computed against; a
+missing or stale summary (older scenarios, new data release) is recomputed from
+the stored DSL on read and written back.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+from .response_cache import data_vintage
+from .votes_store import get_vote_store
+
+logger = logging.getLogger(__name__)
+
+# Engine stages the summary reads (see data_loader.SCENARIO_STAGES).
+SHARE_SUMMARY_NEEDS = ("accounting", "compliance", "resolution")
+
+
+def empty_share_summary() -> Dict[str, Any]:
+    return {
+        "deficit": 0.0,
+        "debtDeltaPct": 0.0,
+        "highlight": "",
+        "resolutionPct": 0.0,
+        "masses": {},
+        "eu3": "info",
+        "eu60": "info",
+    }
+
+
+def build_share_summary(dsl: str, acc: Any, comp: Any, reso: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary fields from an engine run of ``dsl`` (default lens)."""
+    deficit = float(acc.deficit_path[0]) if acc.deficit_path else 0.0
+    try:
+        data = yaml.safe_load(base64.b64decode(dsl).decode("utf-8"))
+    except Exception:
+        data = None
+    if not isinstance(data, dict):
+        data = {}
+    baseline_year = int(data.get("baseline_year", 2026))
+    # Debt delta ratio (pp) at horizon end vs baseline
+    debt_delta_pct = 0.0
+    try:
+        from . import baselines as _bl
+
+        horizon_years = int((data.get("assumptions") or {}).get("horizon_years", 5))
+        end_year = baseline_year + max(0, horizon_years - 1)
+        _base_def, base_debt = _bl.year_def_debt(end_year)
+        g = _bl.year_gdp(end_year)
+        scen_debt = float(base_debt) + float(acc.debt_path[-1] if acc.debt_path else 0.0)
+        base_ratio = (float(base_debt) / g) if g else 0.0
+        scen_ratio = (scen_debt / g) if g else 0.0
+        debt_delta_pct = (scen_ratio - base_ratio) * 100.0
+    except Exception:
+        debt_delta_pct = 0.0
+    # Mass shares baseline vs scenario, top 5 by baseline share
+    masses: Dict[str, Dict[str, float]] = {}
+    try:
+        from .data_loader import _mass_shares_from_piece_amounts as _ms
+        from .data_loader import _piece_amounts_after_dsl as _pad
+
+        base_amt, scen_amt = _pad(baseline_year, dsl)
+        base_sh = _ms(base_amt)
+        scen_sh = _ms(scen_amt)
+        for mid in sorted(base_sh.keys(), key=lambda k: base_sh[k], reverse=True)[:5]:
+            masses[mid] = {"base": float(base_sh[mid]), "scen": float(scen_sh.get(mid, 0.0))}
+    except Exception:
+        masses = {}
+    # Highlight: largest unresolved mass
+    hi = ""
+    try:
+        best = None
+        for e in reso.get("byMass") or []:
+            pend = abs(float(e.get("targetDeltaEur", 0.0))) - abs(float(e.get("specifiedDeltaEur", 0.0)))
+            if best is None or pend > best[0]:
+                best = (pend, str(e.get("massId")))
+        if best and best[0] > 0:
+            hi = f"Pending {best[0]:,.0f}€ in {best[1]}"
+    except Exception:
+        pass
+    return {
+        "deficit": deficit,
+        "debtDeltaPct": debt_delta_pct,
+        "highlight": hi,
+        "resolutionPct": float(reso.get("overallPct", 0.0)),
+        "masses": masses,
+        # EU lights first-year
+        "eu3": comp.eu3pct[0] if comp.eu3pct else "info",
+        "eu60": comp.eu60pct[0] if comp.eu60pct else "info",
+    }
+
+
+def compute_share_summary(dsl: str) -> Dict[str, Any]:
+    from .data_loader import run_scenario
+
+    _sid, acc, comp, _macro, reso, _warnings = run_scenario(dsl, needs=SHARE_SUMMARY_NEEDS)
+    return build_share_summary(dsl, acc, comp, reso)
+
+
+def load_share_summary(sid: str) -> Optional[Dict[str, Any]]:
+    """Stored summary for ``sid`` if it matches the current data vintage."""
+    try:
+        raw = get_vote_store().get_share_summary(sid)
+    except Exception as e:
+        logger.error(f"Failed to get share summary {sid}: {e}")
+        return None
+    if not raw:
+        return None
+    try:
+        obj = json.loads(raw)
+    except Exception:
+        return None
+    if not isinstance(obj, dict) or obj.get("vintage") != data_vintage():
+        return None
+    summary = obj.get("summary")
+    return summary if isinstance(summary, dict) else None
+
+
+def save_share_summary(sid: str, summary: Dict[str, Any]) -> None:
+    payload = json.dumps({"vintage": data_vintage(), "summary": summary}, ensure_ascii=False)
+    try:
+        get_vote_store().save_share_summary(sid, payload)
+    except Exception as e:
+        logger.error(f"Failed to save share summary {sid}: {e}")
+
+
+def ensure_share_summary(sid: str, dsl: str, results: Optional[Tuple[Any, Any, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Return the stored summary for ``sid``, computing and persisting it when missing or stale.
+
+    ``results`` is an ``(accounting, compliance, resolution)`` triple from an
+    engine run of ``dsl`` with the default lens, reused instead of re-running it.
+    """
+    cached = load_share_summary(sid)
+    if cached is not None:
+        return cached
+    if results is None:
+        summary = compute_share_summary(dsl)
+    else:
+        summary = build_share_summary(dsl, *results)
+    save_share_summary(sid, summary)
+    return summary
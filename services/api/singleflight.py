@@ -0,0 +1,132 @@
+"""Single-flight coalescing of concurrent scenario evaluations.
+
+When a scenario link goes viral, many concurrent ``scenario(id)`` /
+``shareCard(scenarioId)`` requests for the same sid reach one instance. The
+first caller for a key becomes the leader and starts the computation as a task;
+followers whose requested stages are covered by the leader's await the same
+task instead of re-running the engine.
+
+- The computation runs as its own task, so a leader whose client disconnects
+  does not cancel the followers' result.
+- Followers wait at most the timeout (counted from the leader's start): a
+  flight older than that is not joined any more, and a follower still waiting
+  when it expires computes on its own. The leader itself is never cut short.
+- Flights are bound to the running event loop and dropped as soon as they
+  complete: this coalesces, it does not cache.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, TypeVar
+
+from .metrics import counter_lines
+from .settings import get_settings
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight:
+    needs: Optional[FrozenSet[str]]
+    task: "asyncio.Future[Any]"
+    started_at: float
+
+    def covers(self, needs: Optional[FrozenSet[str]]) -> bool:
+        if self.needs is None:
+            return True
+        return needs is not None and needs <= self.needs
+
+
+class SingleFlight:
+    def __init__(self, timeout_sec: float) -> None:
+        self.timeout_sec = float(timeout_sec)
+        self._flights: Dict[Hashable, List[_Flight]] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"leader": 0, "coalesced": 0, "timeout": 0, "error": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout_sec > 0
+
+    def inflight(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._flights.values())
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _join(self, key: Hashable, needs: Optional[FrozenSet[str]], loop: asyncio.AbstractEventLoop) -> Optional[_Flight]:
+        now = time.monotonic()
+        for flight in self._flights.get(key, ()):
+            if flight.task.done() or flight.task.get_loop() is not loop:
+                continue
+            if now - flight.started_at > self.timeout_sec:
+                continue
+            if flight.covers(needs):
+                return flight
+        return None
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if not flight.task.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            flight.task.exception()
+        with self._lock:
+            flights = self._flights.get(key)
+            if not flights:
+                return
+            if flight in flights:
+                flights.remove(flight)
+            if not flights:
+                self._flights.pop(key, None)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        needs: Optional[Iterable[str]] = None,
+    ) -> T:
+        """Run ``fn`` once per concurrent ``key``; ``needs=None`` means "everything"."""
+        if not self.enabled:
+            return await fn()
+        wanted = None if needs is None else frozenset(needs)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flight = self._join(key, wanted, loop)
+            leader = flight is None
+            if leader:
+                flight = _Flight(needs=wanted, task=asyncio.ensure_future(fn()), started_at=time.monotonic())
+                self._flights.setdefault(key, []).append(flight)
+                self.stats["leader"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        assert flight is not None
+        if leader:
+            flight.task.add_done_callback(lambda _t, k=key, f=flight: self._forget(k, f))
+            try:
+                return await asyncio.shield(flight.task)
+            except Exception:
+                self._count("error")
+                raise
+        remaining = self.timeout_sec - (time.monotonic() - flight.started_at)
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout=max(remaining, 0.001))
+        except asyncio.TimeoutError:
+            # The leader is stuck: stop waiting on it and compute independently
+            self._count("timeout")
+            return await fn()
+
+    def metrics_lines(self, prefix: str) -> List[str]:
+        with self._lock:
+            stats = dict(self.stats)
+        lines = [f"{prefix}_inflight {self.inflight()}"]
+        return lines + counter_lines(prefix, stats)
+
+
+@lru_cache(maxsize=1)
+def get_scenario_flights() -> SingleFlight:
+    return SingleFlight(get_settings().scenario_singleflight_timeout_sec)
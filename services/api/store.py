@@ -3,37 +3,237 @@ from __future__ import annotations
 import base64
 import json
 import logging
+import threading
+import time
 import yaml
-from typing import Dict, Optional, Any
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 
+from .metrics import counter_lines
+from .response_cache import data_vintage
+from .settings import get_settings
+from .share_summary import ensure_share_summary
 from .votes_store import get_vote_store
 
 logger = logging.getLogger(__name__)
 
+# Newest stored scenarios loaded into the known-sid filter on first use
+_KNOWN_SEED_LIMIT = 1000
+
+
+class KnownScenarioIds:
+    """LRU of sids known to be stored, with the data vintage of their stored share summary.
+
+    A sid is a hash of the canonical DSL, so a stored row never changes: once a
+    sid is known, persisting it again is a no-op, and once its share summary is
+    stored for the current vintage there is nothing left to write at all.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self._lru: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._seeded = False
+        self.stats: Dict[str, int] = {"hit": 0, "miss": 0}
+
+    def _seed(self) -> None:
+        # Outside the lock: a slow store must not block lookups
+        try:
+            sids = [row.scenario_id for row in get_vote_store().list_scenarios(limit=min(self.maxsize, _KNOWN_SEED_LIMIT))]
+        except Exception as e:
+            logger.warning(f"Could not seed known scenario ids: {e}")
+            sids = []
+        with self._lock:
+            for sid in reversed(sids):  # newest last: most recently used
+                self._lru.setdefault(sid, None)
+            self._trim()
+
+    def _trim(self) -> None:
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def state(self, sid: str, seed: bool = True) -> Tuple[bool, Optional[str]]:
+        """``(stored, summary_vintage)`` as far as this process knows; ``seed`` may query the store once."""
+        if seed and not self._seeded:
+            self._seeded = True
+            self._seed()
+        with self._lock:
+            if sid in self._lru:
+                self._lru.move_to_end(sid)
+                self.stats["hit"] += 1
+                return True, self._lru[sid]
+            self.stats["miss"] += 1
+            return False, None
+
+    def mark(self, sid: str, summary_vintage: Optional[str] = None) -> None:
+        with self._lock:
+            if summary_vintage is None:
+                summary_vintage = self._lru.get(sid)
+            self._lru[sid] = summary_vintage
+            self._lru.move_to_end(sid)
+            self._trim()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._seeded = False
+
+
+@lru_cache(maxsize=1)
+def get_known_scenarios() -> KnownScenarioIds:
+    return KnownScenarioIds(get_settings().scenario_known_ids_size)
+
+
+class ScenarioDSLCache:
+    """Read-through LRU of sid -> encoded DSL, with a negative cache for unknown sids.
+
+    Stored scenarios are immutable (the sid is a hash of the DSL), so a hit
+    never goes stale. A miss is remembered for ``negative_ttl_sec`` only: the
+    sid may be stored later, possibly by another instance.
+    """
+
+    def __init__(self, maxsize: int = 4096, negative_ttl_sec: float = 30.0) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self.negative_ttl_sec = max(0.0, float(negative_ttl_sec))
+        self._lru: "OrderedDict[str, str]" = OrderedDict()
+        self._missing: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hit": 0, "miss": 0, "negative_hit": 0}
+
+    def lookup(self, sid: str) -> Tuple[bool, Optional[str]]:
+        """``(True, dsl)`` on a hit, ``(True, None)`` for a known miss, ``(False, None)`` otherwise."""
+        with self._lock:
+            value = self._lru.get(sid)
+            if value is not None:
+                self._lru.move_to_end(sid)
+                self.stats["hit"] += 1
+                return True, value
+            expires = self._missing.get(sid)
+            if expires is not None:
+                if expires > time.monotonic():
+                    self.stats["negative_hit"] += 1
+                    return True, None
+                del self._missing[sid]
+            self.stats["miss"] += 1
+            return False, None
+
+    def put(self, sid: str, dsl_b64: str) -> None:
+        with self._lock:
+            self._missing.pop(sid, None)
+            self._lru[sid] = dsl_b64
+            self._lru.move_to_end(sid)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    def put_missing(self, sid: str) -> None:
+        if self.negative_ttl_sec <= 0:
+            return
+        with self._lock:
+            self._missing[sid] = time.monotonic() + self.negative_ttl_sec
+            self._missing.move_to_end(sid)
+            while len(self._missing) > self.maxsize:
+                self._missing.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            self._missing.clear()
+
+    def metrics_lines(self) -> List[str]:
+        with self._lock:
+            stats = dict(self.stats)
+            entries, negative = len(self._lru), len(self._missing)
+        lines = [
+            f"cbl_scenario_dsl_cache_entries {entries}",
+            f"cbl_scenario_dsl_cache_negative_entries {negative}",
+        ]
+        return lines + counter_lines("cbl_scenario_dsl_cache", stats)
+
+
+@lru_cache(maxsize=1)
+def get_scenario_dsl_cache() -> ScenarioDSLCache:
+    settings = get_settings()
+    return ScenarioDSLCache(settings.scenario_dsl_cache_size, settings.scenario_dsl_negative_ttl_sec)
+
+
+def _encode_dsl(raw: str) -> str:
+    return base64.b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+# Scenario writes queued on the I/O pool, readable before they land
+_pending_lock = threading.Lock()
+_pending_dsl: Dict[str, str] = {}
+_pending_writes: "Dict[str, Future[None]]" = {}
+
 class DBBackedScenarioDSLStore:
+    """Base64 DSL of stored scenarios, read through ``ScenarioDSLCache``."""
+
     def get(self, sid: str, default: Any = None) -> str | None:
         try:
-            # DB returns JSON string (or dict/list depending on driver).
-            # We need to return base64 encoded string to match original contract.
+            with _pending_lock:
+                pending = _pending_dsl.get(sid)
+            if pending is not None:
+                return pending
+            cache = get_scenario_dsl_cache()
+            known, cached = cache.lookup(sid)
+            if known:
+                return cached if cached is not None else default
+            # The store returns the DSL as a JSON string; the app loader takes base64 JSON
             raw = get_vote_store().get_scenario(sid)
             if not raw:
+                cache.put_missing(sid)
                 return default
-            
-            # If it's already a string, parse it to ensure we have the object to re-serialize canonically?
-            # Or just assume it's the JSON representation.
-            # The app expects Base64 encoded YAML/JSON.
-            # Let's assume we stored it as JSON.
-            # Convert JSON string back to object, then dump to YAML, then b64 encode?
-            # Or just return it as b64 encoded JSON (valid for app loader).
-            
-            # raw is a JSON string from DB
-            return base64.b64encode(raw.encode("utf-8")).decode("ascii")
+            encoded = _encode_dsl(raw)
+            cache.put(sid, encoded)
+            return encoded
         except Exception as e:
             logger.error(f"Failed to get scenario DSL {sid}: {e}")
             return default
 
+    def get_many(self, sids: list[str]) -> Dict[str, str]:
+        """Batch variant of get(): one store query for all uncached sids, base64-encoded like get()."""
+        with _pending_lock:
+            out = {sid: _pending_dsl[sid] for sid in sids if sid in _pending_dsl}
+        cache = get_scenario_dsl_cache()
+        missing = []
+        for sid in dict.fromkeys(sids):
+            if sid in out:
+                continue
+            known, cached = cache.lookup(sid)
+            if cached is not None:
+                out[sid] = cached
+            elif not known:
+                missing.append(sid)
+        if not missing:
+            return out
+        try:
+            rows = get_vote_store().get_scenarios(missing)
+        except Exception as e:
+            logger.error(f"Failed to get scenario DSLs {missing}: {e}")
+            return out
+        for sid in missing:
+            raw = rows.get(sid)
+            if raw:
+                out[sid] = _encode_dsl(raw)
+                cache.put(sid, out[sid])
+            else:
+                cache.put_missing(sid)
+        return out
+
     def __contains__(self, sid: str) -> bool:
-        return self.get(sid) is not None
+        with _pending_lock:
+            if sid in _pending_dsl:
+                return True
+        known, cached = get_scenario_dsl_cache().lookup(sid)
+        if known:
+            return cached is not None
+        try:
+            return get_vote_store().has_scenario(sid)
+        except Exception as e:
+            logger.error(f"Failed to check scenario {sid}: {e}")
+            return False
 
     def __setitem__(self, sid: str, dsl_b64: str) -> None:
         set_dsl(sid, dsl_b64)
@@ -63,15 +263,80 @@ def set_meta(sid: str, title: str | None = None, description: str | None = None)
     # For now, we focus on DSL persistence.
     pass
 
-def set_dsl(sid: str, dsl_b64: str) -> None:
+def set_dsl(sid: str, dsl_b64: str, engine_results: Optional[Tuple[Any, Any, Dict[str, Any]]] = None) -> None:
+    """Persist a scenario and its share summary; skips whatever is known to be stored already."""
+    known = get_known_scenarios()
+    vintage = data_vintage()
+    stored, summary_vintage = known.state(sid)
+    if stored and summary_vintage == vintage:
+        return
+    if not stored:
+        try:
+            decoded = base64.b64decode(dsl_b64).decode('utf-8')
+            # Ensure it's valid structure
+            obj = yaml.safe_load(decoded)
+            json_str = json.dumps(obj)
+            # Content-addressed: an existing row is already this DSL
+            get_vote_store().add_scenario(sid, json_str)
+        except Exception as e:
+            logger.error(f"Failed to save scenario {sid}: {e}")
+            return
+        known.mark(sid)
+        get_scenario_dsl_cache().put(sid, _encode_dsl(json_str))
+    # Precompute the share card next to the DSL (no-op when already stored for this vintage)
     try:
-        decoded = base64.b64decode(dsl_b64).decode('utf-8')
-        # Ensure it's valid structure
-        obj = yaml.safe_load(decoded)
-        json_str = json.dumps(obj)
-        get_vote_store().save_scenario(sid, json_str)
+        ensure_share_summary(sid, dsl_b64, engine_results)
     except Exception as e:
-        logger.error(f"Failed to save scenario {sid}: {e}")
+        logger.error(f"Failed to store share summary {sid}: {e}")
+        return
+    known.mark(sid, vintage)
+
+
+def needs_persist(sid: str) -> bool:
+    """False when ``sid`` and its current-vintage share summary are known to be stored."""
+    # Called on the event loop: never the seeding query
+    stored, summary_vintage = get_known_scenarios().state(sid, seed=False)
+    return not (stored and summary_vintage == data_vintage())
+
+
+def persist_in_background(sid: str, dsl_b64: str, engine_results: Optional[Tuple[Any, Any, Dict[str, Any]]] = None) -> None:
+    """Queue ``set_dsl`` on the I/O pool; the DSL stays readable from this process meanwhile."""
+    from .executors import submit_io
+
+    with _pending_lock:
+        if sid in _pending_writes:
+            return
+        _pending_dsl[sid] = dsl_b64
+
+        def _write() -> None:
+            try:
+                set_dsl(sid, dsl_b64, engine_results)
+            finally:
+                with _pending_lock:
+                    _pending_dsl.pop(sid, None)
+                    _pending_writes.pop(sid, None)
+
+        try:
+            _pending_writes[sid] = submit_io(_write)
+            return
+        except RuntimeError:
+            _pending_dsl.pop(sid, None)
+    # Executor already shut down: write inline
+    set_dsl(sid, dsl_b64, engine_results)
+
+
+def flush_pending_writes(timeout_sec: float = 10.0) -> bool:
+    """Wait for queued scenario writes; False if some did not finish in time."""
+    with _pending_lock:
+        futures: List["Future[None]"] = list(_pending_writes.values())
+    done = True
+    for future in futures:
+        try:
+            future.result(timeout=timeout_sec)
+        except Exception:
+            done = done and future.done()
+    return done
+
 
 def add_vote(sid: str, meta: Dict) -> None:
     # Use the proper vote store method via schema mutation
@@ -52,7 +52,7 @@ def postgres_store(test_db_service):
     # Clean tables before test
     with store._pool.connection() as conn:
         with conn.cursor() as cur:
-            cur.execute("TRUNCATE votes, scenarios, vote_stats RESTART IDENTITY;")
+            cur.execute("TRUNCATE votes, vote_idempotency_keys, scenarios, vote_stats RESTART IDENTITY;")
         conn.commit()
 
     yield store
@@ -64,3 +64,23 @@ def sqlite_store(tmp_path):
     store = SqliteVoteStore(str(db_path))
     yield store
     store.close()
+
+
+@pytest.fixture(autouse=True)
+def _clear_response_cache():
+    """Tests monkeypatch data sources, which the data vintage cannot see."""
+    from services.api.data_loader import clear_lego_piece_index
+    from services.api.response_cache import get_response_cache
+    from services.api.scenario_cache import get_scenario_result_cache
+    from services.api.store import flush_pending_writes, get_known_scenarios, get_scenario_dsl_cache
+
+    for cache in (get_response_cache(), get_scenario_result_cache()):
+        if cache is not None:
+            cache.clear()
+    clear_lego_piece_index()
+    # Stores are swapped per test: forget which sids were stored
+    get_known_scenarios().clear()
+    get_scenario_dsl_cache().clear()
+    yield
+    # Background scenario writes must land in this test's store
+    flush_pending_writes()
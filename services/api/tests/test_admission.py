@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services.api import admission
+from services.api import schema as gql_schema
+from services.api.admission import AdmissionGate, Overloaded
+
+
+def test_gate_queues_then_rejects_when_full():
+    gate = AdmissionGate("scenario", limit=1, queue_size=1, queue_timeout_sec=1.0)
+    order: list[str] = []
+
+    async def hold(tag: str, sec: float):
+        await gate.acquire()
+        order.append(tag)
+        await asyncio.sleep(sec)
+        gate.release(sec)
+
+    async def main():
+        first = asyncio.ensure_future(hold("first", 0.05))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(hold("second", 0.0))
+        await asyncio.sleep(0)
+        assert gate.queue_depth() == 1
+        with pytest.raises(Overloaded) as exc:
+            await gate.acquire()
+        await asyncio.gather(first, second)
+        return exc.value
+
+    exc = asyncio.run(main())
+    assert exc.status == 429 and exc.retry_after >= 1
+    assert exc.extensions["code"] == "OVERLOADED"
+    assert order == ["first", "second"]
+    assert gate.active == 0 and gate.queue_depth() == 0
+    assert gate.stats == {"admitted": 2, "queued": 1, "rejected_queue_full": 1, "rejected_timeout": 0}
+
+
+def test_gate_drops_queued_request_after_deadline():
+    gate = AdmissionGate("compare", limit=1, queue_size=4, queue_timeout_sec=0.05)
+
+    async def main():
+        await gate.acquire()
+        with pytest.raises(Overloaded) as exc:
+            await gate.acquire()
+        gate.release(0.0)
+        # The expired waiter must not swallow the freed slot
+        await gate.acquire()
+        gate.release(0.0)
+        return exc.value
+
+    exc = asyncio.run(main())
+    assert exc.status == 503 and exc.extensions["code"] == "QUEUE_TIMEOUT"
+    assert gate.active == 0
+    assert gate.stats["rejected_timeout"] == 1
+    lines = "\n".join(gate.metrics_lines())
+    assert 'cbl_admission_rejected_total{class="compare",reason="timeout"} 1' in lines
+    assert 'cbl_admission_queue_depth{class="compare"} 0' in lines
+
+
+def test_overloaded_run_scenario_answers_429_with_retry_after(monkeypatch):
+    gate = AdmissionGate("scenario", limit=1, queue_size=0, queue_timeout_sec=0.1)
+    monkeypatch.setattr(admission, "get_admission_gates", lambda: {"scenario": gate, "compare": gate})
+
+    def slow_run(dsl, lens=None, needs=None):  # noqa: ANN001
+        time.sleep(0.3)
+        raise ValueError("stop")
+
+    monkeypatch.setattr(gql_schema, "run_scenario", slow_run)
+    from services.api.app import create_app
+
+    client = TestClient(create_app())
+    query = {"query": 'mutation { runScenario(input: {dsl: "eA=="}) { id } }'}
+
+    async def hold_slot():
+        async with admission.admit("scenario"):
+            res = await asyncio.to_thread(client.post, "/graphql", json=query)
+        return res
+
+    res = asyncio.run(hold_slot())
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) >= 1
+    assert res.json()["errors"][0]["extensions"]["code"] == "OVERLOADED"
+
+    metrics = client.get("/metrics").text
+    assert 'cbl_admission_rejected_total{class="scenario",reason="queue_full"} 1' in metrics
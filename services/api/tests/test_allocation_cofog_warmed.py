@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 
@@ -47,7 +48,7 @@ def test_graphql_allocation_cofog_uses_warmed(monkeypatch):
     q = """
       query($y:Int!){ allocation(year:$y, basis: CP, lens: COFOG){ cofog{ code label amountEur share } } }
     """
-    res = gql_schema.schema.execute_sync(q, variable_values={"y": year})
+    res = asyncio.run(gql_schema.schema.execute(q, variable_values={"y": year}))
     assert not res.errors
     items = res.data["allocation"]["cofog"]
     # Check that amounts reflect shares * total (1000)
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from services.api import schema as gql_schema
+
+
+def test_slow_scenario_does_not_block_label_queries(monkeypatch):
+    def slow_run(dsl, lens=None, needs=None):  # noqa: ANN001
+        time.sleep(0.5)
+        raise ValueError("stop")
+
+    monkeypatch.setattr(gql_schema, "run_scenario", slow_run)
+
+    async def main():
+        finished: dict[str, float] = {}
+        start = time.perf_counter()
+
+        async def run_slow():
+            await gql_schema.schema.execute('mutation { runScenario(input: {dsl: "eA=="}) { id } }')
+            finished["slow"] = time.perf_counter() - start
+
+        async def run_labels():
+            await asyncio.sleep(0.05)
+            res = await gql_schema.schema.execute("{ massLabels { id } }")
+            assert not res.errors
+            finished["labels"] = time.perf_counter() - start
+
+        await asyncio.gather(run_slow(), run_labels())
+        return finished
+
+    finished = asyncio.run(main())
+    assert finished["labels"] < 0.4
+    assert finished["slow"] >= 0.5
+
+
+def test_offloaded_resolvers_are_async():
+    fields = {f.name: f for f in gql_schema.Query.__strawberry_definition__.fields}
+    assert fields["scenario"].is_async
+    assert fields["voteSummary"].is_async
+    mutations = {f.name: f for f in gql_schema.Mutation.__strawberry_definition__.fields}
+    assert mutations["runScenario"].is_async
+    assert mutations["submitVote"].is_async
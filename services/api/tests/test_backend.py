@@ -1,4 +1,5 @@
-﻿import base64
+﻿import asyncio
+import base64
 import json
 from typing import Any, Dict, List
 
@@ -108,7 +109,7 @@ actions:
         }
       }
     """
-    res = gql_schema.schema.execute_sync(query, variable_values={"dsl": dsl_b64})
+    res = asyncio.run(gql_schema.schema.execute(query, variable_values={"dsl": dsl_b64}))
     assert not res.errors, f"GraphQL runScenario errored: {res.errors}"
     data = res.data["runScenario"]
     assert data["id"]
@@ -204,7 +205,7 @@ actions:
         runScenario(input: { dsl: $dsl }) { compliance { netExpenditure } }
       }
     """
-    res = gql_schema.schema.execute_sync(query, variable_values={"dsl": dsl_b64})
+    res = asyncio.run(gql_schema.schema.execute(query, variable_values={"dsl": dsl_b64}))
     assert not res.errors
     status = res.data["runScenario"]["compliance"]["netExpenditure"]
     assert len(status) == 5
@@ -383,12 +384,12 @@ actions:
         runScenario(input: { dsl: $dsl }) { id }
       }
     """
-    res1 = gql_schema.schema.execute_sync(query, variable_values={"dsl": dsl_b64})
+    res1 = asyncio.run(gql_schema.schema.execute(query, variable_values={"dsl": dsl_b64}))
     assert not res1.errors
     id1 = res1.data["runScenario"]["id"]
 
     # Second identical run â‡’ same ID
-    res2 = gql_schema.schema.execute_sync(query, variable_values={"dsl": dsl_b64})
+    res2 = asyncio.run(gql_schema.schema.execute(query, variable_values={"dsl": dsl_b64}))
     assert not res2.errors
     id2 = res2.data["runScenario"]["id"]
     assert id1 == id2
@@ -396,7 +397,7 @@ actions:
     # Modify DSL (amount) â‡’ different ID
     sdl2 = sdl.replace("1000000000", "1000000001")
     dsl_b64_2 = base64.b64encode(sdl2.encode("utf-8")).decode("utf-8")
-    res3 = gql_schema.schema.execute_sync(query, variable_values={"dsl": dsl_b64_2})
+    res3 = asyncio.run(gql_schema.schema.execute(query, variable_values={"dsl": dsl_b64_2}))
     assert not res3.errors
     id3 = res3.data["runScenario"]["id"]
     assert id3 != id1
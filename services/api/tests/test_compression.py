@@ -0,0 +1,106 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from services.api.app import create_app
+from services.api.compression import CompressionMiddleware, choose_encoding
+
+BIG = json.dumps([{"id": i, "label": "piece %d" % i} for i in range(500)])
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big() -> Response:
+        return Response(content=BIG, media_type="application/json")
+
+    @app.get("/small")
+    def small() -> Response:
+        return Response(content='{"ok":true}', media_type="application/json")
+
+    @app.get("/png")
+    def png() -> Response:
+        return Response(content=b"\x89PNG" + b"\0" * 4096, media_type="image/png")
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        def chunks():
+            for i in range(20):
+                yield ("line %d " % i).encode() * 20 + b"\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+
+def test_compresses_large_allowlisted_bodies_only():
+    client = TestClient(_app())
+    big = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.headers["vary"] == "Accept-Encoding"
+    assert int(big.headers["content-length"]) < len(BIG)
+    assert big.text == BIG
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/png", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_streamed_responses_are_compressed_incrementally():
+    client = TestClient(_app())
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as res:
+        assert res.headers["content-encoding"] == "gzip"
+        assert "content-length" not in res.headers
+        raw = b"".join(res.iter_raw())
+    expected = b"".join(("line %d " % i).encode() * 20 + b"\n" for i in range(20))
+    assert gzip.decompress(raw) == expected
+
+
+
+def test_small_first_chunk_is_sent_before_the_next_is_produced():
+    first_sent = asyncio.Event()
+    sent: list[dict] = []
+
+    async def app(scope, receive, send):  # noqa: ANN001
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"multipart/mixed")]})
+        await send({"type": "http.response.body", "body": b"h" * 300, "more_body": True})
+        # The second part is only produced once the first one went out
+        await asyncio.wait_for(first_sent.wait(), timeout=1.0)
+        await send({"type": "http.response.body", "body": b"t" * 300, "more_body": False})
+
+    async def downstream(message):  # noqa: ANN001
+        sent.append(message)
+        if message["type"] == "http.response.body" and message.get("more_body"):
+            first_sent.set()
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=1024)(scope, None, downstream))
+    assert dict(sent[0]["headers"])[b"content-encoding"] == b"gzip"
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(sent[1]["body"]) == b"h" * 300
+    assert decoder.decompress(sent[2]["body"]) == b"t" * 300
+
+def test_choose_encoding_prefers_brotli_when_available():
+    assert choose_encoding("gzip, br", brotli_available=True) == "br"
+    assert choose_encoding("gzip, br", brotli_available=False) == "gzip"
+    assert choose_encoding("br;q=0, gzip;q=0.5", brotli_available=True) == "gzip"
+    assert choose_encoding("identity", brotli_available=True) is None
+
+
+def test_graphql_responses_are_compressed():
+    client = TestClient(create_app())
+    res = client.post(
+        "/graphql",
+        json={"query": "{ policyLevers { id label description } }"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert res.status_code == 200
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.json()["data"]["policyLevers"]
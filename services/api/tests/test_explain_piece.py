@@ -31,3 +31,34 @@ def test_explain_piece_education_has_mapping_and_baseline():
     assert isinstance(ex.get("lockedDefault"), bool)
     assert isinstance(ex.get("sources"), list)
 
+
+
+def test_piece_resolvers_share_one_index_per_vintage(monkeypatch):
+    from services.api import data_loader as dl
+
+    calls = []
+    real = dl.lego_pieces_with_baseline
+
+    def counting(year, scope="S13"):
+        calls.append((year, scope))
+        return real(year, scope)
+
+    monkeypatch.setattr(dl, "lego_pieces_with_baseline", counting)
+    client = TestClient(create_app())
+    q = """
+      query($id:String!, $y:Int!){
+        explainPiece(id:$id, year:$y){ id baselineAmountEur boundsPct }
+        legoPieces(year:$y){ id amountEur }
+      }
+    """
+    first = _gql(client, q, {"id": "ed_schools_staff_ops", "y": 2026})
+    _gql(client, q, {"id": "unknown_piece", "y": 2026})
+    assert calls == [(2026, "S13")]
+
+    index = dl.lego_piece_index(2026)
+    piece = index.get("ed_schools_staff_ops")
+    assert piece["config"]["id"] == "ed_schools_staff_ops"
+    assert first["explainPiece"]["baselineAmountEur"] == piece["amount_eur"]
+    amounts = {p["id"]: p["amountEur"] for p in first["legoPieces"]}
+    assert amounts["ed_schools_staff_ops"] == piece["amount_eur"]
+    assert index.get("unknown_piece") is None
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import dataclasses
+import gzip
+import json
+
+from fastapi.testclient import TestClient
+
+from services.api import app as app_mod
+from services.api.settings import get_settings
+
+
+def _client(monkeypatch, store, token: str | None = "secret") -> TestClient:
+    settings = dataclasses.replace(get_settings(), export_token=token, export_chunk_size=2)
+    monkeypatch.setattr(app_mod, "get_settings", lambda: settings)
+    monkeypatch.setattr("services.api.votes_store.get_vote_store", lambda: store)
+    return TestClient(app_mod.create_app())
+
+
+def _rows(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_export_requires_a_configured_token(monkeypatch, sqlite_store):
+    assert _client(monkeypatch, sqlite_store, token=None).get("/export/votes").status_code == 404
+    client = _client(monkeypatch, sqlite_store)
+    assert client.get("/export/votes").status_code == 403
+    assert client.get("/export/votes", headers={"x-export-token": "wrong"}).status_code == 403
+
+
+def test_export_streams_votes_with_dsl_and_resumes(monkeypatch, sqlite_store):
+    sqlite_store.add_scenario("s1", json.dumps({"actions": [{"id": "a1"}]}))
+    for i, ts in enumerate([30.0, 10.0, 20.0, 20.0, 40.0]):
+        sqlite_store.add_vote("s1" if i % 2 == 0 else "s2", "x@example.org", {"timestamp": ts, "idempotencyKey": f"k{i}"})
+    client = _client(monkeypatch, sqlite_store)
+    headers = {"x-export-token": "secret"}
+
+    res = client.get("/export/votes", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = _rows(res.text)
+    assert [r["timestamp"] for r in rows] == [10.0, 20.0, 20.0, 30.0, 40.0]
+    assert rows[0]["scenarioId"] == "s2" and rows[0]["dsl"] is None
+    assert rows[-1]["dsl"] == {"actions": [{"id": "a1"}]}
+    # E-mails never leave the store
+    assert "example.org" not in res.text
+
+    first = _rows(client.get("/export/votes", headers=headers, params={"limit": 2}).text)
+    rest = _rows(client.get("/export/votes", headers=headers, params={"after": first[-1]["cursor"]}).text)
+    assert [r["voteId"] for r in first + rest] == [r["voteId"] for r in rows]
+
+    assert client.get("/export/votes", headers=headers, params={"after": "bogus"}).status_code == 400
+
+
+def test_export_gzips_on_the_fly(monkeypatch, sqlite_store):
+    for i in range(5):
+        sqlite_store.add_vote("s1", None, {"timestamp": float(i + 1)})
+    client = _client(monkeypatch, sqlite_store)
+    with client.stream(
+        "GET", "/export/votes", headers={"x-export-token": "secret", "Accept-Encoding": "gzip"}, params={"dsl": "false"}
+    ) as res:
+        assert res.headers["content-encoding"] == "gzip"
+        raw = b"".join(res.iter_raw())
+    rows = _rows(gzip.decompress(raw).decode("utf-8"))
+    assert [r["timestamp"] for r in rows] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_export_honours_gzip_q_values(monkeypatch, sqlite_store):
+    sqlite_store.add_vote("s1", None, {"timestamp": 1.0})
+    client = _client(monkeypatch, sqlite_store)
+    for accept in ("gzip;q=0", "identity, gzip;q=0", "br"):
+        res = client.get("/export/votes", headers={"x-export-token": "secret", "Accept-Encoding": accept})
+        assert "content-encoding" not in res.headers, accept
+        assert [r["timestamp"] for r in _rows(res.text)] == [1.0]
+    res = client.get("/export/votes", headers={"x-export-token": "secret", "Accept-Encoding": "br;q=1, *;q=0.5"})
+    assert res.headers["content-encoding"] == "gzip"
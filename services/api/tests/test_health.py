@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from services.api import warehouse_client as wh
+from services.api.app import create_app
+from services.api.health import HealthMonitor
+
+
+def test_health_monitor_serves_cached_snapshot(monkeypatch):
+    calls = {"status": 0, "counts": 0}
+
+    def fake_status():
+        calls["status"] += 1
+        return {"enabled": True, "available": True, "ready": True, "missing": []}
+
+    def fake_counts(tables):
+        calls["counts"] += 1
+        return {t: 1 for t in tables}
+
+    monkeypatch.setattr(wh, "warehouse_status", fake_status)
+    monkeypatch.setattr(wh, "table_counts", fake_counts)
+
+    monitor = HealthMonitor(interval_sec=60)
+    first = monitor.snapshot()
+    second = monitor.snapshot(full=True)
+
+    assert calls == {"status": 1, "counts": 1}
+    assert first["warehouse"]["ready"] is True
+    assert "rows" not in first
+    assert second["rows"]["fct_admin_by_mission"] == 1
+    assert second["snapshot"]["stale"] is False
+    assert second["snapshot"]["age_sec"] >= 0.0
+
+
+def test_health_monitor_reports_staleness(monkeypatch):
+    monkeypatch.setattr(wh, "warehouse_status", lambda: {"enabled": False, "available": False, "ready": False, "missing": []})
+    monitor = HealthMonitor(interval_sec=1)
+    monitor.refresh()
+    monitor._refreshed_mono -= 10.0
+
+    snap = monitor.snapshot()
+    assert snap["snapshot"]["stale"] is True
+    assert snap["snapshot"]["age_sec"] >= 10.0
+
+
+def test_health_full_endpoint_includes_snapshot_age():
+    client = TestClient(create_app())
+    r = client.get("/health/full")
+    assert r.status_code == 200
+    js = r.json()
+    assert js["status"] == "healthy"
+    assert "rows" in js and "dbt" in js
+    assert "age_sec" in js["snapshot"]
+
+    body = client.get("/metrics").text
+    assert "cbl_health_snapshot_age_seconds" in body
@@ -0,0 +1,137 @@
+import asyncio
+import base64
+import json
+import zlib
+
+from fastapi.testclient import TestClient
+
+from services.api.app import create_app
+
+
+def _parts(body: str) -> list[dict]:
+    out = []
+    for chunk in body.split("\r\n---"):
+        if "\r\n\r\n" in chunk:
+            out.append(json.loads(chunk.split("\r\n\r\n", 1)[1].split("\r\n--", 1)[0]))
+    return out
+
+
+def _dsl() -> str:
+    dsl = {
+        "version": 0.1,
+        "baseline_year": 2026,
+        "assumptions": {"horizon_years": 3},
+        "actions": [{"id": "edu", "target": "mission.M_EDU", "op": "increase", "amount_eur": 1_000_000_000}],
+    }
+    return base64.b64encode(json.dumps(dsl).encode("utf-8")).decode("ascii")
+
+
+def test_scenario_compare_defers_breakdown_after_headline():
+    client = TestClient(create_app())
+    run = client.post(
+        "/graphql",
+        json={"query": "mutation($d:String!){ runScenario(input:{dsl:$d}){ id } }", "variables": {"d": _dsl()}},
+    ).json()
+    sid = run["data"]["runScenario"]["id"]
+
+    query = """
+      query($a: ID!) {
+        scenarioCompare(a: $a) {
+          a { accounting { deficitPath } resolution { overallPct } }
+          ... @defer(label: "breakdown") { waterfall ribbons massLabels }
+        }
+      }
+    """
+    res = client.post("/graphql", json={"query": query, "variables": {"a": sid}}, headers={"Accept-Encoding": "identity"})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("multipart/mixed")
+    parts = _parts(res.text)
+    first, rest = parts[0], parts[1:]
+    assert first["hasNext"] is True
+    compare = first["data"]["scenarioCompare"]
+    assert len(compare["a"]["accounting"]["deficitPath"]) == 3
+    assert "waterfall" not in compare
+    deferred = [inc for p in rest for inc in p.get("incremental", [])]
+    assert deferred[0]["label"] == "breakdown"
+    assert {"waterfall", "ribbons", "massLabels"} <= set(deferred[0]["data"])
+    assert rest[-1]["hasNext"] is False
+
+
+def test_policy_levers_stream():
+    client = TestClient(create_app())
+    res = client.post(
+        "/graphql",
+        json={"query": "{ policyLevers @stream(initialCount: 2) { id } }"},
+        headers={"Accept-Encoding": "identity"},
+    )
+    parts = _parts(res.text)
+    assert len(parts[0]["data"]["policyLevers"]) == 2
+    streamed = [item for p in parts[1:] for inc in p.get("incremental", []) for item in inc.get("items", [])]
+    assert streamed
+
+
+def _asgi_post(app, path: str, payload: dict, headers: list[tuple[bytes, bytes]]) -> list[dict]:
+    """Run one request through the ASGI app, keeping each sent message (the body is not joined)."""
+    body = json.dumps(payload).encode("utf-8")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"content-type", b"application/json"), *headers],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    sent: list[dict] = []
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):  # noqa: ANN001
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    return sent
+
+
+def test_deferred_parts_are_flushed_separately_with_gzip():
+    with TestClient(create_app()) as client:
+        run = client.post(
+            "/graphql",
+            json={"query": "mutation($d:String!){ runScenario(input:{dsl:$d}){ id } }", "variables": {"d": _dsl()}},
+        ).json()
+        sid = run["data"]["runScenario"]["id"]
+        query = """
+          query($a: ID!) {
+            scenarioCompare(a: $a) {
+              a { resolution { overallPct } }
+              ... @defer(label: "breakdown") { waterfall ribbons massLabels }
+            }
+          }
+        """
+        messages = _asgi_post(
+            client.app,
+            "/graphql",
+            {"query": query, "variables": {"a": sid}},
+            [(b"accept-encoding", b"gzip"), (b"accept", b"multipart/mixed")],
+        )
+    start, bodies = messages[0], [m for m in messages[1:] if m["type"] == "http.response.body"]
+    assert dict(start["headers"])[b"content-encoding"] == b"gzip"
+    decoder = zlib.decompressobj(31)
+    chunks = [decoder.decompress(m.get("body", b"")).decode("utf-8") for m in bodies]
+    # The small headline part is decodable on its own, before the breakdown is sent
+    head = next(i for i, c in enumerate(chunks) if '"hasNext": true' in c)
+    initial = _parts("\r\n---" + chunks[head])
+    assert "waterfall" not in initial[0]["data"]["scenarioCompare"]
+    assert "incremental" not in "".join(chunks[: head + 1])
+    assert any('"waterfall"' in c for c in chunks[head + 1 :])
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 
 from services.api import schema as gql_schema
@@ -16,7 +17,7 @@ actions: []
         runScenario(input: { dsl: $dsl }) { id }
       }
     """
-    res = gql_schema.schema.execute_sync(query, variable_values={"dsl": dsl_b64})
+    res = asyncio.run(gql_schema.schema.execute(query, variable_values={"dsl": dsl_b64}))
     assert res.errors, "Expected validation errors for malformed DSL"
     # Ensure error message points to validation
     assert any("validation" in (str(e) or "").lower() for e in res.errors)
@@ -28,5 +29,5 @@ def test_run_scenario_invalid_base64():
         runScenario(input: { dsl: $dsl }) { id }
       }
     """
-    res = gql_schema.schema.execute_sync(query, variable_values={"dsl": "@@not-base64@@"})
+    res = asyncio.run(gql_schema.schema.execute(query, variable_values={"dsl": "@@not-base64@@"}))
     assert res.errors, "Expected errors for invalid base64 DSL"
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from services.api.leaderboard import Leaderboard
+from services.api.votes_store import FileVoteStore, SqliteVoteStore, VoteSummary
+
+
+def test_leaderboard_tracks_entries_and_evictions():
+    board = Leaderboard(size=2)
+    loads: list[int] = []
+
+    def load(n: int) -> list[VoteSummary]:
+        loads.append(n)
+        return [VoteSummary("a", 3, 1.0), VoteSummary("b", 2, 1.0)]
+
+    assert [r.scenario_id for r in board.top(2, load)] == ["a", "b"]
+    board.record(VoteSummary("c", 2, 2.0))  # ties with b, loses on scenario_id
+    assert [r.scenario_id for r in board.top(2, load)] == ["a", "b"]
+    board.record(VoteSummary("c", 3, 3.0))
+    assert [(r.scenario_id, r.votes) for r in board.top(2, load)] == [("a", 3), ("c", 3)]
+    board.record(VoteSummary("b", 5, 4.0))
+    board.record(VoteSummary("b", 4, 4.0))  # stale count is ignored
+    assert [(r.scenario_id, r.votes) for r in board.top(2, load)] == [("b", 5), ("a", 3)]
+    assert loads == [2]
+    assert board.top(3, load) is None
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "file"])
+def test_store_summary_matches_full_recount(tmp_path, backend):
+    if backend == "sqlite":
+        store = SqliteVoteStore(str(tmp_path / "votes.sqlite3"), leaderboard_size=5, leaderboard_refresh_sec=0)
+    else:
+        store = FileVoteStore(str(tmp_path / "votes.jsonl"), leaderboard_size=5)
+    rng = random.Random(7)
+    counts: dict[str, int] = {}
+    for i in range(300):
+        sid = f"s{int(rng.paretovariate(1.2)) % 15:02d}"
+        store.add_vote(sid, None, {"timestamp": float(i), "idempotencyKey": f"k{i}"})
+        counts[sid] = counts.get(sid, 0) + 1
+        if i % 50 == 0:
+            store.summary(limit=5)  # loads the cache early, later votes update it
+    store.add_vote(sid, None, {"idempotencyKey": "k299"})  # replay: not counted
+    expected = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    assert [(r.scenario_id, r.votes) for r in store.summary(limit=5)] == expected[:5]
+    assert store.leaderboard.stats["load"] == 1
+    # Pages past the cached top-N come from the materialized stats
+    page = store.summary(limit=3, after=(expected[4][1], expected[4][0]))
+    assert [(r.scenario_id, r.votes) for r in page] == expected[5:8]
+    store.close()
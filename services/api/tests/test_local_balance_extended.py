@@ -1,3 +1,4 @@
+import asyncio
 import base64
 
 from services.api import schema as gql_schema
@@ -8,7 +9,7 @@ def _b64(yaml_text: str) -> str:
 
 
 def _gql(q: str, variables: dict | None = None):
-    res = gql_schema.schema.execute_sync(q, variable_values=variables or {})
+    res = asyncio.run(gql_schema.schema.execute(q, variable_values=variables or {}))
     assert not res.errors, res.errors
     return res.data
 
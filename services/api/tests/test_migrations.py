@@ -31,3 +31,35 @@ def test_migration_fresh_start(tmp_path):
     cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='votes'")
     assert cur.fetchone() is not None
     conn.close()
+
+def test_vote_migrations_backfill_idempotency_keys_and_stats(tmp_path):
+    # Build the pre-008 schema, then write votes the old way (key only in meta_json)
+    staged = tmp_path / "migrations"
+    staged.mkdir()
+    for name in os.listdir(votes_migrations_dir()):
+        if name < "008":
+            (staged / name).write_text(open(os.path.join(votes_migrations_dir(), name)).read())
+    conn = sqlite3.connect(str(tmp_path / "votes.sqlite3"))
+    apply_migrations(conn, str(staged))
+    conn.executemany(
+        "INSERT INTO votes (id, scenario_id, timestamp, user_email, meta_json) VALUES (?, ?, ?, ?, ?)",
+        [
+            ("v1", "s1", 1.0, None, '{"idempotencyKey": "k1"}'),
+            ("v2", "s1", 2.0, None, '{"idempotencyKey": "k1"}'),
+            ("v3", "s2", 3.0, None, '{"idempotencyKey": "k1"}'),
+            ("v4", "s1", 4.0, None, "{}"),
+        ],
+    )
+    conn.commit()
+
+    applied = apply_migrations(conn, votes_migrations_dir())
+    assert applied[:2] == ["008_add_votes_idempotency_key.sqlite.sql", "009_backfill_vote_stats.sqlite.sql"]
+    rows = conn.execute("SELECT id, idempotency_key FROM votes ORDER BY id").fetchall()
+    assert rows == [("v1", "k1"), ("v2", None), ("v3", "k1"), ("v4", None)]
+    stats = conn.execute("SELECT scenario_id, vote_count, last_ts FROM vote_stats ORDER BY scenario_id").fetchall()
+    assert stats == [("s1", 3, 4.0), ("s2", 1, 3.0)]
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute(
+            "INSERT INTO votes (id, scenario_id, timestamp, meta_json, idempotency_key) VALUES ('v5', 's1', 5.0, '{}', 'k1')"
+        )
+    conn.close()
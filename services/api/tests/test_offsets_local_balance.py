@@ -1,3 +1,4 @@
+import asyncio
 import base64
 from typing import Any, Dict
 
@@ -9,7 +10,7 @@ def _b64(yaml_text: str) -> str:
 
 
 def _exec_gql(query: str, variables: Dict[str, Any]) -> Any:
-    return gql_schema.schema.execute_sync(query, variable_values=variables)
+    return asyncio.run(gql_schema.schema.execute(query, variable_values=variables))
 
 
 def test_offsets_pool_balances_deficit():
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from services.api import schema as gql_schema
+from services.api import votes_store
+from services.api.pagination import decode_cursor, encode_cursor
+from services.api.votes_store import FileVoteStore
+
+
+def _q(query: str, **variables):
+    res = asyncio.run(gql_schema.schema.execute(query, variable_values=variables))
+    assert not res.errors, res.errors
+    return res.data
+
+
+def _walk(query: str, field: str, first: int, **variables) -> list:
+    """Follow endCursor until hasNextPage is false; return the nodes in order."""
+    nodes, after = [], None
+    for _ in range(1000):
+        conn = _q(query, first=first, after=after, **variables)[field]
+        nodes.extend(e["node"] for e in conn["edges"])
+        assert conn["pageInfo"]["hasPreviousPage"] is (after is not None)
+        if not conn["pageInfo"]["hasNextPage"]:
+            return nodes
+        after = conn["pageInfo"]["endCursor"]
+    raise AssertionError("pagination did not terminate")
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    cursor = encode_cursor([3, "sid-é"])
+    assert decode_cursor(cursor, 2) == [3, "sid-é"]
+    assert decode_cursor(None, 2) is None
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor!", 2)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 1)
+
+
+def test_policy_levers_connection_pages_match_full_list():
+    full = [it["id"] for it in _q("{ policyLevers { id } }")["policyLevers"]]
+    assert len(full) > 3
+    query = """
+      query($first:Int,$after:String){ policyLeversConnection(first:$first, after:$after){
+        edges { cursor node { id } } pageInfo { hasNextPage hasPreviousPage endCursor } } }
+    """
+    assert [n["id"] for n in _walk(query, "policyLeversConnection", 3)] == full
+
+
+def test_lego_pieces_connection_pages_match_full_list():
+    full = [p["id"] for p in _q("{ legoPieces(year: 2026) { id } }")["legoPieces"]]
+    query = """
+      query($first:Int,$after:String){ legoPiecesConnection(year: 2026, first:$first, after:$after){
+        edges { node { id } } pageInfo { hasNextPage hasPreviousPage endCursor } } }
+    """
+    assert [n["id"] for n in _walk(query, "legoPiecesConnection", 7)] == full
+
+
+def test_unknown_catalog_cursor_is_an_error():
+    res = asyncio.run(
+        gql_schema.schema.execute(
+            'query($a:String){ policyLeversConnection(first: 2, after: $a){ edges { cursor } } }',
+            variable_values={"a": encode_cursor(["no-such-lever"])},
+        )
+    )
+    assert res.errors and "Invalid cursor" in res.errors[0].message
+
+
+@pytest.mark.parametrize("backend", ["file", "sqlite"])
+def test_vote_summary_connection_orders_ties_stably(backend, tmp_path, sqlite_store, monkeypatch):
+    store = FileVoteStore(str(tmp_path / "votes.json")) if backend == "file" else sqlite_store
+    counts = {"s-b": 2, "s-a": 2, "s-c": 3, "s-d": 1, "s-e": 2}
+    for sid, n in counts.items():
+        for k in range(n):
+            store.add_vote(sid, None, {"timestamp": 1000.0 + k})
+    monkeypatch.setattr(votes_store, "get_vote_store", lambda: store)
+
+    query = """
+      query($first:Int,$after:String){ voteSummaryConnection(first:$first, after:$after){
+        edges { node { scenarioId votes } } pageInfo { hasNextPage hasPreviousPage endCursor } } }
+    """
+    nodes = _walk(query, "voteSummaryConnection", 2)
+    assert [(n["scenarioId"], n["votes"]) for n in nodes] == [
+        ("s-c", 3),
+        ("s-a", 2),
+        ("s-b", 2),
+        ("s-e", 2),
+        ("s-d", 1),
+    ]
+
+
+def test_saved_scenarios_connection_newest_first(sqlite_store, monkeypatch):
+    for k in range(5):
+        sqlite_store.save_scenario(f"s{k}", "{}", '{"title": "T%d"}' % k)
+    with sqlite_store._connect() as conn:
+        for k in range(5):
+            conn.execute("UPDATE scenarios SET created_at = ? WHERE id = ?", (f"2026-01-0{k + 1} 00:00:00", f"s{k}"))
+    monkeypatch.setattr(votes_store, "get_vote_store", lambda: sqlite_store)
+
+    query = """
+      query($first:Int,$after:String){ savedScenariosConnection(first:$first, after:$after){
+        edges { node { id title createdAt } } pageInfo { hasNextPage hasPreviousPage endCursor } } }
+    """
+    nodes = _walk(query, "savedScenariosConnection", 2)
+    assert [n["id"] for n in nodes] == ["s4", "s3", "s2", "s1", "s0"]
+    assert nodes[0]["title"] == "T4"
+    saved = _q("{ savedScenarios(limit: 2) }")["savedScenarios"]
+    assert [s["id"] for s in saved] == ["s4", "s3"]
+
+
+def test_procurement_connection_pages_by_amount(monkeypatch):
+    monkeypatch.setattr("services.api.warehouse_client.warehouse_available", lambda: False)
+    monkeypatch.setattr("services.api.clients.insee.sirene_by_siren", lambda siren: {})
+    full = _q('{ procurement(year: 2024, region: "75") { supplier { siren } } }')["procurement"]
+    query = """
+      query($first:Int,$after:String){ procurementConnection(year: 2024, region: "75", first:$first, after:$after){
+        edges { node { supplier { siren } amountEur } } pageInfo { hasNextPage hasPreviousPage endCursor } } }
+    """
+    nodes = _walk(query, "procurementConnection", 1)
+    assert [n["supplier"]["siren"] for n in nodes][: len(full)] == [i["supplier"]["siren"] for i in full]
+    amounts = [n["amountEur"] for n in nodes]
+    assert amounts == sorted(amounts, reverse=True)
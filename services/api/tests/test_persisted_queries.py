@@ -0,0 +1,59 @@
+import asyncio
+
+import strawberry
+from fastapi.testclient import TestClient
+
+from services.api.app import create_app
+from services.api.persisted_queries import PersistedQueriesExtension, PersistedQueryStore, query_hash
+
+QUERY = "{ massLabels { id } }"
+
+
+def _apq(digest: str) -> dict:
+    return {"persistedQuery": {"version": 1, "sha256Hash": digest}}
+
+
+def test_apq_register_then_hash_only():
+    client = TestClient(create_app())
+    digest = query_hash(QUERY)
+
+    miss = client.post("/graphql", json={"extensions": _apq(digest)}).json()
+    assert miss["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_NOT_FOUND"
+
+    full = client.post("/graphql", json={"query": QUERY, "extensions": _apq(digest)}).json()
+    assert not full.get("errors")
+
+    hit = client.post("/graphql", json={"extensions": _apq(digest)}).json()
+    assert not hit.get("errors")
+    assert hit["data"] == full["data"]
+
+
+def test_apq_rejects_hash_mismatch():
+    client = TestClient(create_app())
+    res = client.post("/graphql", json={"query": QUERY, "extensions": _apq("0" * 64)}).json()
+    assert res["errors"][0]["extensions"]["code"] == "PERSISTED_QUERY_HASH_MISMATCH"
+
+
+@strawberry.type
+class _Query:
+    @strawberry.field
+    def ping(self) -> str:
+        return "pong"
+
+    @strawberry.field
+    def other(self) -> str:
+        return "x"
+
+
+def test_allowlist_only_runs_manifest_documents():
+    allowed = "{ ping }"
+    store = PersistedQueryStore(pinned={query_hash(allowed): allowed})
+    schema = strawberry.Schema(query=_Query, extensions=[PersistedQueriesExtension(store, allowlist_only=True)])
+
+    ok = asyncio.run(schema.execute(None, operation_extensions=_apq(query_hash(allowed))))
+    assert not ok.errors and ok.data == {"ping": "pong"}
+
+    denied = asyncio.run(schema.execute("{ other }"))
+    assert denied.errors[0].extensions["code"] == "PERSISTED_QUERY_NOT_ALLOWED"
+    # allowlist mode never learns new documents at runtime
+    assert len(store) == 1
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 
 import pytest
@@ -43,7 +44,7 @@ actions:
         }
       }
     """
-    res = gql_schema.schema.execute_sync(q, variable_values={"dsl": _b64(sdl)})
+    res = asyncio.run(gql_schema.schema.execute(q, variable_values={"dsl": _b64(sdl)}))
     assert not res.errors
     accounting = res.data["runScenario"]["accounting"]
     delta = accounting["deficitDeltaPath"]
@@ -73,7 +74,7 @@ actions:
         }
       }
     """
-    res = gql_schema.schema.execute_sync(q, variable_values={"dsl": _b64(sdl)})
+    res = asyncio.run(gql_schema.schema.execute(q, variable_values={"dsl": _b64(sdl)}))
     assert not res.errors
     accounting = res.data["runScenario"]["accounting"]
     delta = accounting["deficitDeltaPath"]
@@ -32,3 +32,57 @@ def test_postgres_vote_persistence(postgres_store):
             row = cur.fetchone()
             assert row is not None
             assert json.loads(row[0])["foo"] == "bar"
+
+
+def test_async_postgres_store_shares_stats_with_sync_store(postgres_store):
+    import asyncio
+
+    from services.api.votes_store import AsyncPostgresVoteStore
+
+    store = AsyncPostgresVoteStore(
+        postgres_store.dsn, 1, 2, 5.0, 10.0, 30.0, leaderboard=postgres_store.leaderboard
+    )
+
+    async def main():
+        await store.add_vote("pg_async", None, {"timestamp": 100, "idempotencyKey": "k1"})
+        await store.add_vote("pg_async", None, {"timestamp": 200, "idempotencyKey": "k1"})
+        await store.add_votes([("pg_async", None, {"timestamp": 300}), ("pg_async_2", None, {"timestamp": 50})])
+        await store.save_scenario("pg_async", '{"v": 1}')
+        try:
+            return await store.summary(limit=10), await store.get_scenario("pg_async")
+        finally:
+            await store.close()
+
+    summary, dsl = asyncio.run(main())
+    assert [(s.scenario_id, s.votes, s.last_vote_ts) for s in summary][:2] == [
+        ("pg_async", 2, 300.0),
+        ("pg_async_2", 1, 50.0),
+    ]
+    assert dsl == '{"v": 1}'
+    assert [s.votes for s in postgres_store.summary(limit=1)] == [2]
+
+
+def test_postgres_votes_are_partitioned_by_month(postgres_store):
+    jan, feb = 1767225600.0, 1769904000.0  # 2026-01-01 and 2026-02-01 UTC
+    postgres_store.add_votes(
+        [
+            ("pg_part", None, {"timestamp": jan + 60, "idempotencyKey": "k1"}),
+            ("pg_part", None, {"timestamp": jan + 120, "idempotencyKey": "k1"}),
+        ]
+    )
+    # A replay is dropped even when it falls in another month
+    postgres_store.add_vote("pg_part", None, {"timestamp": feb + 60, "idempotencyKey": "k1"})
+    postgres_store.add_vote("pg_part", None, {"timestamp": feb + 60})
+
+    with postgres_store._pool.connection() as conn:
+        with conn.cursor() as cur:
+            # Votes that arrived before their month's partition move into it
+            cur.execute("SELECT votes_ensure_partition(%s), votes_ensure_partition(%s)", (jan, feb))
+            assert cur.fetchone() == ("votes_2026_01", "votes_2026_02")
+            cur.execute(
+                "SELECT tableoid::regclass::text, COUNT(*) FROM votes WHERE scenario_id = %s GROUP BY 1 ORDER BY 1",
+                ("pg_part",),
+            )
+            assert cur.fetchall() == [("votes_2026_01", 1), ("votes_2026_02", 1)]
+        conn.commit()
+    assert [s.votes for s in postgres_store.summary(limit=10) if s.scenario_id == "pg_part"] == [2]
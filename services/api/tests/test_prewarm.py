@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+
+import yaml
+
+from services.api import schema as gql_schema
+from services.api.data_loader import run_scenario
+from services.api.prewarm import PopularScenarioPrewarmer
+from services.api.scenario_cache import compare_key, get_scenario_result_cache, run_key
+from services.api.share_summary import load_share_summary
+from services.api.votes_store import get_vote_store
+
+DSL_OBJ = {
+    "version": 0.1,
+    "baseline_year": 2026,
+    "assumptions": {"horizon_years": 3},
+    "actions": [
+        {"id": "pw_def", "target": "mission.M_DEFENSE", "op": "decrease", "amount_eur": 1_500_000_000, "recurring": True},
+    ],
+}
+
+
+def _store_voted_scenario() -> str:
+    dsl = base64.b64encode(yaml.safe_dump(DSL_OBJ).encode("utf-8")).decode("utf-8")
+    sid = run_scenario(dsl)[0]
+    store = get_vote_store()
+    store.save_scenario(sid, json.dumps(DSL_OBJ))
+    for _ in range(3):
+        store.add_vote(sid, None, {})
+    return sid
+
+
+def test_prewarm_fills_caches_for_top_voted_scenarios(monkeypatch):
+    sid = _store_voted_scenario()
+    warmer = PopularScenarioPrewarmer(top_n=5, interval_sec=60, cpu_budget=1.0)
+    monkeypatch.setattr(warmer, "top_scenarios", lambda: [sid])
+
+    assert warmer.run_once() == 1
+    cache = get_scenario_result_cache()
+    assert run_key(sid, "MISSION") in cache
+    assert compare_key(sid, None) in cache
+    assert load_share_summary(sid) is not None
+    # Already warm: the next pass computes nothing
+    assert warmer.run_once() == 0
+    assert warmer.stats["warmed"] == 1 and warmer.stats["skipped"] == 1
+
+    def fail(*_args, **_kwargs):  # noqa: ANN002
+        raise AssertionError("engine should not run for a warm scenario")
+
+    monkeypatch.setattr(gql_schema, "run_scenario", fail)
+    monkeypatch.setattr(gql_schema, "_scenario_compare_deltas", fail)
+    query = """
+      query($id: ID!) {
+        scenario(id: $id) { id accounting { deficitPath } }
+        scenarioCompare(a: $id) { a { id } b { id } waterfall ribbons }
+      }
+    """
+    res = asyncio.run(gql_schema.schema.execute(query, variable_values={"id": sid}))
+    assert not res.errors
+    assert res.data["scenario"]["id"] == sid
+    assert res.data["scenarioCompare"]["a"]["id"] == sid
+
+
+def test_prewarm_yields_to_queued_scenario_requests(monkeypatch):
+    from services.api import prewarm
+
+    warmer = PopularScenarioPrewarmer(top_n=5)
+    monkeypatch.setattr(warmer, "top_scenarios", lambda: ["a" * 64])
+    monkeypatch.setattr(prewarm, "_live_scenario_backlog", lambda: 2)
+    assert warmer.run_once() == 0
+    assert warmer.stats["deferred"] == 1
+    assert 'cbl_scenario_prewarm_total{result="deferred"} 1' in warmer.metrics_lines()
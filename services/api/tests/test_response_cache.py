@@ -0,0 +1,124 @@
+import asyncio
+import socketserver
+import threading
+
+import strawberry
+from fastapi.testclient import TestClient
+
+from services.api import response_cache as rc
+from services.api.app import create_app
+from services.api.response_cache import RedisResponseCache, ResponseCache, ResponseCacheExtension
+
+CALLS = {"n": 0}
+
+
+@strawberry.type
+class _Query:
+    @strawberry.field
+    def legoPieces(self, limit: int = 1) -> list[int]:  # noqa: N802
+        CALLS["n"] += 1
+        return list(range(limit))
+
+    @strawberry.field
+    def scenario(self) -> int:
+        CALLS["n"] += 1
+        return 1
+
+
+_schema = strawberry.Schema(query=_Query, extensions=[ResponseCacheExtension])
+
+
+def _run(query: str, **kw):
+    res = asyncio.run(_schema.execute(query, **kw))
+    assert not res.errors, res.errors
+    return res.data
+
+
+def test_cacheable_query_is_served_from_cache(monkeypatch):
+    cache = ResponseCache(maxsize=8, ttl_sec=60)
+    monkeypatch.setattr(rc, "get_response_cache", lambda: cache)
+    monkeypatch.setattr(rc, "data_vintage", lambda: "v1")
+    CALLS["n"] = 0
+
+    q = "query P($n: Int!) { legoPieces(limit: $n) }"
+    assert _run(q, variable_values={"n": 2}) == {"legoPieces": [0, 1]}
+    assert _run(q, variable_values={"n": 2}) == {"legoPieces": [0, 1]}
+    assert CALLS["n"] == 1
+    # different variables and a new data vintage are separate entries
+    _run(q, variable_values={"n": 3})
+    monkeypatch.setattr(rc, "data_vintage", lambda: "v2")
+    _run(q, variable_values={"n": 2})
+    assert CALLS["n"] == 3
+    assert cache.stats["hit_local"] == 1
+
+
+def test_non_cacheable_fields_always_execute(monkeypatch):
+    cache = ResponseCache(maxsize=8, ttl_sec=60)
+    monkeypatch.setattr(rc, "get_response_cache", lambda: cache)
+    CALLS["n"] = 0
+    _run("{ scenario legoPieces }")
+    _run("{ scenario legoPieces }")
+    assert CALLS["n"] == 4
+    assert len(cache) == 0
+
+
+def test_get_requests_carry_cache_policy():
+    client = TestClient(create_app())
+    cached = client.get("/graphql", params={"query": "{ policyLevers { id } }"})
+    assert cached.status_code == 200
+    assert cached.headers["cache-control"] == "public, max-age=300"
+    other = client.get("/graphql", params={"query": "{ massLabels { id } }"})
+    assert other.headers["cache-control"] == "no-store"
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        store = self.server.store  # type: ignore[attr-defined]
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = []
+            for _ in range(int(line[1:-2])):
+                size = int(self.rfile.readline()[1:-2])
+                parts.append(self.rfile.read(size + 2)[:-2])
+            cmd = parts[0].upper()
+            if cmd == b"SET":
+                store[parts[1]] = parts[2]
+                self.wfile.write(b"+OK\r\n")
+            elif cmd == b"GET" and parts[1] in store:
+                val = store[parts[1]]
+                self.wfile.write(b"$%d\r\n%s\r\n" % (len(val), val))
+            elif cmd == b"GET":
+                self.wfile.write(b"$-1\r\n")
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+def test_shared_tier_over_redis_protocol():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _RespHandler)
+    server.daemon_threads = True
+    server.store = {}  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"redis://127.0.0.1:{server.server_address[1]}/0"
+    try:
+        first = ResponseCache(maxsize=8, ttl_sec=60, shared=RedisResponseCache(url))
+        second = ResponseCache(maxsize=8, ttl_sec=60, shared=RedisResponseCache(url))
+        first.put("k", {"legoPieces": [1, 2]})
+        assert second.get("k") == {"legoPieces": [1, 2]}
+        assert second.stats["hit_shared"] == 1
+        assert second.get("missing") is None
+        first.close()
+        second.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_unreachable_shared_tier_degrades_to_miss():
+    shared = RedisResponseCache("redis://127.0.0.1:1/0", timeout=0.2)
+    cache = ResponseCache(maxsize=8, ttl_sec=60, shared=shared)
+    cache.put("k", {"a": 1})
+    assert cache.get("k") == {"a": 1}
+    assert cache.get("other") is None
+    assert cache.stats["shared_errors"] >= 1
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from services.api import schema as gql_schema
+
+
+class _BatchCountingStore:
+    def __init__(self, scenarios):
+        self.scenarios = scenarios
+        self.batches = []
+
+    def get_scenarios(self, sids):
+        self.batches.append(list(sids))
+        return {sid: self.scenarios[sid] for sid in sids if sid in self.scenarios}
+
+    def get_scenario(self, sid):  # pragma: no cover - must not be used by resolvers
+        raise AssertionError("per-id fetch should go through the DataLoader")
+
+
+def _dsl(amount: int) -> str:
+    return json.dumps(
+        {
+            "version": 0.1,
+            "baseline_year": 2026,
+            "assumptions": {"horizon_years": 3},
+            "actions": [
+                {
+                    "id": "a1",
+                    "target": "mission.M_EDU",
+                    "dimension": "cp",
+                    "op": "increase",
+                    "amount_eur": amount,
+                    "recurring": True,
+                }
+            ],
+        }
+    )
+
+
+def test_aliased_scenario_fields_batch_into_one_store_query(monkeypatch):
+    store = _BatchCountingStore({"s1": _dsl(1_000_000), "s2": _dsl(2_000_000)})
+    monkeypatch.setattr("services.api.store.get_vote_store", lambda: store)
+
+    query = """
+      {
+        x: scenario(id: "s1") { id }
+        y: scenario(id: "s2") { id }
+        z: scenario(id: "s1") { id }
+      }
+    """
+    res = asyncio.run(gql_schema.schema.execute(query))
+    assert not res.errors, res.errors
+    assert res.data["x"]["id"] == res.data["z"]["id"]
+    assert res.data["x"]["id"] != res.data["y"]["id"]
+    assert store.batches == [["s1", "s2"]]
+
+
+def test_scenario_compare_loads_both_ids_in_one_batch(monkeypatch):
+    store = _BatchCountingStore({"s1": _dsl(1_000_000), "s2": _dsl(2_000_000)})
+    monkeypatch.setattr("services.api.store.get_vote_store", lambda: store)
+
+    res = asyncio.run(gql_schema.schema.execute('{ scenarioCompare(a: "s1", b: "s2") { waterfall } }'))
+    assert not res.errors, res.errors
+    assert store.batches == [["s1", "s2"]]
+
+
+def test_scenario_compare_against_baseline(monkeypatch):
+    store = _BatchCountingStore({"s1": _dsl(1_000_000)})
+    monkeypatch.setattr("services.api.store.get_vote_store", lambda: store)
+
+    res = asyncio.run(gql_schema.schema.execute('{ scenarioCompare(a: "s1") { a { id } b { id } } }'))
+    assert not res.errors, res.errors
+    assert res.data["scenarioCompare"]["b"]["id"]
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+
+import pytest
+
+from services.api import data_loader
+from services.api import schema as gql_schema
+from services.api.data_loader import run_scenario
+from services.api.votes_store import get_vote_store
+
+
+def _store(amounts: list[float], year: int = 2026) -> list[str]:
+    sids = []
+    for i, amount in enumerate(amounts):
+        obj = {
+            "version": 0.1,
+            "baseline_year": year,
+            "assumptions": {"horizon_years": 3},
+            "actions": [
+                {"id": f"mx_{i}", "target": "piece.ed_schools_staff_ops", "op": "decrease", "amount_eur": amount, "recurring": True},
+            ],
+        }
+        dsl = base64.b64encode(json.dumps(obj).encode("utf-8")).decode("ascii")
+        sid = run_scenario(dsl)[0]
+        get_vote_store().save_scenario(sid, json.dumps(obj))
+        sids.append(sid)
+    return sids
+
+
+MATRIX = """
+  query($ids: [ID!]!) {
+    scenarioMatrix(ids: $ids) {
+      ids baseline { id } scenarios { id accounting { deficitPath } }
+      cells { a b waterfall ribbons }
+    }
+  }
+"""
+
+
+def _ribbon_total(cell: dict) -> float:
+    return sum(r["amountEur"] for r in cell["ribbons"] if r["pieceId"] == "ed_schools_staff_ops")
+
+
+def test_matrix_loads_baseline_once_and_matches_pairwise_compare(monkeypatch):
+    sids = _store([1e9, 2e9, 4e9])
+    loads = {"n": 0}
+    real = data_loader._piece_amount_inputs
+
+    def counting(year):  # noqa: ANN001
+        loads["n"] += 1
+        return real(year)
+
+    monkeypatch.setattr(data_loader, "_piece_amount_inputs", counting)
+    res = asyncio.run(gql_schema.schema.execute(MATRIX, variable_values={"ids": sids}))
+    assert not res.errors
+    matrix = res.data["scenarioMatrix"]
+    assert loads["n"] == 1
+    assert matrix["ids"] == sids
+    assert [s["id"] for s in matrix["scenarios"]] == sids
+    # 3 scenarios vs baseline, then 3 pairs
+    assert [(c["a"], c["b"]) for c in matrix["cells"]] == [
+        (sids[0], None), (sids[1], None), (sids[2], None),
+        (sids[0], sids[1]), (sids[0], sids[2]), (sids[1], sids[2]),
+    ]
+    assert _ribbon_total(matrix["cells"][0]) == pytest.approx(-1e9)
+    assert _ribbon_total(matrix["cells"][4]) == pytest.approx(3e9)
+
+    compare = asyncio.run(
+        gql_schema.schema.execute(
+            "query($a: ID!, $b: ID!) { scenarioCompare(a: $a, b: $b) { waterfall ribbons } }",
+            variable_values={"a": sids[0], "b": sids[2]},
+        )
+    )
+    assert not compare.errors
+    assert compare.data["scenarioCompare"]["waterfall"] == matrix["cells"][4]["waterfall"]
+    assert compare.data["scenarioCompare"]["ribbons"] == matrix["cells"][4]["ribbons"]
+
+
+def test_matrix_rejects_unknown_and_mixed_year_scenarios():
+    sids = _store([1e9]) + _store([2e9], year=2027)
+    res = asyncio.run(gql_schema.schema.execute(MATRIX, variable_values={"ids": sids}))
+    assert res.errors and "same baseline_year" in res.errors[0].message
+    res = asyncio.run(gql_schema.schema.execute(MATRIX, variable_values={"ids": [sids[0], "f" * 64]}))
+    assert res.errors and "not found" in res.errors[0].message
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+
+import pytest
+import yaml
+
+from services.api import data_loader
+from services.api import schema as gql_schema
+from services.api.data_loader import run_scenario
+
+
+def _encode_dsl(dsl: dict) -> str:
+    return base64.b64encode(yaml.safe_dump(dsl).encode("utf-8")).decode("utf-8")
+
+
+DSL = _encode_dsl(
+    {
+        "version": 0.1,
+        "baseline_year": 2026,
+        "assumptions": {"horizon_years": 3, "lens": "MISSION"},
+        "actions": [
+            {"id": "edu", "target": "mission.M_EDU", "op": "increase", "amount_eur": 1_000_000_000, "recurring": True},
+        ],
+    }
+)
+
+
+def test_needs_subset_matches_full_evaluation():
+    sid, acc, comp, macro, reso, _w = run_scenario(DSL)
+    sid2, acc2, comp2, macro2, reso2, _w2 = run_scenario(DSL, needs={"accounting"})
+
+    assert sid2 == sid
+    assert acc2.deficit_path == pytest.approx(acc.deficit_path)
+    assert acc2.deficit_ratio_path == []
+    assert comp2.eu3pct == [] and comp2.local_balance == []
+    assert reso2["byMass"] == [] and reso2["lens"] == "MISSION"
+
+    _sid3, _acc3, _comp3, macro3, reso3, _w3 = run_scenario(DSL, needs={"resolution"})
+    assert reso3 == reso
+    assert macro3.delta_gdp == []
+
+
+def test_macro_kernel_skipped_when_only_resolution_is_needed(monkeypatch):
+    calls = {"n": 0}
+    real = data_loader._macro_kernel
+
+    def counting(*args, **kwargs):  # noqa: ANN001
+        calls["n"] += 1
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(data_loader, "_macro_kernel", counting)
+    run_scenario(DSL, needs={"resolution"})
+    assert calls["n"] == 0
+    run_scenario(DSL, needs={"accounting"})
+    assert calls["n"] == 1
+
+
+def test_run_scenario_mutation_passes_selection_needs(monkeypatch):
+    seen: list = []
+
+    def spy(dsl, lens=None, needs=None):  # noqa: ANN001
+        seen.append(needs)
+        return run_scenario(dsl, lens=lens, needs=needs)
+
+    monkeypatch.setattr(gql_schema, "run_scenario", spy)
+    query = """
+      mutation Run($dsl: String!) {
+        runScenario(input: { dsl: $dsl }) {
+          id
+          ...Paths
+          resolution { overallPct }
+        }
+      }
+      fragment Paths on RunScenarioPayload { accounting { deficitPath debtRatioPath } }
+    """
+    res = asyncio.run(gql_schema.schema.execute(query, variable_values={"dsl": DSL}))
+    assert not res.errors, res.errors
+    assert seen == [frozenset({"accounting", "ratios", "resolution"})]
+    assert len(res.data["runScenario"]["accounting"]["debtRatioPath"]) == 3
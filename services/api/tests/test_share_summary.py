@@ -0,0 +1,162 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from services.api import schema as gql_schema
+from services.api import share_summary
+from services.api import store as scenario_store_mod
+
+_CARD = 'query($id:ID!){ shareCard(scenarioId:$id){ title deficit debtDeltaPct highlight resolutionPct masses eu3 eu60 } }'
+
+
+def _dsl_b64(amount: int = 1_000_000_000) -> str:
+    dsl = {
+        "version": 0.1,
+        "baseline_year": 2026,
+        "assumptions": {"horizon_years": 3},
+        "actions": [
+            {
+                "id": "a1",
+                "target": "mission.M_EDU",
+                "dimension": "cp",
+                "op": "increase",
+                "amount_eur": amount,
+                "recurring": True,
+            }
+        ],
+    }
+    return base64.b64encode(json.dumps(dsl).encode("utf-8")).decode("ascii")
+
+
+@pytest.fixture
+def store(sqlite_store, monkeypatch):
+    monkeypatch.setattr(scenario_store_mod, "get_vote_store", lambda: sqlite_store)
+    monkeypatch.setattr(share_summary, "get_vote_store", lambda: sqlite_store)
+    return sqlite_store
+
+
+def _card(sid: str) -> dict:
+    res = asyncio.run(gql_schema.schema.execute(_CARD, variable_values={"id": sid}))
+    assert not res.errors, res.errors
+    return res.data["shareCard"]
+
+
+def test_sqlite_store_round_trips_share_summary(sqlite_store):
+    assert sqlite_store.get_share_summary("s1") is None
+    sqlite_store.save_scenario("s1", '{"v": 1}')
+    sqlite_store.save_share_summary("s1", '{"summary": {}}')
+    assert sqlite_store.get_share_summary("s1") == '{"summary": {}}'
+    # Re-saving the DSL keeps the summary next to it
+    sqlite_store.save_scenario("s1", '{"v": 1}')
+    assert sqlite_store.get_share_summary("s1") == '{"summary": {}}'
+
+
+def test_set_dsl_precomputes_summary_served_without_engine(store, monkeypatch):
+    dsl = _dsl_b64()
+    scenario_store_mod.set_dsl("sid-1", dsl)
+    stored = json.loads(store.get_share_summary("sid-1"))
+    assert stored["summary"]["deficit"] != 0.0
+
+    def _no_engine(*args, **kwargs):
+        raise AssertionError("shareCard must not re-run the engine for a stored summary")
+
+    monkeypatch.setattr("services.api.data_loader.run_scenario", _no_engine)
+    card = _card("sid-1")
+    assert card["title"] == "Scenario sid-1"
+    assert card["deficit"] == pytest.approx(stored["summary"]["deficit"])
+    assert card["masses"] == stored["summary"]["masses"]
+
+
+def test_run_scenario_summary_matches_lazy_backfill(store):
+    dsl = _dsl_b64(2_000_000_000)
+    res = asyncio.run(
+        gql_schema.schema.execute(
+            "mutation($dsl:String!){ runScenario(input:{dsl:$dsl}){ id } }", variable_values={"dsl": dsl}
+        )
+    )
+    assert not res.errors, res.errors
+    sid = res.data["runScenario"]["id"]
+    # The DSL and summary are written behind the response
+    assert scenario_store_mod.flush_pending_writes()
+    from_run = json.loads(store.get_share_summary(sid))["summary"]
+
+    # Older scenario: DSL stored without a summary, backfilled on first shareCard
+    store.save_share_summary(sid, None)
+    assert store.get_share_summary(sid) is None
+    card = _card(sid)
+    backfilled = json.loads(store.get_share_summary(sid))["summary"]
+    assert backfilled == from_run
+    assert card["deficit"] == pytest.approx(from_run["deficit"])
+
+
+def test_stale_vintage_summary_is_recomputed(store, monkeypatch):
+    dsl = _dsl_b64()
+    scenario_store_mod.set_dsl("sid-2", dsl)
+    assert share_summary.load_share_summary("sid-2") is not None
+
+    monkeypatch.setattr(share_summary, "data_vintage", lambda: "next-release")
+    assert share_summary.load_share_summary("sid-2") is None
+    _card("sid-2")
+    assert json.loads(store.get_share_summary("sid-2"))["vintage"] == "next-release"
+
+
+def test_unknown_scenario_returns_placeholder(store):
+    card = _card("missing")
+    assert card["deficit"] == 0.0
+    assert card["eu3"] == "info"
+    assert store.get_share_summary("missing") is None
+
+
+def test_rerun_of_stored_scenario_skips_persistence(store, monkeypatch):
+    dsl = _dsl_b64(3_000_000_000)
+    writes: list[str] = []
+    add_scenario = store.add_scenario
+
+    def _counting_add(sid, dsl_json):  # noqa: ANN001
+        writes.append(sid)
+        return add_scenario(sid, dsl_json)
+
+    monkeypatch.setattr(store, "add_scenario", _counting_add)
+    mutation = "mutation($dsl:String!){ runScenario(input:{dsl:$dsl}){ id } }"
+    for _ in range(3):
+        res = asyncio.run(gql_schema.schema.execute(mutation, variable_values={"dsl": dsl}))
+        assert not res.errors, res.errors
+        assert scenario_store_mod.flush_pending_writes()
+    sid = res.data["runScenario"]["id"]
+    assert writes == [sid]
+    assert store.get_share_summary(sid) is not None
+    # A fresh process seeds the filter from the newest stored scenarios
+    scenario_store_mod.get_known_scenarios().clear()
+    scenario_store_mod.set_dsl(sid, dsl)
+    assert writes == [sid]
+    # Content-addressed insert: an existing row is never rewritten
+    assert store.add_scenario(sid, "{}") is False
+    assert json.loads(store.get_scenario(sid))["actions"][0]["amount_eur"] == 3_000_000_000
+
+
+def test_scenario_dsl_reads_go_through_the_cache(store, monkeypatch):
+    reads: list[str] = []
+    get_scenario = store.get_scenario
+
+    def _counting_get(sid):  # noqa: ANN001
+        reads.append(sid)
+        return get_scenario(sid)
+
+    monkeypatch.setattr(store, "get_scenario", _counting_get)
+    dsl_store = scenario_store_mod.scenario_dsl_store
+    store.add_scenario("s1", json.dumps({"v": 1}))
+    for _ in range(3):
+        assert json.loads(base64.b64decode(dsl_store.get("s1"))) == {"v": 1}
+    assert reads == ["s1"]
+    # Misses are remembered too, until the sid is stored through set_dsl
+    assert dsl_store.get("s2") is None and "s2" not in dsl_store
+    assert dsl_store.get_many(["s1", "s2"]).keys() == {"s1"}
+    assert reads == ["s1", "s2"]
+    scenario_store_mod.set_dsl("s2", _dsl_b64())
+    assert "s2" in dsl_store
+    assert json.loads(base64.b64decode(dsl_store.get("s2")))["actions"][0]["id"] == "a1"
+    assert reads == ["s1", "s2"]
+    lines = "\n".join(scenario_store_mod.get_scenario_dsl_cache().metrics_lines())
+    assert 'cbl_scenario_dsl_cache_total{result="negative_hit"} 2' in lines
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import threading
+import time
+
+import yaml
+
+from services.api import schema as gql_schema
+from services.api.data_loader import run_scenario
+from services.api.singleflight import SingleFlight, get_scenario_flights
+from services.api.votes_store import get_vote_store
+
+DSL_OBJ = {
+    "version": 0.1,
+    "baseline_year": 2026,
+    "assumptions": {"horizon_years": 3, "lens": "MISSION"},
+    "actions": [
+        {"id": "sf_edu", "target": "mission.M_EDU", "op": "increase", "amount_eur": 2_000_000_000, "recurring": True},
+    ],
+}
+DSL = base64.b64encode(yaml.safe_dump(DSL_OBJ).encode("utf-8")).decode("utf-8")
+
+
+def test_concurrent_scenario_reads_run_the_engine_once(monkeypatch):
+    sid = run_scenario(DSL)[0]
+    get_vote_store().save_scenario(sid, json.dumps(DSL_OBJ))
+    calls = {"n": 0}
+    lock = threading.Lock()
+
+    def slow_run(dsl, lens=None, needs=None):  # noqa: ANN001
+        with lock:
+            calls["n"] += 1
+        time.sleep(0.2)
+        return run_scenario(dsl, lens=lens, needs=needs)
+
+    monkeypatch.setattr(gql_schema, "run_scenario", slow_run)
+    flights = get_scenario_flights()
+    before = dict(flights.stats)
+    query = "query($id: ID!) { scenario(id: $id) { id accounting { deficitPath } } }"
+
+    async def main():
+        return await asyncio.gather(*(gql_schema.schema.execute(query, variable_values={"id": sid}) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert all(not r.errors for r in results)
+    assert {r.data["scenario"]["id"] for r in results} == {sid}
+    assert calls["n"] == 1
+    assert flights.stats["leader"] - before["leader"] == 1
+    assert flights.stats["coalesced"] - before["coalesced"] == 4
+    assert flights.inflight() == 0
+
+
+def test_follower_needing_more_stages_leads_its_own_flight():
+    flights = SingleFlight(timeout_sec=5)
+    calls: list[str] = []
+
+    async def compute(tag: str):
+        calls.append(tag)
+        await asyncio.sleep(0.05)
+        return tag
+
+    async def main():
+        return await asyncio.gather(
+            flights.do("k", lambda: compute("acc"), needs={"accounting"}),
+            flights.do("k", lambda: compute("full"), needs=None),
+            flights.do("k", lambda: compute("acc2"), needs={"accounting"}),
+        )
+
+    assert asyncio.run(main()) == ["acc", "full", "acc"]
+    assert calls == ["acc", "full"]
+    assert flights.stats["coalesced"] == 1
+
+
+def test_follower_times_out_and_computes_itself():
+    flights = SingleFlight(timeout_sec=0.05)
+
+    async def stuck():
+        await asyncio.sleep(0.3)
+        return "leader"
+
+    async def fast():
+        return "follower"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do("k", stuck))
+        await asyncio.sleep(0)
+        follower = await flights.do("k", fast)
+        return follower, await leader
+
+    assert asyncio.run(main()) == ("follower", "leader")
+    assert flights.stats["timeout"] == 1
+
+
+def test_leader_error_propagates_to_followers():
+    flights = SingleFlight(timeout_sec=5)
+
+    async def boom():
+        await asyncio.sleep(0.02)
+        raise ValueError("engine failed")
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", boom) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert flights.stats["error"] == 1 and flights.stats["coalesced"] == 2
+    assert flights.inflight() == 0
+    assert 'result="coalesced"} 2' in "\n".join(flights.metrics_lines("sf"))
+
+
+def test_disabled_single_flight_calls_through():
+    flights = SingleFlight(timeout_sec=0)
+
+    async def one():
+        return 1
+
+    assert asyncio.run(flights.do("k", one)) == 1
+    assert flights.stats["leader"] == 0
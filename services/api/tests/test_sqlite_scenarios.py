@@ -29,3 +29,14 @@ def test_sqlite_scenario_update(sqlite_store):
 
 def test_sqlite_get_nonexistent(sqlite_store):
     assert sqlite_store.get_scenario("fake_id") is None
+
+
+def test_sqlite_get_scenarios_batch(sqlite_store):
+    sqlite_store.save_scenario("s1", json.dumps({"v": 1}))
+    sqlite_store.save_scenario("s2", json.dumps({"v": 2}))
+
+    found = sqlite_store.get_scenarios(["s1", "missing", "s2", "s1"])
+    assert set(found) == {"s1", "s2"}
+    assert json.loads(found["s2"]) == {"v": 2}
+    assert sqlite_store.has_scenario("s1")
+    assert not sqlite_store.has_scenario("missing")
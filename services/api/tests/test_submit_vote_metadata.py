@@ -1,3 +1,4 @@
+import asyncio
 from services.api import schema as gql_schema
 
 
@@ -58,10 +59,10 @@ def test_submit_vote_persists_qualtrics_metadata(monkeypatch):
         "finalVoteSnapshotTruncated": False,
     }
 
-    result = gql_schema.schema.execute_sync(
+    result = asyncio.run(gql_schema.schema.execute(
         SUBMIT_VOTE_MUTATION,
         variable_values=variables,
-    )
+    ))
     assert not result.errors
     assert result.data["submitVote"] is True
     assert len(store.calls) == 1
@@ -98,10 +99,10 @@ def test_submit_vote_sanitizes_invalid_metadata(monkeypatch, caplog):
     }
 
     with caplog.at_level("WARNING"):
-        result = gql_schema.schema.execute_sync(
+        result = asyncio.run(gql_schema.schema.execute(
             SUBMIT_VOTE_MUTATION,
             variable_values=variables,
-        )
+        ))
 
     assert not result.errors
     assert result.data["submitVote"] is True
@@ -123,3 +124,59 @@ def test_submit_vote_sanitizes_invalid_metadata(monkeypatch, caplog):
     assert "timestamp" in meta
 
     assert "submitVote metadata validation warnings" in caplog.text
+
+
+def test_submit_vote_awaits_async_store_without_io_thread(monkeypatch):
+    calls = []
+
+    class _AsyncVoteStore:
+        async def add_vote(self, scenario_id, user_email, meta):
+            calls.append((scenario_id, meta["idempotencyKey"]))
+
+    def _no_thread(*args, **kwargs):
+        raise AssertionError("submitVote used the I/O pool")
+
+    monkeypatch.setattr("services.api.votes_store.get_async_vote_store", lambda: _AsyncVoteStore())
+    monkeypatch.setattr(gql_schema, "run_io", _no_thread)
+
+    result = asyncio.run(gql_schema.schema.execute(
+        SUBMIT_VOTE_MUTATION,
+        variable_values={"scenarioId": "scenario-async-1", "respondentId": "r1"},
+    ))
+    assert not result.errors
+    assert result.data["submitVote"] is True
+    assert calls == [("scenario-async-1", "v1:scenario-async-1:r1")]
+
+
+def test_submit_vote_with_queue_skips_the_async_store(monkeypatch):
+    submitted = []
+
+    class _Queue:
+        def submit(self, scenario_id, user_email, meta):
+            submitted.append(scenario_id)
+
+    def _no_async_store():
+        raise AssertionError("async store looked up for a queued vote")
+
+    monkeypatch.setattr("services.api.vote_queue.get_vote_queue", lambda: _Queue())
+    monkeypatch.setattr("services.api.votes_store.get_async_vote_store", _no_async_store)
+
+    result = asyncio.run(gql_schema.schema.execute(
+        SUBMIT_VOTE_MUTATION,
+        variable_values={"scenarioId": "scenario-queued-1"},
+    ))
+    assert not result.errors
+    assert submitted == ["scenario-queued-1"]
+
+
+def test_app_startup_builds_the_vote_stores(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from services.api.app import create_app
+
+    built = []
+    monkeypatch.setattr("services.api.votes_store.get_async_vote_store", lambda: built.append(True))
+    app = create_app()
+    assert built == []
+    with TestClient(app):
+        assert built == [True]
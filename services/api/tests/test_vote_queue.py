@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from services.api.vote_queue import VoteQueueFull, WriteBehindVoteQueue
+from services.api.votes_store import SqliteVoteStore, VoteStore
+
+
+def test_queue_writes_votes_in_batches(tmp_path):
+    store = SqliteVoteStore(str(tmp_path / "votes.sqlite3"))
+    batches: list[int] = []
+    add_votes = store.add_votes
+
+    def counting(votes):  # noqa: ANN001
+        batches.append(len(votes))
+        add_votes(votes)
+
+    store.add_votes = counting  # type: ignore[method-assign]
+    queue = WriteBehindVoteQueue(lambda: store, batch_size=10, flush_ms=1000)
+    for i in range(25):
+        queue.submit(f"s{i % 2}", None, {"idempotencyKey": f"k{i}"})
+    # A replayed key is queued but stored once
+    queue.submit("s0", None, {"idempotencyKey": "k0"})
+    assert queue.close()
+    assert sum(batches) == 26 and max(batches) == 10 and len(batches) == 3
+    assert {row.scenario_id: row.votes for row in store.summary()} == {"s0": 13, "s1": 12}
+    assert 'cbl_vote_queue_total{result="written"} 26' in "\n".join(queue.metrics_lines())
+
+
+class FlakyStore(VoteStore):
+    def __init__(self) -> None:
+        self.calls = 0
+        self.keys: list[str] = []
+
+    def add_votes(self, votes):  # noqa: ANN001
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("connection reset")
+        self.keys.extend(meta["idempotencyKey"] for _sid, _email, meta in votes)
+
+
+def test_failed_batch_is_retried_with_stable_keys(monkeypatch):
+    monkeypatch.setattr("services.api.vote_queue._RETRY_BACKOFF_SEC", 0.0)
+    store = FlakyStore()
+    queue = WriteBehindVoteQueue(lambda: store, batch_size=5, flush_ms=1)
+    for _ in range(3):
+        queue.submit("s", None, {})
+    assert queue.flush(timeout_sec=5.0)
+    assert store.calls == 2 and queue.stats["retried"] == 1
+    # Keys assigned at enqueue time survive the retry, so a double write dedupes
+    assert len(store.keys) == 3 and all(key.startswith("wb:") for key in store.keys)
+    queue.close()
+
+
+class PoisonStore(VoteStore):
+    def __init__(self) -> None:
+        self.calls = 0
+        self.keys: list[str] = []
+
+    def add_votes(self, votes):  # noqa: ANN001
+        self.calls += 1
+        if any(meta.get("bad") for _sid, _email, meta in votes):
+            raise ValueError("invalid input syntax")
+        self.keys.extend(meta["idempotencyKey"] for _sid, _email, meta in votes)
+
+
+def test_rejected_vote_is_dropped_after_capped_retries(monkeypatch):
+    monkeypatch.setattr("services.api.vote_queue._RETRY_BACKOFF_SEC", 0.0)
+    store = PoisonStore()
+    queue = WriteBehindVoteQueue(lambda: store, batch_size=5, flush_ms=1)
+    queue.submit("s", None, {"idempotencyKey": "k1"})
+    queue.submit("s", None, {"idempotencyKey": "k2", "bad": True})
+    queue.submit("s", None, {"idempotencyKey": "k3"})
+    assert queue.flush(timeout_sec=5.0)
+    # 1 attempt + 3 retries of the batch, then one write per vote
+    assert store.calls == 4 + 3 and queue.stats["retried"] == 3
+    assert store.keys == ["k1", "k3"]
+    assert queue.stats["written"] == 2 and queue.stats["dropped"] == 1
+    assert 'cbl_vote_queue_total{result="dropped"} 1' in "\n".join(queue.metrics_lines())
+    # The next batch starts with a fresh retry budget
+    queue.submit("s", None, {"idempotencyKey": "k4"})
+    assert queue.flush(timeout_sec=5.0)
+    assert store.keys == ["k1", "k3", "k4"]
+    queue.close()
+
+
+def test_connection_errors_are_retried_without_dropping(monkeypatch):
+    monkeypatch.setattr("services.api.vote_queue._RETRY_BACKOFF_SEC", 0.0)
+
+    class DownStore(VoteStore):
+        def __init__(self) -> None:
+            self.calls = 0
+            self.written = 0
+
+        def add_votes(self, votes):  # noqa: ANN001
+            self.calls += 1
+            if self.calls <= 10:
+                raise ConnectionRefusedError("store unreachable")
+            self.written += len(votes)
+
+    store = DownStore()
+    queue = WriteBehindVoteQueue(lambda: store, batch_size=5, flush_ms=1)
+    for _ in range(3):
+        queue.submit("s", None, {})
+    assert queue.flush(timeout_sec=5.0)
+    assert store.written == 3 and queue.stats["dropped"] == 0 and queue.stats["retried"] == 10
+    queue.close()
+
+
+def test_full_queue_blocks_then_rejects():
+    release = threading.Event()
+
+    class StuckStore(VoteStore):
+        def add_votes(self, votes):  # noqa: ANN001
+            release.wait(5.0)
+
+    queue = WriteBehindVoteQueue(lambda: StuckStore(), batch_size=2, flush_ms=1, max_pending=2, enqueue_timeout_sec=0.05)
+    queue.submit("s", None, {})
+    queue.submit("s", None, {})
+    with pytest.raises(VoteQueueFull):
+        queue.submit("s", None, {})
+    assert queue.stats["rejected"] == 1
+    release.set()
+    assert queue.close()
+    with pytest.raises(VoteQueueFull):
+        queue.submit("s", None, {})
@@ -1,3 +1,4 @@
+import json
 import os
 import sqlite3
 from types import SimpleNamespace
@@ -173,3 +174,86 @@ def test_postgres_vote_store_roundtrip():
     store.close()
 
     assert any(item.scenario_id == "scenario-a" for item in summary)
+
+
+def test_file_vote_store_appends_jsonl_and_replays(tmp_path):
+    path = tmp_path / "votes.json"
+    store = FileVoteStore(str(path), fsync_interval_sec=0)
+    store.save_scenario("scenario-a", '{"actions": []}')
+    store.save_share_summary("scenario-a", '{"summary": {}}')
+    store.add_vote("scenario-a", None, {"idempotencyKey": "k1"})
+    store.add_vote("scenario-a", None, {"idempotencyKey": "k1"})
+    store.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["op"] for line in lines] == ["scenario", "shareSummary", "vote"]
+
+    # A torn final write is dropped on replay
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op": "vote", "scenarioId": "scen')
+    reopened = FileVoteStore(str(path))
+    assert reopened.get_scenario("scenario-a") == '{"actions": []}'
+    assert reopened.get_share_summary("scenario-a") == '{"summary": {}}'
+    assert reopened.summary()[0].votes == 1
+    reopened.add_vote("scenario-a", None, {"idempotencyKey": "k1"})
+    reopened.add_vote("scenario-a", None, {"idempotencyKey": "k2"})
+    reopened.close()
+    assert FileVoteStore(str(path)).summary()[0].votes == 2
+
+
+def test_file_vote_store_reads_and_converts_legacy_layout(tmp_path):
+    path = tmp_path / "votes.json"
+    legacy = {
+        "votes": [{"id": "v1", "scenarioId": "scenario-a", "timestamp": 1.0, "meta": {"idempotencyKey": "k1"}}],
+        "scenarios": {"scenario-a": '{"actions": []}'},
+        "shareSummaries": {},
+    }
+    path.write_text(json.dumps(legacy, indent=2))
+
+    store = FileVoteStore(str(path))
+    assert store.get_scenario("scenario-a") == '{"actions": []}'
+    store.add_vote("scenario-a", None, {"idempotencyKey": "k1"})
+    assert store.summary()[0].votes == 1
+    store.close()
+    ops = [json.loads(line)["op"] for line in path.read_text().splitlines()]
+    assert ops == ["scenario", "vote"]
+
+
+def test_file_vote_store_compacts_superseded_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(FileVoteStore, "COMPACT_MIN_RECORDS", 10)
+    path = tmp_path / "votes.json"
+    store = FileVoteStore(str(path), fsync_interval_sec=0)
+    store.save_scenario("scenario-a", '{"actions": []}')
+    for i in range(20):
+        store.save_share_summary("scenario-a", json.dumps({"n": i}))
+    store.close()
+
+    assert len(path.read_text().splitlines()) < 10
+    assert FileVoteStore(str(path)).get_share_summary("scenario-a") == json.dumps({"n": 19})
+
+
+def test_sqlite_vote_store_reuses_tuned_connection_per_thread(tmp_path):
+    import threading
+
+    store = SqliteVoteStore(str(tmp_path / "votes.sqlite3"), busy_timeout_ms=1234)
+    conn = store._connect()
+    with store._connect() as again:
+        assert again is conn
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other: list = []
+    thread = threading.Thread(target=lambda: other.append(store._connect()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+    store.add_vote("scenario-a", None, {})
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    # The store stays usable after close(): the thread reconnects
+    store.add_vote("scenario-a", None, {})
+    assert store.summary()[0].votes == 2
+    store.close()
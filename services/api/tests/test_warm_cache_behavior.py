@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import json
 import os
@@ -6,7 +7,7 @@ from services.api import schema as gql_schema
 
 
 def _gql(q: str, variables: dict | None = None):
-    res = gql_schema.schema.execute_sync(q, variable_values=variables or {})
+    res = asyncio.run(gql_schema.schema.execute(q, variable_values=variables or {}))
     if res.errors:
         raise AssertionError(res.errors)
     return res.data
@@ -0,0 +1,257 @@
+"""Write-behind ingestion of ``submitVote``.
+
+With ``VOTES_WRITE_BEHIND_ENABLED=1`` a vote is acknowledged once it sits in an
+in-process queue; a flusher thread drains the queue every
+``VOTES_WRITE_BEHIND_FLUSH_MS`` or as soon as ``VOTES_WRITE_BEHIND_BATCH_SIZE``
+votes are pending, writing each batch through ``VoteStore.add_votes`` (one
+multi-row insert plus one aggregated ``vote_stats`` upsert on Postgres).
+
+- Bounded memory: at most ``VOTES_WRITE_BEHIND_MAX_PENDING`` votes are held. A
+  full queue blocks the submitting thread up to the enqueue timeout
+  (back-pressure), then rejects the vote so the client retries.
+- At-least-once: a batch that fails to write stays at the head of the queue
+  and is retried. Every queued vote carries an idempotency key (one is
+  assigned when the request did not derive one), so a batch written twice is
+  stored once. Connection errors are retried for as long as they last; a
+  batch the store keeps rejecting otherwise is written vote by vote after
+  ``_MAX_BATCH_RETRIES`` retries, and the votes it still refuses are logged
+  and dropped (``cbl_vote_queue_total{result="dropped"}``).
+- The app's shutdown hook drains the queue before closing the vote store.
+  Votes still queued when the process is killed outright are lost.
+
+Vote counts read back (``voteSummary``) lag by at most one flush interval.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .metrics import counter_lines
+from .settings import get_settings
+from .votes_store import VoteInput, VoteStore, get_vote_store
+
+logger = logging.getLogger(__name__)
+
+# Pause between retries of a batch the store refused
+_RETRY_BACKOFF_SEC = 0.5
+# Retries of a rejected batch before it is split to drop the failing votes
+_MAX_BATCH_RETRIES = 3
+
+# Driver errors meaning "the store is unreachable" (psycopg, sqlite3, pools)
+_TRANSIENT_ERROR_NAMES = frozenset({"OperationalError", "InterfaceError", "PoolTimeout"})
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """True for connection-level failures, which are retried without limit."""
+    if isinstance(exc, OSError):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+class VoteQueueFull(RuntimeError):
+    """The queue stayed full for the whole enqueue timeout."""
+
+
+class WriteBehindVoteQueue:
+    """Bounded in-process vote queue flushed in batches by a daemon thread."""
+
+    def __init__(
+        self,
+        store: Callable[[], VoteStore],
+        batch_size: int = 200,
+        flush_ms: float = 50.0,
+        max_pending: int = 10000,
+        enqueue_timeout_sec: float = 2.0,
+    ) -> None:
+        self._store = store
+        self.batch_size = max(1, int(batch_size))
+        self.flush_sec = max(0.001, float(flush_ms) / 1000.0)
+        self.max_pending = max(self.batch_size, int(max_pending))
+        self.enqueue_timeout_sec = max(0.0, float(enqueue_timeout_sec))
+        self._pending: Deque[VoteInput] = deque()
+        self._inflight = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        # Consecutive non-transient failures of the batch at the head of the queue
+        self._failures = 0
+        self.stats: Dict[str, int] = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "rejected": 0,
+            "retried": 0,
+            "dropped": 0,
+        }
+
+    def submit(self, scenario_id: str, user_email: Optional[str], meta: Dict[str, Any]) -> None:
+        """Queue one vote, waiting for room while the queue is full."""
+        meta = dict(meta)
+        if not str(meta.get("idempotencyKey") or "").strip():
+            # Retried batches rely on the key to be written once
+            meta["idempotencyKey"] = f"wb:{uuid.uuid4().hex}"
+        deadline = time.monotonic() + self.enqueue_timeout_sec
+        with self._cond:
+            if self._closed:
+                raise VoteQueueFull("vote queue is closed")
+            while len(self._pending) + self._inflight >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    self.stats["rejected"] += 1
+                    raise VoteQueueFull(f"{self.max_pending} votes pending")
+                self._cond.wait(remaining)
+            self._pending.append((scenario_id, user_email, meta))
+            self.stats["enqueued"] += 1
+            if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                # Start the flush timer, or cut it short for a full batch
+                self._cond.notify_all()
+        self._ensure_started()
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._pending) + self._inflight
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="cbl-vote-write-behind", daemon=True)
+                self._thread.start()
+
+    def _take_batch(self) -> List[VoteInput]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if len(self._pending) < self.batch_size and not self._closed:
+                self._cond.wait(self.flush_sec)
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            self._inflight = len(batch)
+            return batch
+
+    def _write(self, batch: List[VoteInput]) -> bool:
+        try:
+            self._store().add_votes(batch)
+        except Exception as exc:
+            with self._cond:
+                if not _is_transient(exc):
+                    self._failures += 1
+                split = self._failures > _MAX_BATCH_RETRIES
+            if split:
+                return self._write_one_by_one(batch)
+            logger.warning("Vote write-behind flush of %d votes failed: %s", len(batch), exc)
+            self._requeue(batch)
+            return False
+        self._done(written=len(batch))
+        return True
+
+    def _write_one_by_one(self, batch: List[VoteInput]) -> bool:
+        """Write a batch the store keeps rejecting vote by vote, dropping the votes it refuses."""
+        written = dropped = 0
+        for index, vote in enumerate(batch):
+            try:
+                self._store().add_votes([vote])
+            except Exception as exc:
+                if _is_transient(exc):
+                    logger.warning("Vote write-behind flush of %d votes failed: %s", len(batch) - index, exc)
+                    self._requeue(batch[index:], written=written, dropped=dropped)
+                    return False
+                logger.error(
+                    "Vote write-behind dropped a vote for scenario %s (idempotency key %s): %s",
+                    vote[0],
+                    vote[2].get("idempotencyKey"),
+                    exc,
+                )
+                dropped += 1
+            else:
+                written += 1
+        self._done(written=written, dropped=dropped)
+        return True
+
+    def _requeue(self, votes: List[VoteInput], written: int = 0, dropped: int = 0) -> None:
+        with self._cond:
+            # Keep arrival order: the failed votes go back to the head
+            self._pending.extendleft(reversed(votes))
+            self._inflight = 0
+            self.stats["written"] += written
+            self.stats["dropped"] += dropped
+            self.stats["retried"] += 1
+
+    def _done(self, written: int, dropped: int = 0) -> None:
+        with self._cond:
+            self._failures = 0
+            self._inflight = 0
+            self.stats["written"] += written
+            self.stats["dropped"] += dropped
+            self.stats["batches"] += 1
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return  # closed and drained
+            if not self._write(batch):
+                with self._cond:
+                    if self._closed:
+                        return  # shutting down: close() reports what is left
+                time.sleep(_RETRY_BACKOFF_SEC)
+
+    def flush(self, timeout_sec: float = 10.0) -> bool:
+        """Wait until every vote queued so far is written; False on timeout."""
+        deadline = time.monotonic() + timeout_sec
+        with self._cond:
+            while self._pending or self._inflight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.notify_all()
+                self._cond.wait(min(remaining, self.flush_sec))
+        return True
+
+    def close(self, timeout_sec: float = 10.0) -> bool:
+        """Stop accepting votes and drain the queue; False if votes were left unwritten."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=timeout_sec)
+        remaining = self.depth()
+        if remaining:
+            logger.error("Vote write-behind shut down with %d votes unwritten", remaining)
+        return remaining == 0
+
+    def metrics_lines(self) -> List[str]:
+        with self._cond:
+            stats = dict(self.stats)
+            depth = len(self._pending) + self._inflight
+        lines = [f"cbl_vote_queue_depth {depth}", f"cbl_vote_queue_capacity {self.max_pending}"]
+        return lines + counter_lines("cbl_vote_queue", stats)
+
+
+@lru_cache(maxsize=1)
+def get_vote_queue() -> Optional[WriteBehindVoteQueue]:
+    settings = get_settings()
+    if not settings.votes_write_behind_enabled:
+        return None
+    return WriteBehindVoteQueue(
+        get_vote_store,
+        batch_size=settings.votes_write_behind_batch_size,
+        flush_ms=settings.votes_write_behind_flush_ms,
+        max_pending=settings.votes_write_behind_max_pending,
+        enqueue_timeout_sec=settings.votes_write_behind_enqueue_timeout_sec,
+    )
+
+
+def close_vote_queue() -> None:
+    if get_vote_queue.cache_info().currsize == 0:
+        return
+    queue = get_vote_queue()
+    if queue is not None:
+        queue.close()
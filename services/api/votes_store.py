@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import heapq
 import json
 import logging
 import os
 import sqlite3
+import threading
 import time
 import uuid
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from .db.migrations import apply_migrations, votes_migrations_dir
+from .db.migrations import apply_migrations, ensure_vote_partitions, votes_migrations_dir
+from .leaderboard import Leaderboard
 from .settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -23,6 +28,22 @@ class VoteSummary:
     last_vote_ts: float | None
 
 
+@dataclass(frozen=True)
+class SavedScenario:
+    scenario_id: str
+    created_at: str | None
+    meta: Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class ExportedVote:
+    vote_id: str
+    scenario_id: str
+    timestamp: float
+    meta: Dict[str, Any]
+    dsl_json: str | None
+
+
 @dataclass(frozen=True)
 class VoteStoreConfigStatus:
     ok: bool
@@ -34,19 +55,79 @@ class VoteStoreConfigStatus:
     errors: tuple[str, ...]
 
 
+VoteInput = Tuple[str, Optional[str], Dict[str, Any]]
+
+
 class VoteStore:
+    # Top-N of ``summary``, fed by every accepted vote (None = always query)
+    leaderboard: Optional[Leaderboard] = None
+
     def add_vote(self, scenario_id: str, user_email: Optional[str], meta: Dict[str, Any]) -> None:
         raise NotImplementedError
 
-    def summary(self, limit: int = 25) -> List[VoteSummary]:
+    def add_votes(self, votes: List[VoteInput]) -> None:
+        """Record ``(scenario_id, user_email, meta)`` votes together; replayed idempotency keys are dropped."""
+        for scenario_id, user_email, meta in votes:
+            self.add_vote(scenario_id, user_email, meta)
+
+    def summary(self, limit: int = 25, after: Optional[Tuple[int, str]] = None) -> List[VoteSummary]:
+        """Most-voted scenarios, ordered by ``(votes DESC, scenario_id)``.
+
+        ``after`` is the ``(votes, scenario_id)`` key of the last row of the
+        previous page; rows strictly after it are returned.
+        """
+        board = self.leaderboard
+        if board is not None and after is None:
+            rows = board.top(limit, lambda n: self._summary(n, None))
+            if rows is not None:
+                return rows
+        return self._summary(limit, after)
+
+    def _summary(self, limit: int, after: Optional[Tuple[int, str]]) -> List[VoteSummary]:
+        raise NotImplementedError
+
+    def list_scenarios(self, limit: int = 50, after: Optional[Tuple[str, str]] = None) -> List[SavedScenario]:
+        """Stored scenarios, newest first, ordered by ``(created_at DESC, id DESC)``."""
+        return []
+
+    def iter_votes(self, after: Optional[Tuple[float, str]] = None, chunk_size: int = 1000) -> Iterator[ExportedVote]:
+        """Every vote with its scenario DSL, ordered by ``(timestamp, id)``, strictly after ``after``.
+
+        Rows are read ``chunk_size`` at a time: memory does not grow with the table.
+        """
         raise NotImplementedError
 
     def save_scenario(self, sid: str, dsl_json: str, meta_json: str | None = None) -> None:
         pass
 
+    def add_scenario(self, sid: str, dsl_json: str) -> bool:
+        """Store a content-addressed scenario unless ``sid`` exists; True when a row was written."""
+        if self.has_scenario(sid):
+            return False
+        self.save_scenario(sid, dsl_json)
+        return True
+
     def get_scenario(self, sid: str) -> Optional[str]:
         return None
 
+    def get_scenarios(self, sids: List[str]) -> Dict[str, str]:
+        """Return stored DSL JSON for every known sid in one round-trip."""
+        out: Dict[str, str] = {}
+        for sid in dict.fromkeys(sids):
+            dsl = self.get_scenario(sid)
+            if dsl:
+                out[sid] = dsl
+        return out
+
+    def has_scenario(self, sid: str) -> bool:
+        return self.get_scenario(sid) is not None
+
+    def save_share_summary(self, sid: str, summary_json: str) -> None:
+        pass
+
+    def get_share_summary(self, sid: str) -> Optional[str]:
+        return None
+
     def close(self) -> None:
         pass
 
@@ -63,6 +144,38 @@ def _normalize_meta(meta: Optional[Dict[str, Any]], user_email: Optional[str]) -
     return normalized
 
 
+def _vote_row(scenario_id: str, user_email: Optional[str], meta: Dict[str, Any]) -> Tuple[Any, ...]:
+    """``(id, scenario_id, timestamp, user_email, meta_json, idempotency_key)`` for the votes table."""
+    normalized = _normalize_meta(meta, user_email)
+    ts = float(normalized.get("timestamp") or time.time())
+    payload = json.dumps(normalized, ensure_ascii=False)
+    return (
+        uuid.uuid4().hex,
+        scenario_id,
+        ts,
+        normalized.get("userEmail"),
+        payload,
+        _idempotency_key_from_meta(normalized),
+    )
+
+
+def _meta_dict(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    if not value:
+        return {}
+    try:
+        obj = json.loads(value)
+    except Exception:
+        return {}
+    return obj if isinstance(obj, dict) else {}
+
+
+def _dsl_text(value: Any) -> str:
+    # Postgres returns JSONB columns as dict/list; SQLite and files keep the JSON text.
+    return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+
 def _normalize_backend(raw_backend: Optional[str]) -> str:
     return str(raw_backend or "file").strip().lower()
 
@@ -127,63 +240,208 @@ def validate_vote_store_configuration() -> None:
 
 
 class FileVoteStore(VoteStore):
-    def __init__(self, path: str) -> None:
+    """Single-process vote store for local dev and kiosks, kept as an append-only JSONL log.
+
+    Every write appends one record (``{"op": "vote" | "scenario" | "shareSummary", ...}``)
+    and flushes it; fsyncs are batched to at most one per ``fsync_interval_sec``.
+    The log is replayed into memory on start, with an index of
+    ``(scenario_id, idempotencyKey)`` for O(1) dedup. Superseded records
+    (rewritten scenarios and share summaries) are dropped by compaction, which
+    rewrites the live state to a temp file and swaps it in. A file in the legacy
+    single-JSON layout is read and compacted into the log format on open.
+    """
+
+    COMPACT_MIN_RECORDS = 1000
+    COMPACT_RATIO = 2.0
+
+    def __init__(self, path: str, fsync_interval_sec: float = 1.0, leaderboard_size: int = 100) -> None:
         self.path = path
+        self.fsync_interval_sec = max(0.0, float(fsync_interval_sec))
+        # The in-memory counts are authoritative: the top-N never needs a refresh
+        self.leaderboard = Leaderboard(leaderboard_size)
         self._votes: List[Dict[str, Any]] = []
+        self._stats: Dict[str, VoteSummary] = {}
         self._scenarios: Dict[str, str] = {}
+        self._share_summaries: Dict[str, str] = {}
+        self._idempotency: set[Tuple[str, str]] = set()
+        self._log_records = 0
+        self._lock = threading.RLock()
+        self._fh: Optional[Any] = None
+        self._last_fsync = 0.0
+        self._fsync_timer: Optional[threading.Timer] = None
         self._load()
 
     def _ensure_dir(self) -> None:
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def _reset(self) -> None:
+        self._votes = []
+        self._stats = {}
+        self._scenarios = {}
+        self._share_summaries = {}
+        self._idempotency = set()
+        self._log_records = 0
+        self.leaderboard.invalidate()
+
+    def _index_vote(self, record: Dict[str, Any]) -> Optional[VoteSummary]:
+        """Index a vote for dedup and count it in ``_stats``; returns the scenario's new row."""
+        sid = str(record.get("scenarioId") or "")
+        meta = record.get("meta")
+        key = _idempotency_key_from_meta(meta) if isinstance(meta, dict) else None
+        if key:
+            self._idempotency.add((sid, key))
+        if not sid:
+            return None
+        ts = record.get("timestamp")
+        last_ts = float(ts) if isinstance(ts, (int, float)) else None
+        current = self._stats.get(sid)
+        if current is not None:
+            if current.last_vote_ts is not None and (last_ts is None or current.last_vote_ts > last_ts):
+                last_ts = current.last_vote_ts
+        row = VoteSummary(scenario_id=sid, votes=(current.votes if current else 0) + 1, last_vote_ts=last_ts)
+        self._stats[sid] = row
+        return row
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        op = record.get("op")
+        if op == "vote":
+            vote = {k: v for k, v in record.items() if k != "op"}
+            self._votes.append(vote)
+            self._index_vote(vote)
+        elif op == "scenario":
+            self._scenarios[str(record.get("id"))] = record.get("dsl")
+        elif op == "shareSummary":
+            self._share_summaries[str(record.get("id"))] = record.get("summary")
+
+    def _load_legacy(self, obj: Any) -> None:
+        # Pre-JSONL layout: {"votes": [...], "scenarios": {...}, "shareSummaries": {...}} or a bare vote list
+        if isinstance(obj, list):
+            votes, scenarios, summaries = obj, {}, {}
+        else:
+            votes, scenarios, summaries = obj.get("votes"), obj.get("scenarios"), obj.get("shareSummaries")
+        self._votes = [v for v in votes if isinstance(v, dict)] if isinstance(votes, list) else []
+        self._stats = {}
+        self._scenarios = scenarios if isinstance(scenarios, dict) else {}
+        self._share_summaries = summaries if isinstance(summaries, dict) else {}
+        for vote in self._votes:
+            self._index_vote(vote)
 
     def _load(self) -> None:
         self._ensure_dir()
+        self._reset()
         if not os.path.exists(self.path):
-            self._votes = []
-            self._scenarios = {}
             return
         try:
-            with open(self.path, "r", encoding="utf-8") as f:
-                obj = json.load(f)
-                if isinstance(obj, list):
-                    self._votes = obj
-                    self._scenarios = {}
-                elif isinstance(obj, dict):
-                    votes = obj.get("votes")
-                    scenarios = obj.get("scenarios")
-                    self._votes = votes if isinstance(votes, list) else []
-                    self._scenarios = scenarios if isinstance(scenarios, dict) else {}
-                else:
-                    self._votes = []
-                    self._scenarios = {}
+            with open(self.path, "rb") as f:
+                raw = f.read()
         except Exception:
-            self._votes = []
-            self._scenarios = {}
-
-    def _save(self) -> None:
-        self._ensure_dir()
+            return
         try:
-            with open(self.path, "w", encoding="utf-8") as f:
-                json.dump(
-                    {"votes": self._votes, "scenarios": self._scenarios},
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                )
-        except Exception:
-            pass
+            legacy = json.loads(raw.decode("utf-8"))
+        except ValueError:
+            legacy = None
+        if isinstance(legacy, list) or (isinstance(legacy, dict) and "op" not in legacy):
+            self._load_legacy(legacy)
+            logger.info("Converting legacy vote file %s to the JSONL log format", self.path)
+            self.compact()
+            return
+        good_end = 0
+        pos = 0
+        for line in raw.splitlines(keepends=True):
+            pos += len(line)
+            if not line.endswith(b"\n"):
+                break  # torn final write
+            good_end = pos
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping unreadable record in %s", self.path)
+                continue
+            if isinstance(record, dict):
+                self._apply(record)
+                self._log_records += 1
+        if good_end < len(raw):
+            with open(self.path, "r+b") as f:
+                f.truncate(good_end)
+
+    def _open(self) -> Any:
+        if self._fh is None:
+            self._ensure_dir()
+            self._fh = open(self.path, "a", encoding="utf-8")
+        return self._fh
+
+    def _sync(self) -> None:
+        with self._lock:
+            self._fsync_timer = None
+            if self._fh is None:
+                return
+            try:
+                os.fsync(self._fh.fileno())
+            except (OSError, ValueError):
+                pass
+            self._last_fsync = time.monotonic()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        fh = self._open()
+        fh.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        fh.flush()
+        self._log_records += 1
+        if time.monotonic() - self._last_fsync >= self.fsync_interval_sec:
+            self._sync()
+        elif self._fsync_timer is None:
+            # Batch: one fsync for every write of the next interval
+            self._fsync_timer = threading.Timer(self.fsync_interval_sec, self._sync)
+            self._fsync_timer.daemon = True
+            self._fsync_timer.start()
+        live = len(self._votes) + len(self._scenarios) + len(self._share_summaries)
+        if self._log_records >= self.COMPACT_MIN_RECORDS and self._log_records > self.COMPACT_RATIO * live:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log with only the live records (atomic rename)."""
+        with self._lock:
+            self._ensure_dir()
+            tmp = f"{self.path}.compact"
+            records = 0
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    for sid, dsl in self._scenarios.items():
+                        f.write(json.dumps({"op": "scenario", "id": sid, "dsl": dsl}, ensure_ascii=False, separators=(",", ":")) + "\n")
+                        records += 1
+                    for sid, summary in self._share_summaries.items():
+                        f.write(json.dumps({"op": "shareSummary", "id": sid, "summary": summary}, ensure_ascii=False, separators=(",", ":")) + "\n")
+                        records += 1
+                    for vote in self._votes:
+                        f.write(json.dumps({"op": "vote", **vote}, ensure_ascii=False, separators=(",", ":")) + "\n")
+                        records += 1
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._close_handle()
+                os.replace(tmp, self.path)
+                self._log_records = records
+            except Exception as e:
+                logger.error(f"Failed to compact vote file {self.path}: {e}")
+
+    def _close_handle(self) -> None:
+        if self._fsync_timer is not None:
+            self._fsync_timer.cancel()
+            self._fsync_timer = None
+        if self._fh is not None:
+            try:
+                self._fh.flush()
+                os.fsync(self._fh.fileno())
+            except (OSError, ValueError):
+                pass
+            self._fh.close()
+            self._fh = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_handle()
 
     def add_vote(self, scenario_id: str, user_email: Optional[str], meta: Dict[str, Any]) -> None:
         normalized = _normalize_meta(meta, user_email)
         idempotency_key = _idempotency_key_from_meta(normalized)
-        if idempotency_key:
-            for existing in self._votes:
-                if existing.get("scenarioId") != scenario_id:
-                    continue
-                existing_meta = existing.get("meta")
-                if isinstance(existing_meta, dict):
-                    if _idempotency_key_from_meta(existing_meta) == idempotency_key:
-                        return
         ts = float(normalized.get("timestamp") or time.time())
         record = {
             "id": uuid.uuid4().hex,
@@ -192,87 +450,211 @@ class FileVoteStore(VoteStore):
             "userEmail": normalized.get("userEmail"),
             "meta": normalized,
         }
-        self._votes.append(record)
-        self._save()
+        with self._lock:
+            if idempotency_key and (scenario_id, idempotency_key) in self._idempotency:
+                return
+            try:
+                self._append({"op": "vote", **record})
+            except Exception as e:
+                logger.error(f"Failed to append vote to {self.path}: {e}")
+            self._votes.append(record)
+            row = self._index_vote(record)
+            if row is not None:
+                self.leaderboard.record(row)
 
-    def summary(self, limit: int = 25) -> List[VoteSummary]:
-        counts: Dict[str, Dict[str, Any]] = {}
-        for vote in self._votes:
-            sid = str(vote.get("scenarioId") or "")
-            if not sid:
+    def iter_votes(self, after: Optional[Tuple[float, str]] = None, chunk_size: int = 1000) -> Iterator[ExportedVote]:
+        # The log is held in memory anyway: sort a snapshot of it
+        with self._lock:
+            votes = [(float(v.get("timestamp") or 0.0), str(v.get("id") or ""), v) for v in self._votes]
+            scenarios = dict(self._scenarios)
+        votes.sort(key=lambda item: item[:2])
+        for ts, vote_id, vote in votes:
+            if after is not None and (ts, vote_id) <= (float(after[0]), str(after[1])):
                 continue
-            entry = counts.setdefault(sid, {"votes": 0, "last_ts": None})
-            entry["votes"] += 1
-            ts = vote.get("timestamp")
-            if isinstance(ts, (int, float)):
-                entry["last_ts"] = max(entry["last_ts"] or 0.0, float(ts))
-        summaries = [
-            VoteSummary(scenario_id=sid, votes=val["votes"], last_vote_ts=val["last_ts"])
-            for sid, val in counts.items()
-        ]
-        summaries.sort(key=lambda s: s.votes, reverse=True)
-        return summaries[: max(limit, 0)]
+            sid = str(vote.get("scenarioId") or "")
+            meta = vote.get("meta")
+            dsl = scenarios.get(sid)
+            yield ExportedVote(
+                vote_id=vote_id,
+                scenario_id=sid,
+                timestamp=ts,
+                meta=dict(meta) if isinstance(meta, dict) else {},
+                dsl_json=_dsl_text(dsl) if dsl else None,
+            )
+
+    def _summary(self, limit: int, after: Optional[Tuple[int, str]]) -> List[VoteSummary]:
+        with self._lock:
+            summaries = list(self._stats.values())
+        if after is not None:
+            votes, sid = int(after[0]), str(after[1])
+            summaries = [s for s in summaries if s.votes < votes or (s.votes == votes and s.scenario_id > sid)]
+        return heapq.nsmallest(max(limit, 0), summaries, key=lambda s: (-s.votes, s.scenario_id))
 
     def save_scenario(self, sid: str, dsl_json: str, meta_json: str | None = None) -> None:
-        self._scenarios[sid] = dsl_json
-        self._save()
+        with self._lock:
+            if self._scenarios.get(sid) == dsl_json:
+                return
+            self._scenarios[sid] = dsl_json
+            try:
+                self._append({"op": "scenario", "id": sid, "dsl": dsl_json})
+            except Exception as e:
+                logger.error(f"Failed to append scenario to {self.path}: {e}")
+
+    def add_scenario(self, sid: str, dsl_json: str) -> bool:
+        with self._lock:
+            if sid in self._scenarios:
+                return False
+            self.save_scenario(sid, dsl_json)
+            return True
 
     def get_scenario(self, sid: str) -> Optional[str]:
         return self._scenarios.get(sid)
 
+    def get_scenarios(self, sids: List[str]) -> Dict[str, str]:
+        return {sid: self._scenarios[sid] for sid in sids if sid in self._scenarios}
+
+    def has_scenario(self, sid: str) -> bool:
+        return sid in self._scenarios
+
+    def list_scenarios(self, limit: int = 50, after: Optional[Tuple[str, str]] = None) -> List[SavedScenario]:
+        # The file keeps no timestamps: newest first is reverse insertion order.
+        ids = list(reversed(self._scenarios))
+        start = 0
+        if after is not None:
+            try:
+                start = ids.index(str(after[1])) + 1
+            except ValueError:
+                return []
+        return [SavedScenario(scenario_id=sid, created_at=None, meta={}) for sid in ids[start : start + max(limit, 0)]]
+
+    def save_share_summary(self, sid: str, summary_json: str) -> None:
+        with self._lock:
+            if sid not in self._scenarios:
+                return
+            self._share_summaries[sid] = summary_json
+            try:
+                self._append({"op": "shareSummary", "id": sid, "summary": summary_json})
+            except Exception as e:
+                logger.error(f"Failed to append share summary to {self.path}: {e}")
+
+    def get_share_summary(self, sid: str) -> Optional[str]:
+        return self._share_summaries.get(sid)
+
 
 class SqliteVoteStore(VoteStore):
-    def __init__(self, path: str) -> None:
+    """SQLite vote store with one persistent connection per thread.
+
+    Connections are opened lazily by each thread (the I/O pool reuses its
+    threads), tuned once with per-connection pragmas and keep sqlite3's
+    prepared-statement cache warm across calls. ``_connect()`` still works as
+    ``with self._connect() as conn:`` (commit/rollback; the connection stays
+    open). ``close()`` closes every thread's connection.
+    """
+
+    STATEMENT_CACHE_SIZE = 256
+
+    def __init__(
+        self,
+        path: str,
+        busy_timeout_ms: int = 5000,
+        cache_size_kib: int = 8192,
+        mmap_size: int = 256 * 1024 * 1024,
+        leaderboard_size: int = 100,
+        leaderboard_refresh_sec: float = 30.0,
+    ) -> None:
         self.path = path
+        self.busy_timeout_ms = max(0, int(busy_timeout_ms))
+        self.cache_size_kib = max(0, int(cache_size_kib))
+        self.mmap_size = max(0, int(mmap_size))
+        # Refreshed periodically: other processes may write the same file
+        self.leaderboard = Leaderboard(leaderboard_size, leaderboard_refresh_sec)
+        self._local = threading.local()
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        self._generation = 0
         self._init_db()
 
+    def _open(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000.0,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+            check_same_thread=False,  # only closed from another thread, by close()
+        )
+        # WAL persists in the database file; the rest is per connection
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms};")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kib};")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size};")
+        conn.execute("PRAGMA temp_store=MEMORY;")
+        return conn
+
     def _connect(self) -> sqlite3.Connection:
-        os.makedirs(os.path.dirname(self.path), exist_ok=True)
-        conn = sqlite3.connect(self.path)
-        conn.execute("PRAGMA journal_mode=WAL;")
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "generation", None) == self._generation:
+            return conn
+        conn = self._open()
+        with self._conns_lock:
+            self._conns.append(conn)
+            self._local.generation = self._generation
+        self._local.conn = conn
         return conn
 
     def _init_db(self) -> None:
         with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
             apply_migrations(conn, votes_migrations_dir())
 
+    def close(self) -> None:
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+            # Threads holding a closed connection reopen on their next call
+            self._generation += 1
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
     def add_vote(self, scenario_id: str, user_email: Optional[str], meta: Dict[str, Any]) -> None:
-        normalized = _normalize_meta(meta, user_email)
-        idempotency_key = _idempotency_key_from_meta(normalized)
-        ts = float(normalized.get("timestamp") or time.time())
-        payload = json.dumps(normalized, ensure_ascii=False)
-        vote_id = uuid.uuid4().hex
+        self.add_votes([(scenario_id, user_email, meta)])
+
+    def add_votes(self, votes: List[VoteInput]) -> None:
+        rows = [_vote_row(*vote) for vote in votes]
+        if not rows:
+            return
         with self._connect() as conn:
-            if idempotency_key:
-                try:
-                    row = conn.execute(
-                        """
-                        SELECT 1
-                        FROM votes
-                        WHERE scenario_id = ?
-                          AND json_extract(meta_json, '$.idempotencyKey') = ?
-                        LIMIT 1
-                        """,
-                        (scenario_id, idempotency_key),
-                    ).fetchone()
-                    if row:
-                        return
-                except sqlite3.OperationalError:
-                    rows = conn.execute(
-                        "SELECT meta_json FROM votes WHERE scenario_id = ?",
-                        (scenario_id,),
-                    ).fetchall()
-                    for item in rows:
-                        try:
-                            existing_meta = json.loads(item[0])
-                        except Exception:
-                            continue
-                        if isinstance(existing_meta, dict) and _idempotency_key_from_meta(existing_meta) == idempotency_key:
-                            return
-            conn.execute(
-                "INSERT INTO votes (id, scenario_id, timestamp, user_email, meta_json) VALUES (?, ?, ?, ?, ?)",
-                (vote_id, scenario_id, ts, normalized.get("userEmail"), payload),
-            )
+            stats: Dict[str, Tuple[int, float]] = {}
+            for row in rows:
+                # A replayed idempotency key hits the partial unique index and is dropped
+                cur = conn.execute(
+                    """
+                    INSERT INTO votes (id, scenario_id, timestamp, user_email, meta_json, idempotency_key)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (scenario_id, idempotency_key) WHERE idempotency_key IS NOT NULL DO NOTHING
+                    """,
+                    row,
+                )
+                if cur.rowcount:
+                    count, last_ts = stats.get(row[1], (0, row[2]))
+                    stats[row[1]] = (count + 1, max(last_ts, row[2]))
+            # Same transaction: vote_stats never drifts from votes
+            updated = [
+                conn.execute(
+                    """
+                    INSERT INTO vote_stats (scenario_id, vote_count, last_ts) VALUES (?, ?, ?)
+                    ON CONFLICT (scenario_id) DO UPDATE SET
+                        vote_count = vote_stats.vote_count + excluded.vote_count,
+                        last_ts = MAX(COALESCE(vote_stats.last_ts, excluded.last_ts), excluded.last_ts)
+                    RETURNING scenario_id, vote_count, last_ts
+                    """,
+                    (sid, count, last_ts),
+                ).fetchone()
+                for sid, (count, last_ts) in sorted(stats.items())
+            ]
+        for sid, count, last_ts in updated:
+            self.leaderboard.record(VoteSummary(scenario_id=sid, votes=int(count), last_vote_ts=last_ts))
 
     def save_scenario(self, sid: str, dsl_json: str, meta_json: str | None = None) -> None:
         with self._connect() as conn:
@@ -286,22 +668,120 @@ class SqliteVoteStore(VoteStore):
                 (sid, dsl_json, meta_json),
             )
 
+    def add_scenario(self, sid: str, dsl_json: str) -> bool:
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO scenarios (id, dsl_json) VALUES (?, ?) ON CONFLICT(id) DO NOTHING",
+                (sid, dsl_json),
+            )
+            return cur.rowcount > 0
+
     def get_scenario(self, sid: str) -> Optional[str]:
         with self._connect() as conn:
             row = conn.execute("SELECT dsl_json FROM scenarios WHERE id = ?", (sid,)).fetchone()
             return row[0] if row else None
 
-    def summary(self, limit: int = 25) -> List[VoteSummary]:
+    def get_scenarios(self, sids: List[str]) -> Dict[str, str]:
+        unique = list(dict.fromkeys(sids))
+        if not unique:
+            return {}
+        out: Dict[str, str] = {}
+        with self._connect() as conn:
+            # Stay well below SQLITE_MAX_VARIABLE_NUMBER on older builds.
+            for i in range(0, len(unique), 500):
+                chunk = unique[i : i + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT id, dsl_json FROM scenarios WHERE id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for sid, dsl in rows:
+                    out[sid] = dsl
+        return out
+
+    def has_scenario(self, sid: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM scenarios WHERE id = ? LIMIT 1", (sid,)).fetchone()
+            return row is not None
+
+    def list_scenarios(self, limit: int = 50, after: Optional[Tuple[str, str]] = None) -> List[SavedScenario]:
+        where = ""
+        params: List[Any] = []
+        if after is not None:
+            where = "WHERE (created_at, id) < (?, ?)"
+            params = [str(after[0]), str(after[1])]
         with self._connect() as conn:
             rows = conn.execute(
-                """
-                SELECT scenario_id, COUNT(*) as votes, MAX(timestamp) as last_ts
-                FROM votes
-                GROUP BY scenario_id
-                ORDER BY votes DESC
+                f"""
+                SELECT id, created_at, meta_json
+                FROM scenarios
+                {where}
+                ORDER BY created_at DESC, id DESC
                 LIMIT ?
                 """,
-                (max(limit, 0),),
+                (*params, max(limit, 0)),
+            ).fetchall()
+        return [SavedScenario(scenario_id=row[0], created_at=row[1], meta=_meta_dict(row[2])) for row in rows]
+
+    def save_share_summary(self, sid: str, summary_json: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE scenarios SET share_summary_json = ? WHERE id = ?", (summary_json, sid))
+
+    def get_share_summary(self, sid: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT share_summary_json FROM scenarios WHERE id = ?", (sid,)).fetchone()
+            return row[0] if row and row[0] else None
+
+    def iter_votes(self, after: Optional[Tuple[float, str]] = None, chunk_size: int = 1000) -> Iterator[ExportedVote]:
+        # One keyset query per chunk: no read transaction stays open between chunks
+        chunk_size = max(1, int(chunk_size))
+        while True:
+            where = ""
+            params: List[Any] = []
+            if after is not None:
+                where = "WHERE (v.timestamp, v.id) > (?, ?)"
+                params = [float(after[0]), str(after[1])]
+            with self._connect() as conn:
+                rows = conn.execute(
+                    f"""
+                    SELECT v.id, v.scenario_id, v.timestamp, v.meta_json, s.dsl_json
+                    FROM votes v
+                    LEFT JOIN scenarios s ON s.id = v.scenario_id
+                    {where}
+                    ORDER BY v.timestamp, v.id
+                    LIMIT ?
+                    """,
+                    (*params, chunk_size),
+                ).fetchall()
+            for row in rows:
+                yield ExportedVote(
+                    vote_id=row[0],
+                    scenario_id=row[1],
+                    timestamp=float(row[2]),
+                    meta=_meta_dict(row[3]),
+                    dsl_json=row[4],
+                )
+            if len(rows) < chunk_size:
+                return
+            after = (rows[-1][2], rows[-1][0])
+
+    def _summary(self, limit: int, after: Optional[Tuple[int, str]]) -> List[VoteSummary]:
+        where = ""
+        params: List[Any] = []
+        if after is not None:
+            # Seek on idx_vote_stats_order instead of an OFFSET scan
+            where = "WHERE vote_count < ? OR (vote_count = ? AND scenario_id > ?)"
+            params = [int(after[0]), int(after[0]), str(after[1])]
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT scenario_id, vote_count, last_ts
+                FROM vote_stats
+                {where}
+                ORDER BY vote_count DESC, scenario_id
+                LIMIT ?
+                """,
+                (*params, max(limit, 0)),
             ).fetchall()
         return [
             VoteSummary(scenario_id=row[0], votes=int(row[1]), last_vote_ts=row[2])
@@ -309,6 +789,33 @@ class SqliteVoteStore(VoteStore):
         ]
 
 
+def _pg_insert_votes_cte(count: int) -> str:
+    """CTEs inserting ``count`` ``_vote_row`` tuples; ``inserted`` returns ``(scenario_id, timestamp)`` per new vote.
+
+    ``votes`` is partitioned by month, so it cannot hold a unique index on the
+    idempotency key: the first vote of a key claims it in
+    ``vote_idempotency_keys`` and only claimed (or keyless) votes are inserted.
+    """
+    values = ", ".join(["(%s, %s, %s::DOUBLE PRECISION, %s, %s, %s)"] * count)
+    return f"""
+        incoming (id, scenario_id, timestamp, user_email, meta_json, idempotency_key) AS (
+            VALUES {values}
+        ),
+        keyed AS (
+            INSERT INTO vote_idempotency_keys (scenario_id, idempotency_key, vote_id, timestamp)
+            SELECT scenario_id, idempotency_key, id, timestamp FROM incoming WHERE idempotency_key IS NOT NULL
+            ON CONFLICT (scenario_id, idempotency_key) DO NOTHING
+            RETURNING vote_id
+        ),
+        inserted AS (
+            INSERT INTO votes (id, scenario_id, timestamp, user_email, meta_json, idempotency_key)
+            SELECT id, scenario_id, timestamp, user_email, meta_json, idempotency_key FROM incoming
+            WHERE idempotency_key IS NULL OR id IN (SELECT vote_id FROM keyed)
+            RETURNING scenario_id, timestamp
+        )
+    """
+
+
 class PostgresVoteStore(VoteStore):
     def __init__(
         self,
@@ -318,10 +825,14 @@ class PostgresVoteStore(VoteStore):
         pool_timeout: float,
         pool_max_idle: float,
         pool_max_lifetime: float,
+        leaderboard_size: int = 100,
+        leaderboard_refresh_sec: float = 30.0,
     ) -> None:
         from psycopg_pool import ConnectionPool
 
         self.dsn = dsn
+        # Refreshed periodically: every instance writes the same vote_stats
+        self.leaderboard = Leaderboard(leaderboard_size, leaderboard_refresh_sec)
         min_size = max(0, pool_min_size)
         max_size = max(min_size if min_size > 0 else 1, pool_max_size)
         self._pool = ConnectionPool(
@@ -339,68 +850,103 @@ class PostgresVoteStore(VoteStore):
     def _init_db(self) -> None:
         with self._pool.connection() as conn:
             apply_migrations(conn, votes_migrations_dir())
+            ensure_vote_partitions(conn)
 
     def add_vote(self, scenario_id: str, user_email: Optional[str], meta: Dict[str, Any]) -> None:
-        normalized = _normalize_meta(meta, user_email)
-        idempotency_key = _idempotency_key_from_meta(normalized)
-        ts = float(normalized.get("timestamp") or time.time())
-        payload = json.dumps(normalized, ensure_ascii=False)
-        vote_id = uuid.uuid4().hex
+        self.add_votes([(scenario_id, user_email, meta)])
+
+    def add_votes(self, votes: List[VoteInput]) -> None:
+        rows = [_vote_row(*vote) for vote in votes]
+        if not rows:
+            return
+        params = [value for row in rows for value in row]
+        updated: List[Tuple[Any, ...]] = []
         with self._pool.connection() as conn:
             with conn.cursor() as cur:
-                if idempotency_key:
+                # 1. Insert raw votes; replayed idempotency keys insert nothing
+                cur.execute(
+                    f"WITH {_pg_insert_votes_cte(len(rows))} SELECT scenario_id, timestamp FROM inserted",
+                    params,
+                )
+                stats: Dict[str, Tuple[int, float]] = {}
+                for scenario_id, ts in cur.fetchall():
+                    count, last_ts = stats.get(scenario_id, (0, float(ts)))
+                    stats[scenario_id] = (count + 1, max(last_ts, float(ts)))
+                # 2. Upsert materialization, one row per scenario (sorted to keep lock order stable)
+                if stats:
+                    ordered = sorted(stats.items())
                     cur.execute(
-                        """
-                        SELECT 1
-                        FROM votes
-                        WHERE scenario_id = %s
-                          AND meta_json::jsonb ->> 'idempotencyKey' = %s
-                        LIMIT 1
+                        f"""
+                        INSERT INTO vote_stats (scenario_id, vote_count, last_ts)
+                        VALUES {", ".join(["(%s, %s, %s)"] * len(ordered))}
+                        ON CONFLICT (scenario_id) DO UPDATE SET
+                            vote_count = vote_stats.vote_count + EXCLUDED.vote_count,
+                            last_ts = GREATEST(vote_stats.last_ts, EXCLUDED.last_ts)
+                        RETURNING scenario_id, vote_count, last_ts
                         """,
-                        (scenario_id, idempotency_key),
+                        [value for sid, (count, last_ts) in ordered for value in (sid, count, last_ts)],
                     )
-                    if cur.fetchone():
-                        conn.commit()
-                        return
-                # 1. Insert raw vote
-                cur.execute(
-                    """
-                    INSERT INTO votes (id, scenario_id, timestamp, user_email, meta_json)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (vote_id, scenario_id, ts, normalized.get("userEmail"), payload),
-                )
-                # 2. Upsert materialization
+                    updated = cur.fetchall()
+            conn.commit()
+        for sid, count, last_ts in updated:
+            self.leaderboard.record(VoteSummary(scenario_id=sid, votes=int(count), last_vote_ts=last_ts))
+
+    def summary(self, limit: int = 25, after: Optional[Tuple[int, str]] = None) -> List[VoteSummary]:
+        try:
+            return super().summary(limit, after)
+        except Exception:
+            return []
+
+    def iter_votes(self, after: Optional[Tuple[float, str]] = None, chunk_size: int = 1000) -> Iterator[ExportedVote]:
+        where = ""
+        params: List[Any] = []
+        if after is not None:
+            # The plain bound lets the planner skip whole monthly partitions
+            where = "WHERE v.timestamp >= %s AND (v.timestamp, v.id) > (%s, %s)"
+            params = [float(after[0]), float(after[0]), str(after[1])]
+        with self._pool.connection() as conn:
+            # Named (server-side) cursor: rows cross the wire chunk_size at a time
+            with conn.cursor(name="cbl_vote_export") as cur:
+                cur.itersize = max(1, int(chunk_size))
                 cur.execute(
-                    """
-                    INSERT INTO vote_stats (scenario_id, vote_count, last_ts)
-                    VALUES (%s, 1, %s)
-                    ON CONFLICT (scenario_id) DO UPDATE SET
-                        vote_count = vote_stats.vote_count + 1,
-                        last_ts = GREATEST(vote_stats.last_ts, EXCLUDED.last_ts)
+                    f"""
+                    SELECT v.id, v.scenario_id, v.timestamp, v.meta_json, s.dsl_json
+                    FROM votes v
+                    LEFT JOIN scenarios s ON s.id = v.scenario_id
+                    {where}
+                    ORDER BY v.timestamp, v.id
                     """,
-                    (scenario_id, ts),
+                    params,
                 )
-            conn.commit()
+                for row in cur:
+                    yield ExportedVote(
+                        vote_id=row[0],
+                        scenario_id=row[1],
+                        timestamp=float(row[2]),
+                        meta=_meta_dict(row[3]),
+                        dsl_json=_dsl_text(row[4]) if row[4] is not None else None,
+                    )
 
-    def summary(self, limit: int = 25) -> List[VoteSummary]:
+    def _summary(self, limit: int, after: Optional[Tuple[int, str]]) -> List[VoteSummary]:
+        where = ""
+        params: List[Any] = []
+        if after is not None:
+            # Seek on idx_vote_stats_order instead of an OFFSET scan
+            where = "WHERE vote_count < %s OR (vote_count = %s AND scenario_id > %s)"
+            params = [int(after[0]), int(after[0]), str(after[1])]
         with self._pool.connection() as conn:
             with conn.cursor() as cur:
-                try:
-                    cur.execute(
-                        """
-                        SELECT scenario_id, vote_count, last_ts
-                        FROM vote_stats
-                        ORDER BY vote_count DESC
-                        LIMIT %s
-                        """,
-                        (max(limit, 0),),
-                    )
-                    rows = cur.fetchall()
-                except Exception:
-                    conn.rollback()
-                    return []
-                    
+                cur.execute(
+                    f"""
+                    SELECT scenario_id, vote_count, last_ts
+                    FROM vote_stats
+                    {where}
+                    ORDER BY vote_count DESC, scenario_id
+                    LIMIT %s
+                    """,
+                    (*params, max(limit, 0)),
+                )
+                rows = cur.fetchall()
         return [
             VoteSummary(scenario_id=row[0], votes=int(row[1]), last_vote_ts=row[2])
             for row in rows
@@ -421,29 +967,246 @@ class PostgresVoteStore(VoteStore):
                 )
             conn.commit()
 
+    def add_scenario(self, sid: str, dsl_json: str) -> bool:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO scenarios (id, dsl_json) VALUES (%s, %s) ON CONFLICT (id) DO NOTHING",
+                    (sid, dsl_json),
+                )
+                inserted = cur.rowcount > 0
+            conn.commit()
+        return inserted
+
     def get_scenario(self, sid: str) -> Optional[str]:
         with self._pool.connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT dsl_json FROM scenarios WHERE id = %s", (sid,))
                 row = cur.fetchone()
                 if row:
-                    # Return DSL as string (if stored as JSONB, psycopg returns dict, we might need to stringify or just return dict)
-                    # The previous code expects a base64 encoded string usually, or just JSON string?
-                    # The store previously returned 'dsl_b64' string.
-                    # Wait, 'set_dsl' took 'dsl_b64'.
-                    # We should store it as JSONB for analytics, but maybe store the raw b64 too?
-                    # Or decode before storing.
-                    # Let's assume dsl_json input is valid JSON string or dict.
-                    # If the input `dsl_b64` is base64 encoded YAML/JSON, we should decode it to store as JSONB.
-                    # I'll handle the conversion in `store.py`.
-                    # Here we just return the value.
-                    return json.dumps(row[0]) if isinstance(row[0], (dict, list)) else str(row[0])
+                    return _dsl_text(row[0])
+        return None
+
+    def get_scenarios(self, sids: List[str]) -> Dict[str, str]:
+        unique = list(dict.fromkeys(sids))
+        if not unique:
+            return {}
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id, dsl_json FROM scenarios WHERE id = ANY(%s)", (unique,))
+                rows = cur.fetchall()
+        return {row[0]: _dsl_text(row[1]) for row in rows}
+
+    def has_scenario(self, sid: str) -> bool:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM scenarios WHERE id = %s LIMIT 1", (sid,))
+                return cur.fetchone() is not None
+
+    def list_scenarios(self, limit: int = 50, after: Optional[Tuple[str, str]] = None) -> List[SavedScenario]:
+        where = ""
+        params: List[Any] = []
+        if after is not None:
+            where = "WHERE (created_at, id) < (%s::timestamptz, %s)"
+            params = [str(after[0]), str(after[1])]
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT id, created_at, meta_json
+                    FROM scenarios
+                    {where}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                    """,
+                    (*params, max(limit, 0)),
+                )
+                rows = cur.fetchall()
+        return [
+            SavedScenario(
+                scenario_id=row[0],
+                created_at=row[1].isoformat() if row[1] is not None else None,
+                meta=_meta_dict(row[2]),
+            )
+            for row in rows
+        ]
+
+    def save_share_summary(self, sid: str, summary_json: str) -> None:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("UPDATE scenarios SET share_summary_json = %s WHERE id = %s", (summary_json, sid))
+            conn.commit()
+
+    def get_share_summary(self, sid: str) -> Optional[str]:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT share_summary_json FROM scenarios WHERE id = %s", (sid,))
+                row = cur.fetchone()
+                if row and row[0] is not None:
+                    return _dsl_text(row[0])
         return None
 
     def close(self) -> None:
         self._pool.close()
 
 
+class AsyncPostgresVoteStore:
+    """Postgres vote store for async callers, on a psycopg ``AsyncConnectionPool``.
+
+    Mirrors the ``VoteStore`` methods used on the request path as coroutines,
+    so a resolver awaits the network instead of holding an I/O thread. A vote
+    batch is a single statement (insert plus ``vote_stats`` upsert in one CTE)
+    sent with its ``COMMIT`` in pipeline mode: one round trip per call.
+
+    The pool is opened lazily on the event loop that first uses it (a pool is
+    bound to its loop); schema migrations are left to ``PostgresVoteStore``.
+    """
+
+    _ADD_VOTES_SQL = """
+        WITH {inserted}
+        INSERT INTO vote_stats (scenario_id, vote_count, last_ts)
+        SELECT scenario_id, COUNT(*), MAX(timestamp) FROM inserted GROUP BY scenario_id ORDER BY scenario_id
+        ON CONFLICT (scenario_id) DO UPDATE SET
+            vote_count = vote_stats.vote_count + EXCLUDED.vote_count,
+            last_ts = GREATEST(vote_stats.last_ts, EXCLUDED.last_ts)
+        RETURNING scenario_id, vote_count, last_ts
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        pool_min_size: int,
+        pool_max_size: int,
+        pool_timeout: float,
+        pool_max_idle: float,
+        pool_max_lifetime: float,
+        leaderboard: Optional[Leaderboard] = None,
+    ) -> None:
+        self.dsn = dsn
+        self.pool_min_size = max(0, pool_min_size)
+        self.pool_max_size = max(self.pool_min_size if self.pool_min_size > 0 else 1, pool_max_size)
+        self.pool_timeout = pool_timeout
+        self.pool_max_idle = pool_max_idle
+        self.pool_max_lifetime = pool_max_lifetime
+        # Shared with the sync store so both paths keep one top-N current
+        self.leaderboard = leaderboard
+        self._pool: Any = None
+        self._pool_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._opening: Optional["asyncio.Task[Any]"] = None
+
+    async def _open_pool(self) -> Any:
+        from psycopg_pool import AsyncConnectionPool
+
+        pool = AsyncConnectionPool(
+            conninfo=self.dsn,
+            min_size=self.pool_min_size,
+            max_size=self.pool_max_size,
+            timeout=self.pool_timeout,
+            max_idle=self.pool_max_idle,
+            max_lifetime=self.pool_max_lifetime,
+            open=False,
+        )
+        await pool.open()
+        return pool
+
+    async def _get_pool(self) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._pool_loop is not loop:
+            # First use, or a new loop (test clients): the old pool is unusable here
+            self._pool_loop = loop
+            self._pool = None
+            self._opening = loop.create_task(self._open_pool())
+        if self._pool is None:
+            opening = self._opening
+            assert opening is not None
+            try:
+                self._pool = await asyncio.shield(opening)
+            except Exception:
+                if opening.done() and self._opening is opening:
+                    self._pool_loop = None  # the next call retries
+                raise
+        return self._pool
+
+    async def add_vote(self, scenario_id: str, user_email: Optional[str], meta: Dict[str, Any]) -> None:
+        await self.add_votes([(scenario_id, user_email, meta)])
+
+    async def add_votes(self, votes: List[VoteInput]) -> None:
+        rows = [_vote_row(*vote) for vote in votes]
+        if not rows:
+            return
+        sql = self._ADD_VOTES_SQL.format(inserted=_pg_insert_votes_cte(len(rows)))
+        import psycopg
+
+        pool = await self._get_pool()
+        async with pool.connection() as conn:
+            # Pipeline mode needs libpq >= 14; without it the same calls take a round trip each
+            async with conn.pipeline() if psycopg.Pipeline.is_supported() else contextlib.nullcontext():
+                cur = await conn.execute(sql, [value for row in rows for value in row])
+                await conn.commit()
+            updated = await cur.fetchall()
+        if self.leaderboard is not None:
+            for sid, count, last_ts in updated:
+                self.leaderboard.record(VoteSummary(scenario_id=sid, votes=int(count), last_vote_ts=last_ts))
+
+    async def _summary(self, limit: int, after: Optional[Tuple[int, str]] = None) -> List[VoteSummary]:
+        where = ""
+        params: List[Any] = []
+        if after is not None:
+            where = "WHERE vote_count < %s OR (vote_count = %s AND scenario_id > %s)"
+            params = [int(after[0]), int(after[0]), str(after[1])]
+        pool = await self._get_pool()
+        async with pool.connection() as conn:
+            cur = await conn.execute(
+                f"""
+                SELECT scenario_id, vote_count, last_ts
+                FROM vote_stats
+                {where}
+                ORDER BY vote_count DESC, scenario_id
+                LIMIT %s
+                """,
+                (*params, max(limit, 0)),
+            )
+            rows = await cur.fetchall()
+        return [VoteSummary(scenario_id=row[0], votes=int(row[1]), last_vote_ts=row[2]) for row in rows]
+
+    async def summary(self, limit: int = 25, after: Optional[Tuple[int, str]] = None) -> List[VoteSummary]:
+        """Same ordering and ``after`` seek as ``VoteStore.summary``."""
+        try:
+            if self.leaderboard is not None and after is None:
+                rows = await self.leaderboard.atop(limit, self._summary)
+                if rows is not None:
+                    return rows
+            return await self._summary(limit, after)
+        except Exception:
+            return []
+
+    async def save_scenario(self, sid: str, dsl_json: str, meta_json: str | None = None) -> None:
+        pool = await self._get_pool()
+        async with pool.connection() as conn:
+            await conn.execute(
+                """
+                INSERT INTO scenarios (id, dsl_json, meta_json)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (id) DO UPDATE SET
+                    dsl_json = EXCLUDED.dsl_json,
+                    meta_json = COALESCE(EXCLUDED.meta_json, scenarios.meta_json)
+                """,
+                (sid, dsl_json, meta_json),
+            )
+
+    async def get_scenario(self, sid: str) -> Optional[str]:
+        pool = await self._get_pool()
+        async with pool.connection() as conn:
+            cur = await conn.execute("SELECT dsl_json FROM scenarios WHERE id = %s", (sid,))
+            row = await cur.fetchone()
+        return _dsl_text(row[0]) if row else None
+
+    async def close(self) -> None:
+        pool, self._pool, self._pool_loop = self._pool, None, None
+        if pool is not None:
+            await pool.close()
+
+
 @lru_cache(maxsize=1)
 def get_vote_store() -> VoteStore:
     settings = get_settings()
@@ -459,15 +1222,64 @@ def get_vote_store() -> VoteStore:
             settings.votes_db_pool_timeout,
             settings.votes_db_pool_max_idle,
             settings.votes_db_pool_max_lifetime,
+            leaderboard_size=settings.votes_leaderboard_size,
+            leaderboard_refresh_sec=settings.votes_leaderboard_refresh_sec,
         )
 
     if status.selected_backend == "sqlite":
-        return SqliteVoteStore(settings.votes_sqlite_path)
+        return SqliteVoteStore(
+            settings.votes_sqlite_path,
+            busy_timeout_ms=settings.votes_sqlite_busy_timeout_ms,
+            cache_size_kib=settings.votes_sqlite_cache_size_kib,
+            mmap_size=settings.votes_sqlite_mmap_size,
+            leaderboard_size=settings.votes_leaderboard_size,
+            leaderboard_refresh_sec=settings.votes_leaderboard_refresh_sec,
+        )
 
     if status.cloud_run:
         logger.warning("Using file vote store on Cloud Run; data is ephemeral and not shared across instances.")
 
-    return FileVoteStore(settings.votes_file_path)
+    return FileVoteStore(
+        settings.votes_file_path,
+        settings.votes_file_fsync_interval_sec,
+        leaderboard_size=settings.votes_leaderboard_size,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_vote_store() -> Optional[AsyncPostgresVoteStore]:
+    """The async Postgres store when Postgres is the selected backend (None otherwise).
+
+    Sync callers (background threads, the write-behind queue) keep using
+    ``get_vote_store()``, which also applies the schema migrations. Both are
+    built by the app's startup hook, so resolvers only read the cached store.
+    """
+    settings = get_settings()
+    if not settings.votes_db_async:
+        return None
+    status = _resolve_vote_store_status()
+    if not status.ok or status.selected_backend != "postgres":
+        return None
+    return AsyncPostgresVoteStore(
+        settings.votes_db_dsn or "",
+        settings.votes_db_pool_min,
+        settings.votes_db_pool_max,
+        settings.votes_db_pool_timeout,
+        settings.votes_db_pool_max_idle,
+        settings.votes_db_pool_max_lifetime,
+        leaderboard=get_vote_store().leaderboard,
+    )
+
+
+async def close_async_vote_store() -> None:
+    if get_async_vote_store.cache_info().currsize == 0:
+        return
+    store = get_async_vote_store()
+    if store is not None:
+        try:
+            await store.close()
+        except Exception:
+            pass
 
 
 def close_vote_store() -> None:
@@ -68,6 +68,11 @@ def warehouse_status() -> dict:
         return info
     except Exception:
         return info
+    finally:
+        try:
+            con.close()
+        except Exception:
+            pass
 
 
 def _connect_duckdb():  # noqa: ANN001
@@ -83,6 +88,10 @@ def _connect_duckdb():  # noqa: ANN001
     return con
 
 
+# Same ordering as the CASE expression in _qual_name.
+_SCHEMA_PREFERENCE = {"main_fact": 0, "main_staging": 1, "main_vw": 2}
+
+
 def _qual_name(con, name: str) -> str:  # noqa: ANN001
     """Return a schema-qualified relation name for a bare table/view.
 
@@ -115,7 +124,8 @@ def _qual_name(con, name: str) -> str:  # noqa: ANN001
 def table_counts(tables: list[str]) -> dict[str, int]:
     """Return row counts for requested tables/views if available.
 
-    Silently skips missing relations.
+    Silently skips missing relations. Relation names are resolved from a single
+    information_schema scan instead of one lookup per table.
     """
     out: dict[str, int] = {}
     s = get_settings()
@@ -125,21 +135,31 @@ def table_counts(tables: list[str]) -> dict[str, int]:
         con = _connect_duckdb() if s.warehouse_type == "duckdb" else None
     except Exception:
         return out
+    if con is None:
+        return out
     try:
         all_rows = con.execute("select table_schema, table_name from information_schema.tables").fetchall()
-        have = {(r[0], r[1]) for r in all_rows}
-        names = {r[1]: r[0] for r in all_rows if r[1] not in locals()}
+        qualified: dict[str, tuple[int, str]] = {}
+        for sch, nm in all_rows:
+            rank = _SCHEMA_PREFERENCE.get(sch, len(_SCHEMA_PREFERENCE))
+            if nm not in qualified or rank < qualified[nm][0]:
+                qualified[nm] = (rank, f"{sch}.{nm}")
         for t in tables:
-            # If present in any schema, count using that schema
-            if t in [r[1] for r in all_rows]:
-                qname = _qual_name(con, t)
-                try:
-                    cnt = con.execute(f"select count(*) from {qname}").fetchone()[0]
-                    out[t] = int(cnt)
-                except Exception:
-                    continue
+            entry = qualified.get(t)
+            if entry is None:
+                continue
+            try:
+                cnt = con.execute(f"select count(*) from {entry[1]}").fetchone()[0]
+                out[t] = int(cnt)
+            except Exception:
+                continue
     except Exception:
         return out
+    finally:
+        try:
+            con.close()
+        except Exception:
+            pass
     return out
 
 
@@ -228,6 +248,7 @@ def procurement_top_suppliers(
     min_amount_eur: Optional[float] = None,
     max_amount_eur: Optional[float] = None,
     top_n: int = 50,
+    after: Optional[Tuple[float, str]] = None,
 ) -> List[ProcurementItem]:
     if not warehouse_available():
         return []
@@ -251,12 +272,21 @@ def procurement_top_suppliers(
         conds.append("amount_eur <= ?")
         params.append(float(max_amount_eur))
     where_sql = " and ".join(conds)
+    having_sql = ""
+    if after is not None:
+        # Keyset seek on (amount desc, supplier_siren) for cursor pagination
+        having_sql = (
+            " having sum(coalesce(amount_eur,0)) < ? "
+            "or (sum(coalesce(amount_eur,0)) = ? and supplier_siren > ?)"
+        )
+        params.extend([float(after[0]), float(after[0]), str(after[1])])
     rel = _qual_name(con, "vw_procurement_contracts")
     sql = (
         "select supplier_siren, any_value(supplier_name) as supplier_name, "
         "sum(coalesce(amount_eur,0)) as amount, any_value(cpv_code) as cpv, "
         "any_value(procedure_type) as procedure_type, any_value(location_code) as location_code "
-        f"from {rel} where {where_sql} group by supplier_siren order by amount desc limit {int(top_n)}"
+        f"from {rel} where {where_sql} group by supplier_siren{having_sql} "
+        f"order by amount desc, supplier_siren limit {int(top_n)}"
     )
     try:
         rows = con.execute(sql, params).fetchall()
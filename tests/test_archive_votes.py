@@ -0,0 +1,48 @@
+import csv
+from datetime import datetime, timezone
+
+import duckdb
+
+from tools import archive_votes as av
+
+
+def test_parse_partition_name_and_bounds():
+    dec = av.parse_partition_name("votes_2025_12")
+    assert dec is not None
+    assert dec.lower == datetime(2025, 12, 1, tzinfo=timezone.utc).timestamp()
+    assert dec.upper == datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+    assert av.parse_partition_name("votes_default") is None
+    assert av.parse_partition_name("votes_2025_13") is None
+
+
+def test_closed_partitions_keeps_recent_months():
+    partitions = [
+        av.parse_partition_name(name)
+        for name in ("votes_2025_10", "votes_2025_11", "votes_2025_12", "votes_2026_01", "votes_2026_02")
+    ]
+    now = datetime(2026, 2, 15, tzinfo=timezone.utc)
+    assert [p.name for p in av.closed_partitions(partitions, 2, now)] == ["votes_2025_10", "votes_2025_11"]
+    assert [p.name for p in av.closed_partitions(partitions, 0, now)][-1] == "votes_2026_01"
+
+
+def test_csv_to_parquet_roundtrip_and_warehouse_view(tmp_path):
+    csv_path = tmp_path / "dump.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle, lineterminator="\n")
+        writer.writerow(list(av.VOTE_COLUMNS))
+        # Postgres COPY writes NULL unquoted and the empty string quoted
+        handle.write('v2,s1,1767225661,,"{""a"": 1}",""\n')
+        writer.writerow(["v1", "s1", "1767225660", "a@example.org", "{}", "k1"])
+
+    out_dir = tmp_path / "archive"
+    out_dir.mkdir()
+    assert av.csv_to_parquet(str(csv_path), str(out_dir / "votes_2026_01.parquet")) == 2
+
+    con = duckdb.connect()
+    assert av.register_archive_view(con, str(out_dir))
+    rows = con.execute(f"select * from {av.ARCHIVE_VIEW_NAME}").fetchall()
+    assert rows == [
+        ("v1", "s1", 1767225660.0, "a@example.org", "{}", "k1"),
+        ("v2", "s1", 1767225661.0, None, '{"a": 1}', ""),
+    ]
+    assert not av.register_archive_view(con, str(tmp_path / "empty"), "other")
@@ -0,0 +1,32 @@
+import json
+
+import duckdb
+
+from services.api.export import export_line
+from services.api.votes_store import ExportedVote
+from tools import export_votes as ev
+
+
+def _line(i: int, dsl: str | None = '{"actions": []}') -> str:
+    vote = ExportedVote(f"v{i}", "s1", float(i), {"respondentId": f"r{i}"}, dsl)
+    return export_line(vote).decode("utf-8")
+
+
+def test_resume_skips_a_truncated_last_line(tmp_path):
+    path = tmp_path / "votes.ndjson"
+    path.write_text(_line(1) + _line(2) + _line(3)[:20], encoding="utf-8")
+    ev.trim_partial_line(str(path))
+    assert path.read_text(encoding="utf-8") == _line(1) + _line(2)
+    assert ev.last_cursor(str(path)) == json.loads(_line(2))["cursor"]
+    assert ev.last_cursor(str(tmp_path / "missing.ndjson")) is None
+
+
+def test_ndjson_to_parquet_keeps_json_columns(tmp_path):
+    src = tmp_path / "votes.ndjson"
+    src.write_text(_line(1) + _line(2, dsl=None), encoding="utf-8")
+    out = tmp_path / "votes.parquet"
+    assert ev.ndjson_to_parquet(str(src), str(out)) == 2
+    rows = duckdb.sql(
+        f"select voteId, timestamp, meta->>'respondentId', dsl from read_parquet('{out}') order by voteId"
+    ).fetchall()
+    assert rows == [("v1", 1.0, "r1", '{"actions":[]}'), ("v2", 2.0, "r2", None)]
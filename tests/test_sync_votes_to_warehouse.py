@@ -337,6 +337,35 @@ def test_sync_votes_from_file_store(tmp_path, monkeypatch):
     assert row == ("vote-1", 2026)
 
 
+def test_sync_votes_from_jsonl_vote_log(tmp_path, monkeypatch):
+    votes_path = tmp_path / "votes.json"
+    scenarios_path = tmp_path / "scenarios_dsl.json"
+    duckdb_path = tmp_path / "warehouse.duckdb"
+    monkeypatch.setattr(wh, "policy_lever_columns", lambda: [])
+
+    dsl = {"version": 0.1, "baseline_year": 2026, "actions": []}
+    encoded = base64.b64encode(json.dumps(dsl).encode("utf-8")).decode(
+        "ascii"
+    )
+    scenarios_path.write_text(json.dumps({"s1": encoded}))
+    records = [
+        {"op": "scenario", "id": "s1", "dsl": json.dumps(dsl)},
+        {"op": "vote", "id": "vote-1", "scenarioId": "s1", "timestamp": 111.0, "meta": {}},
+        {"op": "vote", "id": "vote-2", "scenarioId": "s1", "timestamp": 112.0, "meta": {}},
+    ]
+    votes_path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    wh_con = duckdb.connect(str(duckdb_path))
+    inserted = wh.sync_votes(
+        wh_con,
+        "file",
+        votes_file_path=str(votes_path),
+        scenarios_dsl_path=str(scenarios_path),
+    )
+
+    assert inserted == 2
+
+
 def test_sync_votes_from_file_store_idempotent_without_id(
     tmp_path, monkeypatch
 ):
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""Archive closed monthly vote partitions to Parquet.
+
+The Postgres ``votes`` table is range-partitioned by month (migration 010,
+partitions named ``votes_YYYY_MM``). This command:
+
+1. creates the partitions for the current and upcoming months;
+2. exports every partition older than ``--keep-months`` to
+   ``<out-dir>/votes_YYYY_MM.parquet`` (ZSTD), checking the row count;
+3. detaches and drops the exported partitions, with their idempotency keys;
+4. exposes the archive to the DuckDB warehouse as the ``votes_archive`` view.
+
+A failed export leaves its partition in place, so the command can be re-run.
+
+Usage:
+  VOTES_DB_DSN=postgresql://... python3 tools/archive_votes.py --keep-months 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+import duckdb
+import psycopg
+
+from services.api.db.migrations import ensure_vote_partitions, month_starts
+from tools.sync_votes_to_warehouse import connect_duckdb
+
+DEFAULT_ARCHIVE_DIR = os.path.join("data", "archive", "votes")
+ARCHIVE_VIEW_NAME = "votes_archive"
+
+VOTE_COLUMNS = {
+    "id": "VARCHAR",
+    "scenario_id": "VARCHAR",
+    "timestamp": "DOUBLE",
+    "user_email": "VARCHAR",
+    "meta_json": "VARCHAR",
+    "idempotency_key": "VARCHAR",
+}
+
+_PARTITION_RE = re.compile(r"^votes_(\d{4})_(\d{2})$")
+
+
+@dataclass(frozen=True)
+class VotePartition:
+    name: str
+    month_start: datetime
+
+    @property
+    def lower(self) -> float:
+        return self.month_start.timestamp()
+
+    @property
+    def upper(self) -> float:
+        return month_starts(self.month_start, 2)[1].timestamp()
+
+
+def parse_partition_name(name: str) -> Optional[VotePartition]:
+    """Map ``votes_YYYY_MM`` to its partition; None for other tables (e.g. ``votes_default``).
+
+    Args:
+        name: Partition table name.
+
+    Returns:
+        The partition, or None.
+    """
+    match = _PARTITION_RE.match(name)
+    if not match:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    if not 1 <= month <= 12:
+        return None
+    return VotePartition(name, datetime(year, month, 1, tzinfo=timezone.utc))
+
+
+def list_vote_partitions(conn: psycopg.Connection) -> List[VotePartition]:
+    """List the monthly partitions of ``votes``, oldest first.
+
+    Args:
+        conn: Postgres connection.
+
+    Returns:
+        Monthly partitions.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            select c.relname
+            from pg_inherits i
+            join pg_class c on c.oid = i.inhrelid
+            where i.inhparent = 'votes'::regclass
+            """
+        )
+        names = [row[0] for row in cur.fetchall()]
+    partitions = [p for p in (parse_partition_name(name) for name in names) if p]
+    return sorted(partitions, key=lambda p: p.month_start)
+
+
+def closed_partitions(
+    partitions: List[VotePartition],
+    keep_months: int,
+    now: Optional[datetime] = None,
+) -> List[VotePartition]:
+    """Select the partitions to archive.
+
+    Args:
+        partitions: Monthly partitions.
+        keep_months: Completed months kept in Postgres besides the current one.
+        now: Reference time (defaults to the current UTC time).
+
+    Returns:
+        Partitions whose month ended before the kept months.
+    """
+    now = now or datetime.now(timezone.utc)
+    year, month = now.year, now.month - max(0, keep_months)
+    while month < 1:
+        year, month = year - 1, month + 12
+    cutoff = datetime(year, month, 1, tzinfo=timezone.utc).timestamp()
+    return [p for p in partitions if p.upper <= cutoff]
+
+
+def csv_to_parquet(csv_path: str, parquet_path: str) -> int:
+    """Convert a ``COPY ... (FORMAT csv, HEADER)`` dump of votes to ZSTD Parquet.
+
+    The file is written next to its destination and renamed into place.
+
+    Args:
+        csv_path: Source CSV path.
+        parquet_path: Destination Parquet path.
+
+    Returns:
+        Number of rows written.
+    """
+    tmp_path = parquet_path + ".tmp"
+    con = duckdb.connect()
+    try:
+        con.execute(
+            f"copy (select * from read_csv({_sql_literal(csv_path)}, header = true, delim = ',', quote = '\"', "
+            f"allow_quoted_nulls = false, columns = {_duckdb_struct(VOTE_COLUMNS)}) "
+            f"order by timestamp, id) "
+            f"to {_sql_literal(tmp_path)} (format parquet, compression zstd)"
+        )
+        row = con.execute("select count(*) from read_parquet(?)", [tmp_path]).fetchone()
+    finally:
+        con.close()
+    os.replace(tmp_path, parquet_path)
+    return int(row[0]) if row else 0
+
+
+def export_partition(
+    conn: psycopg.Connection,
+    partition: VotePartition,
+    out_dir: str,
+) -> str:
+    """Export one partition to ``<out_dir>/<name>.parquet``.
+
+    Args:
+        conn: Postgres connection.
+        partition: Partition to export.
+        out_dir: Archive directory.
+
+    Returns:
+        Path of the Parquet file.
+
+    Raises:
+        RuntimeError: The file does not hold every row of the partition.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    parquet_path = os.path.join(out_dir, f"{partition.name}.parquet")
+    columns = ", ".join(VOTE_COLUMNS)
+    with conn.cursor() as cur:
+        cur.execute(f'select count(*) from "{partition.name}"')
+        expected = int(cur.fetchone()[0])
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", dir=out_dir, delete=False) as handle:
+            csv_path = handle.name
+            with cur.copy(
+                f'copy (select {columns} from "{partition.name}") '
+                "to stdout (format csv, header true)"
+            ) as copy:
+                for chunk in copy:
+                    handle.write(chunk)
+    try:
+        written = csv_to_parquet(csv_path, parquet_path)
+    finally:
+        os.unlink(csv_path)
+    if written != expected:
+        raise RuntimeError(
+            f"{partition.name}: exported {written} rows, expected {expected}"
+        )
+    return parquet_path
+
+
+def drop_partition(conn: psycopg.Connection, partition: VotePartition) -> None:
+    """Detach and drop an exported partition and its idempotency keys.
+
+    Args:
+        conn: Postgres connection.
+        partition: Partition to drop.
+
+    Returns:
+        None.
+    """
+    with conn.cursor() as cur:
+        cur.execute(f'alter table votes detach partition "{partition.name}"')
+        cur.execute(
+            f"""
+            delete from vote_idempotency_keys k
+            using "{partition.name}" v
+            where k.scenario_id = v.scenario_id
+              and k.idempotency_key = v.idempotency_key
+              and k.vote_id = v.id
+            """
+        )
+        cur.execute(f'drop table "{partition.name}"')
+    conn.commit()
+
+
+def register_archive_view(
+    con: duckdb.DuckDBPyConnection,
+    archive_dir: str,
+    view_name: str = ARCHIVE_VIEW_NAME,
+) -> bool:
+    """Point a warehouse view at the archived Parquet files.
+
+    Args:
+        con: DuckDB connection.
+        archive_dir: Archive directory.
+        view_name: View name.
+
+    Returns:
+        False when there is nothing archived yet.
+    """
+    if not any(Path(archive_dir).glob("votes_*.parquet")):
+        return False
+    pattern = os.path.join(os.path.abspath(archive_dir), "votes_*.parquet")
+    con.execute(
+        f'create or replace view "{view_name}" as '
+        f"select * from read_parquet({_sql_literal(pattern)})"
+    )
+    return True
+
+
+def archive_votes(
+    dsn: str,
+    out_dir: str = DEFAULT_ARCHIVE_DIR,
+    *,
+    keep_months: int = 3,
+    months_ahead: int = 2,
+    drop: bool = True,
+    dry_run: bool = False,
+) -> List[str]:
+    """Create upcoming partitions, then export (and drop) the closed ones.
+
+    Args:
+        dsn: Postgres DSN of the votes store.
+        out_dir: Archive directory.
+        keep_months: Completed months kept in Postgres besides the current one.
+        months_ahead: Upcoming monthly partitions to create.
+        drop: Drop partitions once exported.
+        dry_run: Only list the partitions that would be archived.
+
+    Returns:
+        Names of the archived (or, in a dry run, selected) partitions.
+    """
+    with psycopg.connect(dsn) as conn:
+        if not dry_run:
+            ensure_vote_partitions(conn, months_ahead=months_ahead)
+        selected = closed_partitions(list_vote_partitions(conn), keep_months)
+        if dry_run:
+            return [p.name for p in selected]
+        archived: List[str] = []
+        for partition in selected:
+            path = export_partition(conn, partition, out_dir)
+            print(f"{partition.name}: {path}")
+            if drop:
+                drop_partition(conn, partition)
+            archived.append(partition.name)
+    return archived
+
+
+def _duckdb_struct(columns: dict[str, str]) -> str:
+    items = ", ".join(f"{_sql_literal(name)}: {_sql_literal(dtype)}" for name, dtype in columns.items())
+    return "{" + items + "}"
+
+
+def _sql_literal(value: str) -> str:
+    escaped = value.replace("'", "''")
+    return f"'{escaped}'"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--dsn", default=os.getenv("VOTES_DB_DSN"), help="Postgres DSN (default: VOTES_DB_DSN)")
+    ap.add_argument("--out-dir", default=DEFAULT_ARCHIVE_DIR)
+    ap.add_argument("--keep-months", type=int, default=3, help="Completed months kept in Postgres")
+    ap.add_argument("--months-ahead", type=int, default=2, help="Upcoming partitions to create")
+    ap.add_argument("--keep-partitions", action="store_true", help="Export without dropping")
+    ap.add_argument("--no-view", action="store_true", help="Do not register the DuckDB view")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+    if not args.dsn:
+        raise SystemExit("VOTES_DB_DSN (or --dsn) is required")
+
+    archived = archive_votes(
+        args.dsn,
+        args.out_dir,
+        keep_months=args.keep_months,
+        months_ahead=args.months_ahead,
+        drop=not args.keep_partitions,
+        dry_run=args.dry_run,
+    )
+    if args.dry_run:
+        print("would archive: " + (", ".join(archived) or "nothing"))
+        return
+    if not args.no_view:
+        con = connect_duckdb()
+        try:
+            if register_archive_view(con, args.out_dir):
+                print(f"DuckDB view {ARCHIVE_VIEW_NAME} -> {args.out_dir}")
+        finally:
+            con.close()
+
+
+if __name__ == "__main__":
+    main()
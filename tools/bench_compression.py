@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark response compression on real API payloads.
+
+Fetches the large responses served by the API (full policyLevers catalog,
+legoPieces, scenarioCompare ribbons, /build-snapshot) uncompressed, then reports
+bytes on the wire and CPU time per response for gzip and brotli settings.
+
+Usage:
+  python3 tools/bench_compression.py --runs 20
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+POLICY_LEVERS = """
+  { policyLevers { id family budgetSide label description paramsSchema fixedImpactEur feasibility
+      conflictsWith sources shortLabel popularity massMapping cofogMapping missionMapping
+      impact { householdsImpacted decile1ImpactEur decile10ImpactEur gdpImpactPct jobsImpactCount }
+      multiYearImpact pushbacks { type description source } vigilancePoints authoritativeSources
+      distributionalFlags } }
+"""
+LEGO_PIECES = """
+  query($y:Int!){ legoPieces(year:$y){ id label type description amountEur share cofogMajors
+      missions { code weight } beneficiaries examples sources locked familyId } }
+"""
+RUN_SCENARIO = "mutation($dsl:String!){ runScenario(input:{dsl:$dsl}){ id } }"
+SCENARIO_COMPARE = "query($a:ID!){ scenarioCompare(a:$a){ waterfall ribbons pieceLabels massLabels } }"
+
+SETTINGS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 1), ("br", 4), ("br", 6), ("br", 11)]
+
+
+def _graphql(client: TestClient, query: str, variables: dict | None = None) -> bytes:
+    r = client.post("/graphql", json={"query": query, "variables": variables or {}}, headers={"Accept-Encoding": "identity"})
+    r.raise_for_status()
+    js = r.json()
+    if js.get("errors"):
+        raise RuntimeError(f"GraphQL error: {js['errors']}")
+    return r.content
+
+
+def _scenario_dsl(year: int) -> str:
+    from services.api.data_loader import load_lego_config
+
+    pieces = [p for p in load_lego_config().get("pieces", []) if p.get("type") == "expenditure"][:12]
+    actions = [
+        {"id": f"bench_{i}", "target": f"piece.{p['id']}", "op": "decrease", "delta_pct": 2, "recurring": True}
+        for i, p in enumerate(pieces)
+    ]
+    dsl = {"version": 0.1, "baseline_year": year, "assumptions": {"horizon_years": 5}, "actions": actions}
+    return base64.b64encode(json.dumps(dsl).encode("utf-8")).decode("ascii")
+
+
+def collect_payloads(client: TestClient, year: int) -> dict[str, bytes]:
+    payloads: dict[str, bytes] = {}
+    payloads["policyLevers"] = _graphql(client, POLICY_LEVERS)
+    payloads["legoPieces"] = _graphql(client, LEGO_PIECES, {"y": year})
+    try:
+        sid = json.loads(_graphql(client, RUN_SCENARIO, {"dsl": _scenario_dsl(year)}))["data"]["runScenario"]["id"]
+        payloads["scenarioCompare"] = _graphql(client, SCENARIO_COMPARE, {"a": sid})
+    except Exception as exc:
+        print(f"(skipping scenarioCompare: {exc})")
+    snap = client.get("/build-snapshot", params={"year": year}, headers={"Accept-Encoding": "identity"})
+    if snap.status_code == 200:
+        payloads["/build-snapshot"] = snap.content
+    return payloads
+
+
+def bench(payload: bytes, encoding: str, level: int, runs: int) -> tuple[int, float]:
+    from services.api.compression import compress_bytes
+
+    size = 0
+    t0 = time.process_time()
+    for _ in range(runs):
+        if encoding == "br":
+            size = len(compress_bytes(payload, "br", brotli_quality=level))
+        else:
+            size = len(compress_bytes(payload, "gzip", gzip_level=level))
+    return size, (time.process_time() - t0) * 1000.0 / runs
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--year", type=int, default=2026)
+    args = ap.parse_args()
+
+    # Fetch raw bodies; the middleware is benchmarked via the same codecs below
+    os.environ["COMPRESSION_ENABLED"] = "0"
+    from services.api.app import create_app  # defer import
+    from services.api.compression import brotli
+
+    client = TestClient(create_app())
+    payloads = collect_payloads(client, args.year)
+
+    print(f"{'payload':<18} {'codec':<8} {'bytes':>10} {'ratio':>7} {'cpu ms':>8}")
+    for name, body in payloads.items():
+        print(f"{name:<18} {'identity':<8} {len(body):>10} {1.0:>7.2f} {0.0:>8.2f}")
+        for encoding, level in SETTINGS:
+            if encoding == "br" and brotli is None:
+                continue
+            size, cpu_ms = bench(body, encoding, level, args.runs)
+            codec = f"{encoding}-{level}"
+            print(f"{name:<18} {codec:<8} {size:>10} {len(body) / max(size, 1):>7.2f} {cpu_ms:>8.2f}")
+    if brotli is None:
+        print("brotli not installed: only gzip was measured (pip install Brotli)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark submitVote throughput on the SQLite vote store.
+
+Runs the submitVote mutation in process (schema.execute, resolvers on the I/O
+pool) against three setups on fresh temp databases:
+
+- per-call: the previous behaviour, a new connection plus a WAL pragma for
+  every store call;
+- persistent: SqliteVoteStore as shipped (per-thread connections, tuned
+  pragmas, warm statement cache);
+- write-behind: the persistent store behind the write-behind queue
+  (VOTES_WRITE_BEHIND_ENABLED=1); the time includes draining the queue.
+
+Usage:
+  python3 tools/bench_submit_vote.py --votes 2000 --concurrency 16
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+
+MUTATION = "mutation($sid: ID!, $rid: String) { submitVote(scenarioId: $sid, respondentId: $rid) }"
+
+
+def _per_call_store(path: str):
+    from services.api.votes_store import SqliteVoteStore
+
+    class PerCallConnectionStore(SqliteVoteStore):
+        def _connect(self) -> sqlite3.Connection:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            return conn
+
+        def close(self) -> None:
+            pass
+
+    return PerCallConnectionStore(path)
+
+
+async def _campaign(votes: int, concurrency: int, scenarios: int) -> list[float]:
+    from services.api.schema import schema
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            res = await schema.execute(
+                MUTATION, variable_values={"sid": f"bench-{i % scenarios}", "rid": uuid.uuid4().hex}
+            )
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            if res.errors or not res.data["submitVote"]:
+                raise RuntimeError(f"submitVote failed: {res.errors}")
+
+    await asyncio.gather(*(one(i) for i in range(votes)))
+    return latencies
+
+
+def run(label: str, store, votes: int, concurrency: int, scenarios: int, write_behind: bool = False) -> None:
+    from services.api import vote_queue, votes_store
+
+    queue = vote_queue.WriteBehindVoteQueue(lambda: store) if write_behind else None
+    original = votes_store.get_vote_store
+    original_queue = vote_queue.get_vote_queue
+    votes_store.get_vote_store = lambda: store  # type: ignore[assignment]
+    vote_queue.get_vote_queue = lambda: queue  # type: ignore[assignment]
+    try:
+        t0 = time.perf_counter()
+        latencies = asyncio.run(_campaign(votes, concurrency, scenarios))
+        if queue is not None:
+            queue.close()
+        elapsed = time.perf_counter() - t0
+    finally:
+        votes_store.get_vote_store = original  # type: ignore[assignment]
+        vote_queue.get_vote_queue = original_queue  # type: ignore[assignment]
+        store.close()
+    p95 = statistics.quantiles(latencies, n=100)[94] if len(latencies) > 1 else latencies[0]
+    print(f"{label:<12} {votes / elapsed:>10.0f} {statistics.median(latencies):>9.2f} {p95:>9.2f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--votes", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--scenarios", type=int, default=50)
+    args = ap.parse_args()
+
+    from services.api.votes_store import SqliteVoteStore
+
+    print(f"{'store':<12} {'votes/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        run("per-call", _per_call_store(os.path.join(tmp, "per_call.sqlite3")), args.votes, args.concurrency, args.scenarios)
+        run("persistent", SqliteVoteStore(os.path.join(tmp, "persistent.sqlite3")), args.votes, args.concurrency, args.scenarios)
+        run(
+            "write-behind",
+            SqliteVoteStore(os.path.join(tmp, "write_behind.sqlite3")),
+            args.votes,
+            args.concurrency,
+            args.scenarios,
+            write_behind=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Build the persisted query manifest used by GRAPHQL_PERSISTED_QUERIES=allowlist.
+
+Scans the frontend for GraphQL template literals (backtick strings starting with
+`query`, `mutation` or `{` and without `${...}` interpolation) and writes
+`{sha256: query}` JSON. Hashes are computed on the exact literal text, which is
+what the frontend sends.
+
+Usage:
+  python3 tools/build_persisted_queries.py --out data/persisted_queries.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from services.api.persisted_queries import query_hash  # noqa: E402
+
+_TEMPLATE_RE = re.compile(r"`([^`]*)`", re.S)
+_OPERATION_RE = re.compile(r"^\s*(query|mutation|\{)")
+_SOURCE_DIRS = ("app", "components", "lib")
+_EXTENSIONS = (".ts", ".tsx")
+
+
+def extract_operations(text: str) -> list[str]:
+    out: list[str] = []
+    for match in _TEMPLATE_RE.finditer(text):
+        body = match.group(1)
+        if "${" in body or not _OPERATION_RE.match(body):
+            continue
+        out.append(body)
+    return out
+
+
+def scan(frontend_dir: str) -> dict[str, str]:
+    manifest: dict[str, str] = {}
+    for sub in _SOURCE_DIRS:
+        base = os.path.join(frontend_dir, sub)
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = [d for d in dirnames if d != "node_modules"]
+            for name in sorted(filenames):
+                if not name.endswith(_EXTENSIONS) or ".test." in name:
+                    continue
+                with open(os.path.join(dirpath, name), "r", encoding="utf-8") as f:
+                    for query in extract_operations(f.read()):
+                        manifest[query_hash(query)] = query
+    return manifest
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frontend", default=os.path.join(ROOT, "frontend"))
+    ap.add_argument("--out", default=os.path.join(ROOT, "data", "persisted_queries.json"))
+    args = ap.parse_args()
+
+    manifest = scan(args.frontend)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(manifest.items())), f, ensure_ascii=False, indent=2)
+    print(f"Wrote {len(manifest)} persisted queries to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Download the vote export (``GET /export/votes``) as NDJSON or Parquet.
+
+The API streams NDJSON (gzip on the wire); rows are written to disk as they
+arrive, so memory stays flat whatever the export size.
+
+- ``--out votes.ndjson`` (or ``votes.ndjson.gz``): NDJSON, one vote per line.
+  With ``--resume`` an existing file is continued after its last row.
+- ``--out votes.parquet``: the stream is spooled to a temporary NDJSON file,
+  then converted to ZSTD Parquet with DuckDB (``meta`` and ``dsl`` as JSON).
+
+Usage:
+  EXPORT_TOKEN=... python3 tools/export_votes.py --url https://api.example.org --out votes.ndjson.gz
+  EXPORT_TOKEN=... python3 tools/export_votes.py --out votes.ndjson --resume
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+from typing import IO, Optional
+
+import duckdb
+import httpx
+
+DEFAULT_API_URL = "http://localhost:8000"
+
+PARQUET_COLUMNS = {
+    "cursor": "VARCHAR",
+    "voteId": "VARCHAR",
+    "scenarioId": "VARCHAR",
+    "timestamp": "DOUBLE",
+    "meta": "JSON",
+    "dsl": "JSON",
+}
+
+
+def _open_text(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def last_cursor(path: str) -> Optional[str]:
+    """Cursor of the last complete row of an NDJSON export, or None.
+
+    Args:
+        path: Existing export (``.gz`` or plain).
+
+    Returns:
+        The cursor to resume after.
+    """
+    if not os.path.exists(path):
+        return None
+    cursor = None
+    with _open_text(path, "r") as handle:
+        for line in handle:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                break  # truncated last line of an interrupted download
+            cursor = row.get("cursor") or cursor
+    return cursor
+
+
+def trim_partial_line(path: str) -> None:
+    """Cut a plain NDJSON file after its last complete line, before appending to it.
+
+    Args:
+        path: Existing NDJSON file (not gzip).
+
+    Returns:
+        None.
+    """
+    with open(path, "rb+") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            handle.seek(start)
+            block = handle.read(end - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            handle.truncate(end)
+
+
+def download(
+    url: str,
+    token: str,
+    handle: IO[str],
+    *,
+    after: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_dsl: bool = True,
+    timeout: float = 60.0,
+) -> tuple[int, Optional[str]]:
+    """Stream the export into ``handle``.
+
+    Args:
+        url: API base URL.
+        token: Export token (``EXPORT_TOKEN`` on the API).
+        handle: Text file receiving NDJSON lines.
+        after: Cursor to resume after.
+        limit: Maximum number of votes.
+        include_dsl: Join the scenario DSL.
+        timeout: Read timeout between chunks, in seconds.
+
+    Returns:
+        Number of rows written and the last cursor.
+    """
+    params: dict[str, str] = {"dsl": "true" if include_dsl else "false"}
+    if after:
+        params["after"] = after
+    if limit is not None:
+        params["limit"] = str(limit)
+    headers = {"x-export-token": token, "Accept-Encoding": "gzip"}
+    rows = 0
+    cursor = after
+    with httpx.stream(
+        "GET",
+        url.rstrip("/") + "/export/votes",
+        params=params,
+        headers=headers,
+        timeout=httpx.Timeout(timeout, connect=10.0),
+    ) as res:
+        res.raise_for_status()
+        for line in res.iter_lines():
+            if not line:
+                continue
+            handle.write(line + "\n")
+            cursor = json.loads(line).get("cursor") or cursor
+            rows += 1
+    return rows, cursor
+
+
+def ndjson_to_parquet(ndjson_path: str, parquet_path: str) -> int:
+    """Convert an NDJSON export to ZSTD Parquet.
+
+    Args:
+        ndjson_path: Source NDJSON file.
+        parquet_path: Destination Parquet file.
+
+    Returns:
+        Number of rows written.
+    """
+    columns = ", ".join(f"'{name}': '{dtype}'" for name, dtype in PARQUET_COLUMNS.items())
+    con = duckdb.connect()
+    try:
+        con.execute(
+            f"copy (select * from read_json({_sql_literal(ndjson_path)}, "
+            f"format = 'newline_delimited', columns = {{{columns}}})) "
+            f"to {_sql_literal(parquet_path)} (format parquet, compression zstd)"
+        )
+        row = con.execute("select count(*) from read_parquet(?)", [parquet_path]).fetchone()
+    finally:
+        con.close()
+    return int(row[0]) if row else 0
+
+
+def _sql_literal(value: str) -> str:
+    escaped = value.replace("'", "''")
+    return f"'{escaped}'"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--url", default=os.getenv("EXPORT_API_URL", DEFAULT_API_URL))
+    ap.add_argument("--token", default=os.getenv("EXPORT_TOKEN"), help="Export token (default: EXPORT_TOKEN)")
+    ap.add_argument("--out", required=True, help="Output file: .ndjson, .ndjson.gz or .parquet")
+    ap.add_argument("--after", help="Cursor to start after")
+    ap.add_argument("--resume", action="store_true", help="Continue an existing NDJSON file")
+    ap.add_argument("--limit", type=int)
+    ap.add_argument("--no-dsl", action="store_true", help="Leave out the scenario DSL")
+    args = ap.parse_args()
+    if not args.token:
+        raise SystemExit("EXPORT_TOKEN (or --token) is required")
+
+    to_parquet = args.out.endswith(".parquet")
+    if to_parquet and args.resume:
+        raise SystemExit("--resume needs an NDJSON output")
+    after = args.after
+    if args.resume and os.path.exists(args.out):
+        if not args.out.endswith(".gz"):
+            trim_partial_line(args.out)
+        try:
+            after = last_cursor(args.out) or after
+        except (EOFError, OSError) as exc:
+            raise SystemExit(f"cannot resume {args.out}: {exc}") from exc
+
+    if to_parquet:
+        out_dir = os.path.dirname(os.path.abspath(args.out))
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", dir=out_dir, delete=False, encoding="utf-8") as spool:
+            spool_path = spool.name
+            rows, cursor = download(
+                args.url, args.token, spool, after=after, limit=args.limit, include_dsl=not args.no_dsl
+            )
+        try:
+            ndjson_to_parquet(spool_path, args.out)
+        finally:
+            os.unlink(spool_path)
+    else:
+        with _open_text(args.out, "a" if args.resume else "w") as handle:
+            rows, cursor = download(
+                args.url, args.token, handle, after=after, limit=args.limit, include_dsl=not args.no_dsl
+            )
+    print(f"{rows} votes -> {args.out} (last cursor: {cursor})")
+
+
+if __name__ == "__main__":
+    main()
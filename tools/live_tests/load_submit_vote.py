@@ -1,5 +1,11 @@
 #!/usr/bin/env python3
-"""Concurrent load generator for submitVote on the deployed GraphQL endpoint."""
+"""Concurrent load generator for submitVote on the deployed GraphQL endpoint.
+
+Reports accepted votes per second per stage. When the API exposes ``/metrics``
+next to the GraphQL endpoint, the write-behind vote queue counters are sampled
+before and after the campaign (``ingest``), so a run with
+``VOTES_WRITE_BEHIND_ENABLED=1`` can be compared with a direct-write run.
+"""
 
 from __future__ import annotations
 
@@ -9,10 +15,12 @@ import base64
 import hashlib
 import json
 import random
+import re
 import time
 from dataclasses import dataclass
 from statistics import median
 from typing import Any
+from urllib.parse import urlsplit, urlunsplit
 
 try:
     import httpx  # type: ignore
@@ -163,6 +171,46 @@ async def _worker(
     }
 
 
+_VOTE_QUEUE_RE = re.compile(r'^cbl_vote_queue_(total\{result="(\w+)"\}|depth) (\S+)$')
+
+
+def _metrics_url(graphql_url: str) -> str:
+    parts = urlsplit(graphql_url)
+    return urlunsplit((parts.scheme, parts.netloc, "/metrics", "", ""))
+
+
+async def _vote_queue_counters(client: httpx.AsyncClient, metrics_url: str) -> dict[str, float] | None:
+    """Write-behind queue counters from /metrics; None when unavailable or disabled."""
+    try:
+        response = await client.get(metrics_url, timeout=10.0)
+        if response.status_code != 200:
+            return None
+    except Exception:
+        return None
+    out: dict[str, float] = {}
+    for line in response.text.splitlines():
+        match = _VOTE_QUEUE_RE.match(line.strip())
+        if match:
+            out[match.group(2) or "depth"] = float(match.group(3))
+    return out or None
+
+
+def _ingest_summary(before: dict[str, float] | None, after: dict[str, float] | None) -> dict[str, Any]:
+    if before is None or after is None:
+        return {"mode": "direct"}
+    delta = {name: after.get(name, 0.0) - before.get(name, 0.0) for name in after if name != "depth"}
+    batches = delta.get("batches", 0.0)
+    return {
+        "mode": "write_behind",
+        "written": int(delta.get("written", 0.0)),
+        "batches": int(batches),
+        "avg_batch_size": (delta.get("written", 0.0) / batches) if batches > 0 else None,
+        "rejected": int(delta.get("rejected", 0.0)),
+        "retried": int(delta.get("retried", 0.0)),
+        "depth_after": int(after.get("depth", 0.0)),
+    }
+
+
 def _percentile(values: list[float], pct: float) -> float | None:
     if not values:
         return None
@@ -196,6 +244,8 @@ async def run_load_campaign(
 
     # HTTP/1.1 by default to avoid requiring optional `h2` dependency.
     async with httpx.AsyncClient(http2=False) as client:
+        metrics_url = _metrics_url(graphql_url)
+        queue_before = await _vote_queue_counters(client, metrics_url)
         for idx, stage in enumerate(stages, start=1):
             deadline_mono = time.monotonic() + float(stage.duration_sec)
             workers = [
@@ -225,6 +275,7 @@ async def run_load_campaign(
                 "success": success,
                 "failures": len(failures),
                 "success_rate": (float(success) / float(sent)) if sent > 0 else 0.0,
+                "votes_per_sec": float(success) / float(stage.duration_sec),
                 "latency_ms": {
                     "p50": _percentile(latencies, 50),
                     "p95": _percentile(latencies, 95),
@@ -238,7 +289,9 @@ async def run_load_campaign(
             totals_success += success
             all_latencies.extend(latencies)
             all_failures.extend(failures)
+        queue_after = await _vote_queue_counters(client, metrics_url)
 
+    total_duration = sum(stage.duration_sec for stage in stages)
     return {
         "ok": totals_sent > 0 and totals_success <= totals_sent,
         "graphql_url": graphql_url,
@@ -252,6 +305,7 @@ async def run_load_campaign(
             "success": totals_success,
             "failures": totals_sent - totals_success,
             "success_rate": (float(totals_success) / float(totals_sent)) if totals_sent > 0 else 0.0,
+            "votes_per_sec": float(totals_success) / float(total_duration) if total_duration > 0 else 0.0,
             "latency_ms": {
                 "p50": _percentile(all_latencies, 50),
                 "p95": _percentile(all_latencies, 95),
@@ -259,6 +313,7 @@ async def run_load_campaign(
                 "median": median(all_latencies) if all_latencies else None,
             },
         },
+        "ingest": _ingest_summary(queue_before, queue_after),
         "sample_failures": all_failures[:100],
     }
 
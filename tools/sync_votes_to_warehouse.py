@@ -452,14 +452,38 @@ def _parse_json_payload(payload: Any) -> Any:
 
 
 def _load_votes_file(path: str) -> List[Dict[str, Any]]:
-    data = _load_json_file(path, "votes")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"votes file not found: {path}")
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    try:
+        data = json.loads(text) if text.strip() else None
+    except json.JSONDecodeError:
+        # Append-only JSONL log written by the API's file vote store
+        return _load_votes_log(text)
     if data is None:
         return []
+    if isinstance(data, dict) and data.get("op") == "vote":
+        return _load_votes_log(text)
+    if isinstance(data, dict) and isinstance(data.get("votes"), list):
+        data = data["votes"]
     if not isinstance(data, list):
         raise ValueError("Votes file must contain a JSON list")
     return [item for item in data if isinstance(item, dict)]
 
 
+def _load_votes_log(text: str) -> List[Dict[str, Any]]:
+    votes: List[Dict[str, Any]] = []
+    for line in text.splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict) and record.get("op") == "vote":
+            votes.append({k: v for k, v in record.items() if k != "op"})
+    return votes
+
+
 def _load_scenarios_dsl(path: str) -> Dict[str, Dict[str, Any]]:
     data = _load_json_file(path, "scenarios")
     if data is None: